@@ -2,17 +2,19 @@ import secrets
 from datetime import datetime, timedelta, timezone
 from .states import AlarmState, AlarmAttrs
 from .trigger import Trigger, TriggerType
+from .evaluation import AlarmEvaluationEngine
 from ..tags.tag import Tag, MachineObserver
 from ..tags.cvt import CVTEngine
 from ..modules.users.users import User
 from ..utils.decorators import validate_types, logging_error_handler, set_event
+from ..utils.transitions import TransitionTableMeta
 from ..models import FloatType, IntegerType, StringType
 from ..variables import *
 from statemachine import State, StateMachine
 
 
 
-class Alarm(StateMachine):
+class Alarm(StateMachine, metaclass=TransitionTableMeta):
 
     # MAIN STATES
     normal = State("normal", initial=True)
@@ -80,9 +82,9 @@ class Alarm(StateMachine):
         from ..logger.alarms import AlarmsLoggerEngine
         self.alarm_engine = AlarmsLoggerEngine()
         self.tag_engine = CVTEngine()
+        self.evaluation = AlarmEvaluationEngine()
         self.name = name
         self.tag = tag
-        self.attach(machine=self, tag=tag)
         self.description = description        
         self.alarm_setpoint = Trigger()
         self.alarm_setpoint.value = alarm_setpoint.value
@@ -109,11 +111,30 @@ class Alarm(StateMachine):
         else:
             self.identifier = secrets.token_hex(4)
 
-        transitions = []
-        for state in self.states:
-            transitions.extend(state.transitions)
-        self.transitions = transitions
+        self.transitions = [transition for transitions in self._state_transitions.values() for transition in transitions]
+        self._observers = set()
         super(Alarm, self).__init__()
+        self.evaluation.append(self)
+
+    def add_observer(self, observer):
+        r"""
+        Adds an observer notified after every state transition with *observer.on_transition(alarm, source, target)*,
+        source and target are state ids
+        """
+        self._observers.add(observer)
+
+    def remove_observer(self, observer):
+        r"""
+        Documentation here
+        """
+        self._observers.discard(observer)
+
+    @logging_error_handler
+    def after_transition(self, source:State, target:State):
+
+        for observer in self._observers:
+
+            observer.on_transition(alarm=self, source=source.id, target=target.id)
 
     @logging_error_handler
     def on_enter_normal(self):
@@ -198,9 +219,7 @@ class Alarm(StateMachine):
         r"""
         Documentation here
         """
-        current_state = self.current_state.name.lower()
-        transition_name = f'{current_state}_to_unack_alarm'
-        self.__transition(transition_name=transition_name, timestamp=timestamp)
+        self.__transition(target="unack_alarm", timestamp=timestamp)
 
     @logging_error_handler
     def normal_condition(self):
@@ -211,25 +230,25 @@ class Alarm(StateMachine):
 
         if current_state=="unack_alarm":
 
-            transition_name = f'{current_state}_to_rtn_unack'
+            target = "rtn_unack"
             self.alarm_engine.create_record_on_alarm_summary(
                 name=self.name, 
                 state=self.state.state, 
                 timestamp=self.timestamp,
                 ack_timestamp=self.ack_timestamp
             )
-            self.__transition(transition_name=transition_name)
+            self.__transition(target=target)
 
         elif current_state=="ack_alarm":
 
-            transition_name = f'{current_state}_to_normal'
+            target = "normal"
             self.alarm_engine.create_record_on_alarm_summary(
                 name=self.name, 
                 state=self.state.state, 
                 timestamp=self.timestamp,
                 ack_timestamp=self.ack_timestamp
             )
-            self.__transition(transition_name=transition_name)
+            self.__transition(target=target)
 
     @logging_error_handler
     @set_event(message=f"Acknowledged", classification="Alarm", priority=2, criticity=3)
@@ -241,14 +260,14 @@ class Alarm(StateMachine):
 
         if current_state=="unack_alarm":
 
-            transition_name = f'{current_state}_to_ack_alarm'
+            target = "ack_alarm"
 
         elif current_state=="rtn_unack":
 
-            transition_name = f'{current_state}_to_normal'
+            target = "normal"
 
         tag = self.tag_engine.get_tag_by_name(name=self.tag.name)
-        self.__transition(transition_name=transition_name, ack_timestamp=tag.get_timestamp())
+        self.__transition(target=target, ack_timestamp=tag.get_timestamp())
         return self, f"{self.tag.get_name()}"
 
     @logging_error_handler
@@ -271,9 +290,7 @@ class Alarm(StateMachine):
             self._shelved_time = datetime.now(timezone.utc)
             self._shelved_until = self._shelved_time + timedelta(**options_time)
 
-        current_state = self.current_state.name.lower()
-        transition_name = f'{current_state}_to_shelved'
-        self.__transition(transition_name=transition_name)
+        self.__transition(target="shelved")
         return self, f"{self.tag.get_name()}"
 
     @logging_error_handler
@@ -291,9 +308,7 @@ class Alarm(StateMachine):
         r"""
         Documentation here
         """
-        current_state = self.current_state.name.lower()
-        transition_name = f'{current_state}_to_suppressed_by_design'
-        self.__transition(transition_name=transition_name)
+        self.__transition(target="suppressed_by_design")
         return self, f"{self.tag.get_name()}"
 
     @logging_error_handler
@@ -311,9 +326,7 @@ class Alarm(StateMachine):
         r"""
         Documentation here
         """
-        current_state = self.current_state.name.lower()
-        transition_name = f'{current_state}_to_out_of_service'
-        self.__transition(transition_name=transition_name)
+        self.__transition(target="out_of_service")
         return self, f"{self.tag.get_name()}"
 
     @logging_error_handler
@@ -392,6 +405,8 @@ class Alarm(StateMachine):
 
             self._description = description
             message += f" description: {description}"
+
+        self.evaluation.update(self)
         
         return self, message
 
@@ -403,43 +418,30 @@ class Alarm(StateMachine):
 
         * **(list)**
         """
-        result = list()
-
-        current_state = self.current_state
-        transitions = self.transitions
-
-        for transition in transitions:
-
-            if transition.source == current_state:
-
-                result.append(transition)
-
-        return result
+        return list(self._state_transitions[self.current_state.id])
     
     @logging_error_handler
-    def __transition(self, transition_name:str, **kwargs):
+    def __transition(self, target:str, **kwargs):
 
-        allowed_transitions = self._get_active_transitions()
-        for _transition in allowed_transitions:
-            
-            if f"{_transition.source.name}_to_{_transition.target.name}"==transition_name:
-                
-                self.send(transition_name, **kwargs)
+        event = self._transition_table.get((self.current_state.name, target))
+
+        if event:
+
+            self.send(event, **kwargs)
+            self.evaluation.sync(self)
 
     @logging_error_handler
     def __return_to_service(self,):
 
-        current_state = self.current_state.name.lower()
-
         if self.state.alarm_status.lower()=="active":
 
-            transition_name = f'{current_state}_to_unack_alarm'
+            target = "unack_alarm"
 
         else:
 
-            transition_name = f'{current_state}_to_normal'
+            target = "normal"
         
-        self.__transition(transition_name=transition_name)
+        self.__transition(target=target)
 
     @logging_error_handler
     def get_operator_actions(self)->list:
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""automation/alarms/evaluation.py
+
+This module implements the alarm evaluation engine, it evaluates the thresholds of every alarm on a tag
+value change instead of each alarm observing its own tag.
+"""
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from ..singleton import Singleton
+from ..tags.cvt import CVTEngine
+from ..tags.tag import MachineObserver
+from ..utils.timer_wheel import TimerWheel
+from .trigger import TriggerType
+
+# Trigger sign, HIGH alarms are abnormal above the setpoint and LOW alarms below it, BOOL alarms aren't evaluated
+SIGNS = {
+    TriggerType.HH: 1,
+    TriggerType.H: 1,
+    TriggerType.L: -1,
+    TriggerType.LL: -1
+}
+# States whose alarm condition is active, a normal value transitions them, any other state is transitioned by an abnormal value
+ACTIVE_STATES = ("unack_alarm", "ack_alarm")
+
+
+class AlarmEvaluationEngine(Singleton):
+    r"""
+    Evaluates the alarm thresholds in batches.
+
+    The alarm configuration is kept in typed arrays indexed by slot (one slot per alarm): signed setpoint,
+    deadband, trigger sign and whether its condition is active, so a batch of tag values is evaluated in one
+    pass over the affected slots with no per alarm method calls.
+
+    A HIGH alarm is abnormal when *value > setpoint*, a LOW alarm when *value < setpoint*, once active it
+    returns to normal only when the value crosses back the setpoint by *deadband*. Written with the trigger
+    sign *s* (1 or -1) and *active* (0 or 1):
+
+    ```
+    abnormal = s * value > s * setpoint - deadband * active
+    ```
+
+    Only the alarms where *abnormal != active* go through their state machine transition. If the alarm has an
+    on delay (off delay) the transition is scheduled in the timer wheel instead, it's cancelled if the value
+    returns before the delay and it runs when the timer fires otherwise, so a signal chattering around the
+    setpoint doesn't transition the alarm (nor write alarm summary records) on every crossing. A slot with a
+    pending timer is selected when *abnormal == active*, to cancel it:
+
+    ```
+    selected = (abnormal != active) != pending
+    ```
+
+    Tag values are evaluated as soon as the tag notifies them, unless they're set inside [batch](#batch),
+    then they're evaluated together when the outermost batch exits.
+
+    Before an alarm is triggered its *listener* is asked, if it refuses the alarm (a consequential alarm
+    during an alarm flood) the alarm is suppressed: it's left out of the evaluation until [release](#release).
+    """
+
+    def __init__(self):
+        r"""
+        Documentation here
+        """
+        self.tag_engine = CVTEngine()
+        self._alarms = list()
+        self._slots = dict()
+        self._tag_slots = dict()
+        self._observers = dict()
+        self._thresholds = array("d")
+        self._deadbands = array("d")
+        self._signs = array("b")
+        self._active = array("b")
+        self._on_delays = array("d")
+        self._off_delays = array("d")
+        self._pending = array("b")
+        self.timer_wheel = None
+        self.listener = None
+        self._suppressed = set()
+        self._lock = threading.RLock()
+        self._batches = 0
+        self._deferred = list()
+        self.evaluations = 0
+        self.transitions = 0
+
+    def append(self, alarm):
+        r"""
+        Adds *alarm* to the evaluation, its tag is observed on its first alarm.
+
+        **Parameters**
+
+        * **alarm** (Alarm): Alarm object
+        """
+        with self._lock:
+
+            if alarm.identifier in self._slots:
+
+                self.remove(alarm)
+
+            slot = len(self._alarms)
+            sign = SIGNS.get(alarm.alarm_setpoint.type, 0)
+            self._alarms.append(alarm)
+            self._slots[alarm.identifier] = slot
+            self._thresholds.append(sign * float(alarm.alarm_setpoint.value))
+            self._deadbands.append(float(alarm.alarm_deadband.value or 0.0))
+            self._signs.append(sign)
+            self._active.append(int(alarm.current_state.id in ACTIVE_STATES))
+            self._on_delays.append(float(alarm.alarm_on_delay.value or 0.0))
+            self._off_delays.append(float(alarm.alarm_off_delay.value or 0.0))
+            self._pending.append(0)
+
+            if sign:
+
+                self._tag_slots.setdefault(alarm.tag.name, list()).append(slot)
+                self.__observe(alarm.tag)
+
+    def update(self, alarm):
+        r"""
+        Reloads the configuration of *alarm* (setpoint, trigger type, deadband, delays)
+        """
+        self.append(alarm)
+
+    def remove(self, alarm):
+        r"""
+        Removes *alarm* from the evaluation, the last slot is moved into its slot.
+        """
+        with self._lock:
+
+            slot = self._slots.pop(alarm.identifier, None)
+            self._suppressed.discard(alarm.identifier)
+
+            if slot is None:
+
+                return
+
+            if self._pending[slot]:
+
+                self.get_timer_wheel().cancel(alarm.identifier)
+
+            self.__unindex(slot)
+            last = len(self._alarms) - 1
+
+            if slot != last:
+
+                moved = self._alarms[last]
+                self.__unindex(last)
+                self._alarms[slot] = moved
+                self._slots[moved.identifier] = slot
+                self._thresholds[slot] = self._thresholds[last]
+                self._deadbands[slot] = self._deadbands[last]
+                self._signs[slot] = self._signs[last]
+                self._active[slot] = self._active[last]
+                self._on_delays[slot] = self._on_delays[last]
+                self._off_delays[slot] = self._off_delays[last]
+                self._pending[slot] = self._pending[last]
+
+                if self._signs[slot] and moved.identifier not in self._suppressed:
+
+                    self._tag_slots.setdefault(moved.tag.name, list()).append(slot)
+
+            self._alarms.pop()
+            self._thresholds.pop()
+            self._deadbands.pop()
+            self._signs.pop()
+            self._active.pop()
+            self._on_delays.pop()
+            self._off_delays.pop()
+            self._pending.pop()
+
+    def sync(self, alarm):
+        r"""
+        Updates the condition of *alarm* after a state machine transition (operator actions included)
+        """
+        with self._lock:
+
+            slot = self._slots.get(alarm.identifier)
+
+            if slot is not None and self._alarms[slot] is alarm:
+
+                active = int(alarm.current_state.id in ACTIVE_STATES)
+
+                if self._pending[slot] and active != self._active[slot]:
+
+                    self._pending[slot] = 0
+                    self.get_timer_wheel().cancel(alarm.identifier)
+
+                self._active[slot] = active
+
+    def set_timer_wheel(self, timer_wheel:TimerWheel):
+        r"""
+        Sets the timer wheel that drives the alarm on/off delays
+        """
+        self.timer_wheel = timer_wheel
+
+    def set_listener(self, listener):
+        r"""
+        Sets the object asked before triggering an alarm, *listener.on_alarm(alarm)* returns False to suppress it
+        """
+        self.listener = listener
+
+    def release(self)->int:
+        r"""
+        Returns the suppressed alarms to the evaluation and evaluates them with their tag current value.
+
+        **Returns**
+
+        * **int**: Number of alarms transitioned
+        """
+        with self._lock:
+
+            alarms = [self._alarms[self._slots[identifier]] for identifier in self._suppressed if identifier in self._slots]
+            self._suppressed = set()
+            updates = dict()
+
+            for alarm in alarms:
+
+                self._tag_slots.setdefault(alarm.tag.name, list()).append(self._slots[alarm.identifier])
+                updates[alarm.tag.name] = alarm.tag.name, alarm.tag.value.value, alarm.tag.timestamp or datetime.now()
+
+            return self.evaluate(list(updates.values()))
+
+    def get_suppressed(self)->list:
+        r"""
+        Names of the suppressed alarms
+        """
+        with self._lock:
+
+            return [self._alarms[self._slots[identifier]].name for identifier in self._suppressed if identifier in self._slots]
+
+    def get_timer_wheel(self)->TimerWheel:
+        r"""
+        Documentation here
+        """
+        if self.timer_wheel is None:
+
+            self.timer_wheel = TimerWheel(name="AlarmTimerWheel")
+
+        return self.timer_wheel
+
+    def notify(self, tag:str, value, timestamp:datetime):
+        r"""
+        Tag observer interface, see [MachineObserver](#MachineObserver)
+        """
+        update = (tag, getattr(value, "value", value), timestamp)
+
+        with self._lock:
+
+            if self._batches:
+
+                self._deferred.append(update)
+                return
+
+            self.evaluate([update])
+
+    @contextmanager
+    def batch(self):
+        r"""
+        Defers the evaluation of the tag values set inside it until the outermost batch exits, i.e. a DAQ scan
+        of a whole tag group.
+
+        ```python
+        with AlarmEvaluationEngine().batch():
+
+            for tag, value in values:
+
+                cvt.set_value(id=tag.id, value=value, timestamp=timestamp)
+        ```
+        """
+        with self._lock:
+
+            self._batches += 1
+
+        try:
+
+            yield self
+
+        finally:
+
+            with self._lock:
+
+                self._batches -= 1
+
+                if not self._batches and self._deferred:
+
+                    updates, self._deferred = self._deferred, list()
+                    self.evaluate(updates)
+
+    def evaluate(self, updates:list)->int:
+        r"""
+        Evaluates the alarms of a batch of tag values and transitions the ones whose condition changed.
+
+        A tag updated several times in the batch is evaluated once per value, in order, so no crossing is lost.
+
+        **Parameters**
+
+        * **updates** (list[tuple]): (tag name, value, timestamp)
+
+        **Returns**
+
+        * **int**: Number of alarms transitioned
+        """
+        rounds = list()
+        occurrences = dict()
+
+        with self._lock:
+
+            for tag, value, timestamp in updates:
+
+                if tag not in self._tag_slots or isinstance(value, (str, bool)) or value is None:
+
+                    continue
+
+                occurrence = occurrences.get(tag, 0)
+                occurrences[tag] = occurrence + 1
+
+                if occurrence == len(rounds):
+
+                    rounds.append(dict())
+
+                rounds[occurrence][tag] = float(value), timestamp
+
+            transitions = 0
+
+            for values in rounds:
+
+                transitions += self.__evaluate(values)
+
+            return transitions
+
+    def __evaluate(self, values:dict)->int:
+        r"""
+        Evaluates one value per tag, *values* is {tag name: (value, timestamp)}
+        """
+        slots = array("l")
+        samples = array("d")
+
+        for tag, (value, _) in values.items():
+
+            for slot in self._tag_slots.get(tag, ()):
+
+                slots.append(slot)
+                samples.append(value)
+
+        thresholds, deadbands, signs, active, pending = self._thresholds, self._deadbands, self._signs, self._active, self._pending
+        selected = [
+            slot for slot, value in zip(slots, samples)
+            if ((signs[slot] * value > thresholds[slot] - deadbands[slot] * active[slot]) != active[slot]) != pending[slot]
+        ]
+        self.evaluations += len(slots)
+        transitions = 0
+
+        for slot in selected:
+
+            alarm = self._alarms[slot]
+
+            if pending[slot]:
+
+                # The value returned before the delay elapsed
+                pending[slot] = 0
+                self.get_timer_wheel().cancel(alarm.identifier)
+                continue
+
+            delay = self._off_delays[slot] if active[slot] else self._on_delays[slot]
+            timestamp = values[alarm.tag.name][1]
+
+            if delay > 0:
+
+                pending[slot] = 1
+                self.get_timer_wheel().schedule(alarm.identifier, delay, self.__expire, alarm, timestamp + timedelta(seconds=delay))
+                continue
+
+            transitions += self.__transition(slot, timestamp)
+
+        return transitions
+
+    def __transition(self, slot:int, timestamp:datetime)->bool:
+
+        alarm = self._alarms[slot]
+
+        if self._active[slot]:
+
+            alarm.normal_condition()
+
+        elif self.listener is None or self.listener.on_alarm(alarm):
+
+            alarm.abnormal_condition(timestamp=timestamp)
+
+        else:
+
+            self._suppressed.add(alarm.identifier)
+            self.__unindex(slot)
+
+            return False
+
+        self.transitions += 1
+
+        return True
+
+    def __expire(self, alarm, timestamp:datetime):
+        r"""
+        Timer wheel callback, the alarm condition held for its whole delay
+        """
+        with self._lock:
+
+            slot = self._slots.get(alarm.identifier)
+
+            if slot is None or self._alarms[slot] is not alarm or not self._pending[slot]:
+
+                return
+
+            self._pending[slot] = 0
+            self.__transition(slot, timestamp)
+
+    def __unindex(self, slot:int):
+
+        alarm = self._alarms[slot]
+        slots = self._tag_slots.get(alarm.tag.name)
+
+        if slots and slot in slots:
+
+            slots.remove(slot)
+
+            if not slots:
+
+                self._tag_slots.pop(alarm.tag.name)
+
+    def __observe(self, tag):
+
+        if tag.name not in self._observers:
+
+            observer = MachineObserver(self)
+            self._observers[tag.name] = observer
+            self.tag_engine.attach(name=tag.name, observer=observer)
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        with self._lock:
+
+            return {
+                "alarms": len(self._alarms),
+                "tags": len(self._tag_slots),
+                "active": sum(self._active),
+                "delayed": sum(self._pending),
+                "suppressed": len(self._suppressed),
+                "evaluations": self.evaluations,
+                "transitions": self.transitions
+            }
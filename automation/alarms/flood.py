@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""automation/alarms/flood.py
+
+This module implements the alarm flood detection.
+"""
+import time
+from collections import deque
+from datetime import datetime
+
+
+class AlarmFlood:
+    r"""
+    Alarm flood detector over a sliding window of annunciated alarms.
+
+    A flood starts when more than *threshold* alarms per operator are annunciated within *window* seconds
+    (ISA-18.2 considers 10 alarms per 10 minutes per operator a flood) and it ends when the rate falls to
+    *release* alarms per operator or less, half the threshold by default, so it doesn't toggle at the limit.
+
+    Only the timestamps inside the window are kept, the window is bounded by the alarm rate.
+
+    **Parameters**
+
+    * **threshold** (int): Alarms per operator in the window that start a flood.
+    * **window** (float): Window in seconds.
+    * **operators** (int): Operators sharing the alarm load.
+    * **release** (int): Alarms per operator in the window that end a flood.
+    """
+
+    def __init__(self, threshold:int=10, window:float=600.0, operators:int=1, release:int=None):
+        r"""
+        Documentation here
+        """
+        self.threshold = threshold
+        self.window = window
+        self.operators = operators
+        self.release = threshold // 2 if release is None else release
+        self.flooding = False
+        self.started = None
+        self.floods = 0
+        self.peak = 0
+        self.annunciated = 0
+        self.suppressed = dict()
+        self._times = deque()
+
+    def record(self, now:float=None)->bool:
+        r"""
+        Records an annunciated alarm, returns True if it started a flood.
+        """
+        now = time.monotonic() if now is None else now
+        self._times.append(now)
+        self.__prune(now)
+        self.annunciated += 1
+        self.peak = max(self.peak, len(self._times))
+
+        if not self.flooding and len(self._times) > self.threshold * self.operators:
+
+            self.flooding = True
+            self.started = datetime.now()
+            self.floods += 1
+            self.suppressed = dict()
+
+            return True
+
+        return False
+
+    def update(self, now:float=None)->bool:
+        r"""
+        Prunes the window, returns True if it ended the flood.
+        """
+        self.__prune(time.monotonic() if now is None else now)
+
+        if self.flooding and len(self._times) <= self.release * self.operators:
+
+            self.flooding = False
+            self.started = None
+
+            return True
+
+        return False
+
+    def suppress(self, name:str):
+        r"""
+        Counts a consequential alarm suppressed in the current flood.
+        """
+        self.suppressed[name] = self.suppressed.get(name, 0) + 1
+
+    def get_rate(self)->int:
+        r"""
+        Alarms annunciated in the window
+        """
+        return len(self._times)
+
+    def __prune(self, now:float):
+
+        while self._times and self._times[0] <= now - self.window:
+
+            self._times.popleft()
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        return {
+            "flooding": self.flooding,
+            "started": self.started.isoformat() if self.started else None,
+            "rate": len(self._times),
+            "threshold": self.threshold * self.operators,
+            "window": self.window,
+            "floods": self.floods,
+            "peak": self.peak,
+            "annunciated": self.annunciated,
+            "suppressed": dict(self.suppressed)
+        }
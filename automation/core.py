@@ -2,12 +2,13 @@ import sys, logging, json, os, jwt
 from math import ceil
 from datetime import datetime, timezone
 # DRIVERS IMPORTATION
-from peewee import SqliteDatabase, MySQLDatabase, PostgresqlDatabase
+from peewee import SqliteDatabase
+from playhouse.pool import PooledMySQLDatabase, PooledPostgresqlDatabase
 from .dbmodels.users import Roles, Users
 # PYAUTOMATION MODULES IMPORTATION
 from .utils import log_detailed
 from .singleton import Singleton
-from .workers import LoggerWorker, AlarmWorker
+from .workers import LoggerWorker, AlarmWorker, OPCUAClientWorker, ArchiverWorker
 from .managers import DBManager, OPCUAClientManager, AlarmManager
 from .opcua.models import Client
 from .tags import CVTEngine, Tag
@@ -16,6 +17,7 @@ from .logger.events import EventsLoggerEngine
 from .logger.alarms import AlarmsLoggerEngine
 from .logger.logs import LogsLoggerEngine
 from .logger.machines import MachinesLoggerEngine
+from .logger.trends import TrendsCache
 from .alarms import Alarm
 from .state_machine import Machine, DAQ, AutomationStateMachine, StateMachine
 from .opcua.subscription import DAS
@@ -51,6 +53,7 @@ class PyAutomation(Singleton):
         self.is_starting = True
         self.cvt = CVTEngine()
         self.logger_engine = DataLoggerEngine()
+        self.trends_cache = TrendsCache()
         self.events_engine = EventsLoggerEngine()
         self.alarms_engine = AlarmsLoggerEngine()
         self.logs_engine = LogsLoggerEngine()
@@ -59,6 +62,7 @@ class PyAutomation(Singleton):
         self.opcua_client_manager = OPCUAClientManager()
         self.alarm_manager = AlarmManager()
         self.workers = list()
+        self.archiver_worker = None
         self.das = DAS()
         self.set_log(level=logging.WARNING)
     
@@ -103,6 +107,14 @@ class PyAutomation(Singleton):
         Documentation here
         """
         return self.machine_manager.serialize_machines()
+
+    @logging_error_handler
+    @validate_types(output=dict)
+    def get_machines_metrics(self)->dict:
+        r"""
+        Returns the execution metrics (jitter, overruns, deadline misses) of every running state machine by name.
+        """
+        return self.machine.get_machines_metrics()
     
     @logging_error_handler
     @validate_types(machine=AutomationStateMachine, tag=Tag, output=dict)
@@ -239,6 +251,55 @@ class PyAutomation(Singleton):
         """
         return self.logger_engine.read_trends(start, stop, timezone, *tags)
 
+    @logging_error_handler
+    def get_historical_trend(self, tag:str, start:datetime, stop:datetime)->tuple[list, list]:
+        r"""
+        Historical trend of *tag* between *start* and *stop* (naive datetimes are UTC) for the trends viewer,
+        decimated to the zoom level of the range and cached, see [TrendsCache](./logger/trends.py)
+
+        **Returns**
+
+        * **tuple**: (timestamps, values)
+        """
+        return self.trends_cache.read(tag, start, stop)
+
+    @logging_error_handler
+    def iter_trends(self, start:str, stop:str, timezone:str, *tags, chunk_size:int=5000):
+        r"""
+        Same as *get_trends* but yields (tag, timestamp, value) samples reading the database chunk by chunk, for exports
+        """
+        return self.logger_engine.iter_trends(start, stop, timezone, *tags, chunk_size=chunk_size)
+
+    @logging_error_handler
+    @validate_types(folder=str, days=int, groups=int, period=float|int, output=None)
+    def set_archive(self, folder:str, days:int=30, groups:int=16, period:float=3600.0)->None:
+        r"""
+        Sets the Parquet archive (cold storage tier) of the historian, it requires *pyarrow*.
+
+        Every *period* seconds the tag values older than *days* full days are moved from the database into
+        Parquet files, one file per tag group and day, *get_trends* and *iter_trends* read them back transparently.
+
+        **Parameters**
+
+        * **folder** (str): Archive folder.
+        * **days** (int): Days kept in the database.
+        * **groups** (int): Tag groups (files) per archived day.
+        * **period** (float): Seconds between archive runs.
+
+        Usage:
+
+        ```python
+        >>> app.set_archive(folder="archive", days=30)
+        ```
+        """
+        self.logger_engine.set_archive(folder=folder, days=days, groups=groups)
+
+        if not self.archiver_worker or not self.archiver_worker.is_alive():
+
+            self.archiver_worker = ArchiverWorker(period=period)
+            self.archiver_worker.daemon = True
+            self.archiver_worker.start()
+
     @logging_error_handler
     @validate_types(id=str, output=None|str)
     def delete_tag(self, id:str, user:User|None=None)->None|str:
@@ -261,6 +322,7 @@ class PyAutomation(Singleton):
 
         self.cvt.delete_tag(id=id, user=user)
         self.das.buffer.pop(tag_name)
+        self.trends_cache.clear(tag=tag_name)
 
     @logging_error_handler
     @validate_types(
@@ -300,6 +362,7 @@ class PyAutomation(Singleton):
         """
         tag = self.cvt.get_tag(id=id)
         self.unsubscribe_opcua(tag)
+        self.trends_cache.clear(tag=tag.get_name())
         if name:
             tag_name = tag.get_name()
         # Persist Tag on Database
@@ -361,6 +424,7 @@ class PyAutomation(Singleton):
             self.logger_engine.delete_tag(id=tag.id)
 
         self.cvt.delete_tag(id=tag.id, user=user)
+        self.trends_cache.clear(tag=name)
 
     # USERS METHODS
     @logging_error_handler
@@ -496,6 +560,14 @@ class PyAutomation(Singleton):
 
         return self.opcua_client_manager.get_node_attributes(client_name=client_name, namespaces=namespaces)
 
+    @logging_error_handler
+    @validate_types(client_name=str|type(None), output=dict)
+    def get_opcua_connection_metrics(self, client_name:str=None)->dict:
+        r"""
+        Returns the reconnect metrics of the OPC UA clients (outages, reconnect latency, samples lost)
+        """
+        return self.opcua_client_manager.get_connection_metrics(client_name=client_name)
+
     @logging_error_handler
     def get_opcua_tree(self, client_name:str):
         r"""
@@ -547,18 +619,15 @@ class PyAutomation(Singleton):
     @validate_types(tag_name=str, scan_time=float|int, reload=bool, output=None)
     def subscribe_tag(self, tag_name:str, scan_time:float|int, reload:bool=False):
         r"""
-        Documentatio here
+        Subscribes a tag to the DAQ machine, it polls every tag at its own scan time (milliseconds)
         """
-        scan_time = float(scan_time)
-        daq_name = StringType(f"DAQ-{int(scan_time / 1000)}")
-        daq = self.machine_manager.get_machine(name=daq_name)
+        daq = self.machine_manager.get_machine(name=StringType("DAQ"))
         tag = self.cvt.get_tag_by_name(name=tag_name)
         if not daq:
 
-            daq = DAQ(name=daq_name)
-            interval = FloatType(scan_time / 1000)
+            daq = DAQ()
             daq.set_opcua_client_manager(manager=self.opcua_client_manager)
-            self.machine.append_machine(machine=daq, interval=interval, mode="async")
+            self.machine.append_machine(machine=daq, interval=FloatType(daq.scheduler.get_tick()), mode="async")
             
             if not reload:
 
@@ -662,6 +731,7 @@ class PyAutomation(Singleton):
             host=str|type(None),
             port=int|type(None),
             name=str|type(None),
+            max_connections=int|type(None),
             output=None)
     def set_db(self, dbtype:str='sqlite', drop_table=False, clear_default_tables=False, **kwargs):
         r"""
@@ -675,8 +745,12 @@ class PyAutomation(Singleton):
         * **dbfile** (str): a path to database file.
         * *drop_table** (bool): If you want to drop table.
         * **cascade** (bool): if there are some table dependency, drop it as well
+        * **max_connections** (int): Size of the connection pool for MySQL and Postgres, 20 by default.
         * **kwargs**: Same attributes to a postgres connection.
 
+        SQLite uses one connection per thread, MySQL and Postgres use a connection pool so the historian,
+        alarms and events engines and the API can query the database concurrently.
+
         **Returns:** `None`
 
         Usage:
@@ -709,18 +783,89 @@ class PyAutomation(Singleton):
 
             db_name = kwargs['name']
             del kwargs['name']
-            self._db = MySQLDatabase(db_name, **kwargs)
+            max_connections = kwargs.pop("max_connections", None) or 20
+            self._db = PooledMySQLDatabase(db_name, max_connections=max_connections, stale_timeout=300, **kwargs)
 
         elif dbtype.lower()=='postgresql':
 
             db_name = kwargs['name']
             del kwargs['name']
-            self._db = PostgresqlDatabase(db_name, **kwargs)
+            max_connections = kwargs.pop("max_connections", None) or 20
+            self._db = PooledPostgresqlDatabase(db_name, max_connections=max_connections, stale_timeout=300, **kwargs)
 
         proxy.initialize(self._db)
         self.db_manager.set_db(self._db)
         self.db_manager.set_dropped(drop_table)
 
+    @logging_error_handler
+    @validate_types(
+            dbtype=str,
+            dbfile=str|type(None),
+            user=str|type(None),
+            password=str|type(None),
+            host=str|type(None),
+            port=int|type(None),
+            name=str|type(None),
+            max_connections=int|type(None),
+            output=None)
+    def set_read_db(self, dbtype:str='sqlite', **kwargs):
+        r"""
+        Sets an optional database for read-only queries (trends, events, logs and alarm summary filters...),
+        writes keep going to the database defined in *set_db*.
+
+        **Parameters:**
+
+        * **dbtype** (str): 'sqlite', 'mysql' or 'postgresql'.
+        * **dbfile** (str): SQLite database file, the same file given to *set_db*, it's opened as a second read-only connection.
+        * **max_connections** (int): Size of the connection pool for MySQL and Postgres replicas, 20 by default.
+        * **kwargs**: Same attributes to a postgres connection.
+
+        It's also set by *connect_to_db* from the optional *read_replica* key of *db_config.json*.
+
+        **Returns:** `None`
+
+        Usage:
+
+        ```python
+        >>> app.set_db(dbtype="postgresql", name="app_db", user="admin", password="admin", host="primary", port=5432)
+        >>> app.set_read_db(dbtype="postgresql", name="app_db", user="admin", password="admin", host="replica", port=5432)
+        ```
+        """
+        from .dbmodels import proxy
+
+        if dbtype.lower()=='sqlite':
+
+            dbfile = kwargs.get("dbfile")
+
+            if not dbfile or dbfile==":memory:":
+
+                logging.warning("Read database: SQLite read connection needs a database file")
+                return
+
+            db = SqliteDatabase(dbfile, pragmas={
+                'journal_mode': 'wal',
+                'cache_size': -1024 * 64,  # 64MB
+                'query_only': 1}
+            )
+
+        elif dbtype.lower()=='mysql':
+
+            db_name = kwargs.pop('name')
+            max_connections = kwargs.pop("max_connections", None) or 20
+            db = PooledMySQLDatabase(db_name, max_connections=max_connections, stale_timeout=300, **kwargs)
+
+        elif dbtype.lower()=='postgresql':
+
+            db_name = kwargs.pop('name')
+            max_connections = kwargs.pop("max_connections", None) or 20
+            db = PooledPostgresqlDatabase(db_name, max_connections=max_connections, stale_timeout=300, **kwargs)
+
+        else:
+
+            return
+
+        proxy.set_read_db(db)
+
     @logging_error_handler
     @validate_types(
             dbtype=str, 
@@ -814,7 +959,10 @@ class PyAutomation(Singleton):
             
         if db_config:
             dbtype = db_config.pop("dbtype")
+            read_replica = db_config.pop("read_replica", None)
             self.set_db(dbtype=dbtype, **db_config)
+            if read_replica:
+                self.set_read_db(dbtype=read_replica.pop("dbtype", dbtype), **read_replica)
             self.db_manager.init_database()
             self.load_opcua_clients_from_db()
             self.load_db_to_cvt()
@@ -828,6 +976,9 @@ class PyAutomation(Singleton):
         r"""
         Documentation here
         """
+        from .dbmodels import proxy
+
+        proxy.set_read_db(None)
         self.db_manager.stop_database()
 
     @logging_error_handler
@@ -917,6 +1068,9 @@ class PyAutomation(Singleton):
             ack_timestamp=str|type(None),
             user=User|type(None),
             reload=bool,
+            deadband=float|int,
+            on_delay=float|int,
+            off_delay=float|int,
             output=(Alarm, str)
     )
     def create_alarm(
@@ -931,7 +1085,10 @@ class PyAutomation(Singleton):
             timestamp:str=None,
             ack_timestamp:str=None,
             user:User=None,
-            reload:bool=False
+            reload:bool=False,
+            deadband:float=0.0,
+            on_delay:float=0.0,
+            off_delay:float=0.0
         )->tuple[Alarm, str]:
         r"""
         Append alarm to the Alarm Manager
@@ -939,6 +1096,9 @@ class PyAutomation(Singleton):
         **Paramters**
 
         * **alarm**: (Alarm Object)
+        * **deadband** (float): Value change back from the trigger value needed to return to normal.
+        * **on_delay** (float): Seconds the value must stay abnormal before the alarm is triggered.
+        * **off_delay** (float): Seconds the value must stay normal before the alarm returns to normal.
 
         **Returns**
 
@@ -955,7 +1115,10 @@ class PyAutomation(Singleton):
             timestamp=timestamp,
             ack_timestamp=ack_timestamp,
             user=user,
-            reload=reload
+            reload=reload,
+            deadband=deadband,
+            on_delay=on_delay,
+            off_delay=off_delay
         )
 
         if alarm:
@@ -1078,6 +1241,76 @@ class PyAutomation(Singleton):
         """
         return self.alarm_manager.get_lasts_active_alarms(lasts=lasts)
 
+    @logging_error_handler
+    @validate_types(
+            threshold=int,
+            window=float|int,
+            operators=int,
+            refresh_interval=float|int,
+            write_period=float|int,
+            write_batch=int,
+            check_period=float|int,
+            output=None
+    )
+    def set_alarm_flood(
+            self,
+            threshold:int=10,
+            window:float=600.0,
+            operators:int=1,
+            refresh_interval:float=5.0,
+            write_period:float=5.0,
+            write_batch:int=5000,
+            check_period:float=10.0
+        )->None:
+        r"""
+        Configures the alarm flood mode, a flood starts when more than *threshold* alarms per operator are triggered
+        within *window* seconds.
+
+        During a flood the alarm summary is written in bigger batches every *write_period* seconds, the UI refreshes
+        every *refresh_interval* seconds and consequential alarms (see [set_alarm_parent](#set_alarm_parent)) are
+        suppressed.
+
+        **Parameters**
+
+        * **threshold** (int): Alarms per operator in *window*, ISA-18.2 considers 10 alarms per 10 minutes a flood.
+        * **window** (float): Seconds.
+        * **operators** (int): Operators sharing the alarm load.
+        * **refresh_interval** (float): Seconds.
+        * **write_period** (float): Seconds.
+        * **write_batch** (int): Alarm summary records per batch.
+        * **check_period** (float): Seconds between checks for the end of a flood.
+        """
+        self.alarm_manager.set_flood(
+            threshold=threshold,
+            window=window,
+            operators=operators,
+            refresh_interval=refresh_interval,
+            write_period=write_period,
+            write_batch=write_batch,
+            check_period=check_period
+        )
+
+    @logging_error_handler
+    @validate_types(name=str, parent=str|type(None), output=None)
+    def set_alarm_parent(self, name:str, parent:str=None)->None:
+        r"""
+        Sets *parent* as the parent alarm of *name*, during an alarm flood *name* is suppressed while *parent* is active.
+
+        **Parameters**
+
+        * **name** (str): Consequential alarm name.
+        * **parent** (str): Parent alarm name, None removes the relationship.
+        """
+        self.alarm_manager.set_parent(name=name, parent=parent)
+
+    @logging_error_handler
+    @validate_types(output=dict)
+    def get_alarm_flood_metrics(self)->dict:
+        r"""
+        Alarm flood state and metrics: alarm rate, floods count, peak rate, suppressed alarms
+        """
+        return self.alarm_manager.get_flood_metrics()
+
     @logging_error_handler
     @validate_types(name=str, output=Alarm)
     def get_alarm_by_name(self, name:str)->Alarm:
@@ -1143,7 +1376,9 @@ class PyAutomation(Singleton):
             priorities:list[int]=None,
             criticities:list[int]=None,
             greater_than_timestamp:datetime=None,
-            less_than_timestamp:datetime=None)->list:
+            less_than_timestamp:datetime=None,
+            limit:int=None,
+            cursor:int=None)->list:
         r"""
         Documentation here
         """
@@ -1154,7 +1389,9 @@ class PyAutomation(Singleton):
                 priorities=priorities,
                 criticities=criticities,
                 greater_than_timestamp=greater_than_timestamp,
-                less_than_timestamp=less_than_timestamp
+                less_than_timestamp=less_than_timestamp,
+                limit=limit,
+                cursor=cursor
             )
         
     # LOGS METHODS
@@ -1192,7 +1429,9 @@ class PyAutomation(Singleton):
             event_ids:list[int]=None,
             classifications:list[str]=None,
             greater_than_timestamp:datetime=None,
-            less_than_timestamp:datetime=None
+            less_than_timestamp:datetime=None,
+            limit:int=None,
+            cursor:int=None
         )->list:
         r"""
         Documentation here
@@ -1205,7 +1444,9 @@ class PyAutomation(Singleton):
                 event_ids=event_ids,
                 classifications=classifications,
                 greater_than_timestamp=greater_than_timestamp,
-                less_than_timestamp=less_than_timestamp
+                less_than_timestamp=less_than_timestamp,
+                limit=limit,
+                cursor=cursor
             )
         
     @logging_error_handler
@@ -1275,6 +1516,7 @@ class PyAutomation(Singleton):
 
         * LoggerWorker
         * AlarmWorker
+        * OPCUAClientWorker
         * StateMachineWorker
         """
         if self._create_tables:
@@ -1289,6 +1531,15 @@ class PyAutomation(Singleton):
             self.alarm_worker.daemon = True
             self.alarm_worker.start()
 
+            # Alarm delays and flood checks pending since the last stop
+            if len(alarm_manager.timer_wheel):
+
+                alarm_manager.timer_wheel.start()
+
+        self.opcua_client_worker = OPCUAClientWorker(self.opcua_client_manager)
+        self.opcua_client_worker.daemon = True
+        self.opcua_client_worker.start()
+
         self.machine.start(machines=machines)
         self.is_starting = False
 
@@ -1300,8 +1551,19 @@ class PyAutomation(Singleton):
         """
         try:
             self.machine.stop()
+            self.opcua_client_worker.stop()
             self.alarm_worker.stop()
+            self.alarm_manager.timer_wheel.stop()
             self.db_worker.stop()
+            self.logger_engine.write_blocks()
+
+            if self.archiver_worker:
+
+                self.archiver_worker.stop()
+
+            self.alarms_engine.writer.stop()
+            self.events_engine.writer.stop()
+            self.logs_engine.writer.stop()
         except Exception as e:
             message = "Error on wokers stop"
             log_detailed(e, message)
@@ -2,6 +2,7 @@ from .core import BaseModel, proxy
 from .tags import (
     Tags,
     TagValue,
+    TagValueBlock,
     Variables,
     Units,
     DataTypes
@@ -358,6 +358,11 @@ class AlarmSummary(BaseModel):
     alarm_time = TimestampField(utc=True)
     ack_time = TimestampField(utc=True, null=True)
 
+    class Meta:
+        indexes = (
+            (('alarm_time', 'id'), False),
+        )
+
     @classmethod
     def create(cls, name:str, state:str, timestamp:datetime, ack_timestamp:datetime=None):
         _alarm = Alarms.read_by_name(name=name)
@@ -373,6 +378,27 @@ class AlarmSummary(BaseModel):
                 
                 return query
 
+    @classmethod
+    def create_many(cls, rows:list[dict])->int:
+        r"""
+        Inserts several summary records in a single transaction.
+
+        **Parameters**
+
+        * **rows** (list[dict]): `{"alarm": Alarms.id, "state": AlarmStates.id, "alarm_time": datetime, "ack_time": datetime|None}`
+
+        **Returns**
+
+        * **int**: Number of inserted records
+        """
+        if rows:
+
+            with cls._meta.database.atomic():
+
+                cls.insert_many(rows).execute()
+
+        return len(rows)
+
     @classmethod
     def read_by_name(cls, name:str)->bool:
         r"""
@@ -447,41 +473,51 @@ class AlarmSummary(BaseModel):
         names:list[str]=None,
         tags:list[str]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
         r"""
-        Documentation here
+        Filters alarm summary records, newest first, with keyset pagination (see *BaseModel.paginate*)
+
+        **Parameters**
+
+        * **limit** (int): Maximum records, all of them if None.
+        * **cursor** (int): Id of the last record of the previous page.
+
+        **Returns**
+
+        * **list[dict]**: Serialized records
         """
+        conditions = list()
+
         if states:
-            subquery = AlarmStates.select(AlarmStates.id).where(AlarmStates.name.in_(states))
-            _query = cls.select().join(AlarmStates).where(AlarmStates.id.in_(subquery)).order_by(cls.id.desc())
+
+            conditions.append(cls.state.in_(AlarmStates.select(AlarmStates.id).where(AlarmStates.name.in_(states))))
 
         if names:
-            subquery = Alarms.select(Alarms.id).where(Alarms.name.in_(names))
-            if _query:
-                _query = _query.select().join(Alarms).where(Alarms.id.in_(subquery)).order_by(cls.id.desc())
-            else:
-                _query = cls.select().join(Alarms).where(Alarms.id.in_(subquery)).order_by(cls.id.desc())
+
+            conditions.append(cls.alarm.in_(Alarms.select(Alarms.id).where(Alarms.name.in_(names))))
 
         if tags:
-            subquery = Tags.select(Tags.id).where(Tags.name.in_(tags))
-            subquery = Alarms.select(Alarms.id).join(Tags).where(Tags.id.in_(subquery))
-            if _query:
-                _query = _query.select().join(Alarms).where(Alarms.id.in_(subquery)).order_by(cls.id.desc())
-            else:
-                _query = cls.select().join(Alarms).where(Alarms.id.in_(subquery)).order_by(cls.id.desc())
+
+            conditions.append(cls.alarm.in_(Alarms.select(Alarms.id).join(Tags).where(Tags.name.in_(tags))))
 
         if greater_than_timestamp:
-            if _query:
-                _query = _query.select().where(cls.alarm_time > greater_than_timestamp).order_by(cls.id.desc())
-            else:
-                _query = cls.select().where(cls.alarm_time > greater_than_timestamp).order_by(cls.id.desc())
+
+            conditions.append(cls.alarm_time > greater_than_timestamp)
 
         if less_than_timestamp:
-            if _query:
-                _query = _query.select().where(cls.alarm_time < less_than_timestamp).order_by(cls.id.desc())
-            else:
-                _query = cls.select().where(cls.alarm_time < less_than_timestamp).order_by(cls.id.desc())
+
+            conditions.append(cls.alarm_time < less_than_timestamp)
+
+        _query = cls.select(cls, Alarms, Tags, AlarmStates).join(Alarms).join(Tags).switch(cls).join(AlarmStates)
+
+        if conditions:
+
+            _query = _query.where(*conditions)
+
+        _query = cls.paginate(_query, timestamp=cls.alarm_time, limit=limit, cursor=cursor)
 
         return [alarm.serialize() for alarm in _query]
 
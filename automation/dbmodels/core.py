@@ -1,6 +1,74 @@
+import threading
+from contextlib import contextmanager
 from peewee import Proxy, Model
 
-proxy = Proxy()
+
+class RoutingProxy(Proxy):
+    r"""
+    Database proxy with optional read/write routing.
+
+    By default every query goes to the primary database given to *initialize*, if a read database is set
+    with *set_read_db* (a Postgres/MySQL replica or a read-only SQLite connection) the queries executed
+    inside the *reading* context of the current thread go to it instead.
+    """
+    __slots__ = ('obj', '_callbacks', 'read_obj', '_local')
+
+    def __init__(self):
+
+        self.read_obj = None
+        self._local = threading.local()
+        super(RoutingProxy, self).__init__()
+
+    def set_read_db(self, db):
+        r"""
+        Sets the database used by read queries, *None* routes them back to the primary database.
+        """
+        self.read_obj = db
+
+    def get_db(self, read:bool=False):
+        r"""
+        Documentation here
+        """
+        if read and self.read_obj is not None:
+
+            return self.read_obj
+
+        return self.obj
+
+    def is_reading(self)->bool:
+        r"""
+        Documentation here
+        """
+        return getattr(self._local, "reading", False)
+
+    @contextmanager
+    def reading(self):
+        r"""
+        Routes the queries of the current thread to the read database while the context is active.
+        """
+        previous = self.is_reading()
+        self._local.reading = True
+
+        try:
+
+            yield self.get_db(read=True)
+
+        finally:
+
+            self._local.reading = previous
+
+    def __getattr__(self, attr):
+
+        db = self.get_db(read=self.is_reading())
+
+        if db is None:
+
+            raise AttributeError('Cannot use uninitialized Proxy.')
+
+        return getattr(db, attr)
+
+
+proxy = RoutingProxy()
 
 SQLITE = 'sqlite'
 MYSQL = 'mysql'
@@ -82,5 +150,47 @@ class BaseModel(Model):
         """
         return True if cls.get_or_none(id=id) else False
 
+    @classmethod
+    def paginate(cls, query, timestamp, limit:int=None, cursor:int=None):
+        r"""
+        Keyset (cursor) pagination, newest records first.
+
+        Records are ordered by *(timestamp, id)* descending and the next page starts right after the record
+        whose id is *cursor* (the last record of the previous page), so every page costs an index range scan
+        no matter how deep it is, unlike OFFSET.
+
+        **Parameters**
+
+        * **query**: Model select query with the filters applied.
+        * **timestamp**: Model timestamp field.
+        * **limit** (int): Maximum records, all of them if None.
+        * **cursor** (int): Id of the last record of the previous page.
+
+        **Returns**
+
+        * **query**
+        """
+        if cursor is not None:
+
+            last = cls.select(cls.id, timestamp).where(cls.id==cursor).get_or_none()
+
+            if last:
+
+                last_timestamp = getattr(last, timestamp.name)
+                query = query.where((timestamp < last_timestamp) | ((timestamp == last_timestamp) & (cls.id < last.id)))
+
+            else:
+
+                # The cursor record was deleted, ids keep the insertion order
+                query = query.where(cls.id < cursor)
+
+        query = query.order_by(timestamp.desc(), cls.id.desc())
+
+        if limit is not None:
+
+            query = query.limit(limit)
+
+        return query
+
     class Meta:
         database = proxy
\ No newline at end of file
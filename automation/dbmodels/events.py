@@ -1,7 +1,7 @@
 from peewee import CharField, DateTimeField, ForeignKeyField, IntegerField
 from ..dbmodels.core import BaseModel
 from datetime import datetime
-from .users import Users
+from .users import Roles, Users
 from ..modules.users.users import User
 
 DATETIME_FORMAT = "%m/%d/%Y, %H:%M:%S.%f"
@@ -13,10 +13,15 @@ class Events(BaseModel):
     message = CharField(max_length=256)
     description = CharField(max_length=256, null=True)
     classification = CharField(max_length=128, null=True)
-    priority = IntegerField(null=True)
-    criticity = IntegerField(null=True)
+    priority = IntegerField(null=True, index=True)
+    criticity = IntegerField(null=True, index=True)
     user = ForeignKeyField(Users, backref='events', on_delete='CASCADE')
 
+    class Meta:
+        indexes = (
+            (('timestamp', 'id'), False),
+        )
+
     @classmethod
     def create(
         cls, 
@@ -56,6 +61,55 @@ class Events(BaseModel):
 
         return query, f"Event creation successful"
     
+    @classmethod
+    def create_many(cls, records:list[dict])->int:
+        r"""
+        Inserts several events in a single transaction, records with an unknown user are skipped.
+
+        **Parameters**
+
+        * **records** (list[dict]): Same keyword arguments of *create*
+
+        **Returns**
+
+        * **int**: Number of inserted events
+        """
+        users = dict()
+        rows = list()
+        for record in records:
+
+            user = record["user"]
+
+            if not isinstance(user, User):
+
+                continue
+
+            if user.username not in users:
+
+                users[user.username] = Users.read_by_username(username=user.username)
+
+            if users[user.username] is None:
+
+                continue
+
+            rows.append({
+                "message": record["message"],
+                "user": users[user.username],
+                "description": record.get("description"),
+                "classification": record.get("classification"),
+                "priority": record.get("priority"),
+                "criticity": record.get("criticity"),
+                "timestamp": record.get("timestamp") or datetime.now()
+            })
+
+        if rows:
+
+            with cls._meta.database.atomic():
+
+                cls.insert_many(rows).execute()
+
+        return len(rows)
+
     @classmethod
     def read_lasts(cls, lasts:int=1):
         r"""
@@ -72,53 +126,50 @@ class Events(BaseModel):
         priorities:list[int]=None,
         criticities:list[int]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None):
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None):
         r"""
-        Documentation here
+        Filters events, newest first, with keyset pagination (see *BaseModel.paginate*)
+
+        **Parameters**
+
+        * **limit** (int): Maximum events, all of them if None.
+        * **cursor** (int): Id of the last event of the previous page.
+
+        **Returns**
+
+        * **list[dict]**: Serialized events
         """
+        conditions = list()
+
         if usernames:
             
-            subquery = Users.select(Users.id).where(Users.username.in_(usernames))
-            _query = cls.select().join(Users).where(Users.id.in_(subquery)).order_by(cls.id.desc())
+            conditions.append(cls.user.in_(Users.select(Users.id).where(Users.username.in_(usernames))))
 
         if priorities:
 
-            if _query:
-
-                _query = _query.select().where(cls.in_(priorities)).order_by(cls.id.desc())
-
-            else:
-                _query = cls.select().where(cls.in_(priorities)).order_by(cls.id.desc())
+            conditions.append(cls.priority.in_(priorities))
 
         if criticities:
 
-            if _query:
-
-                _query = _query.select().where(cls.in_(criticities)).order_by(cls.id.desc())
-
-            else:
-                _query = cls.select().where(cls.in_(criticities)).order_by(cls.id.desc())
+            conditions.append(cls.criticity.in_(criticities))
 
         if greater_than_timestamp:
-            
-            if _query:
 
-                _query = _query.select().where(cls.timestamp > greater_than_timestamp).order_by(cls.id.desc())
-
-            else:
-
-                _query = cls.select().where(cls.timestamp > greater_than_timestamp).order_by(cls.id.desc())
+            conditions.append(cls.timestamp > greater_than_timestamp)
 
         if less_than_timestamp:
-            
-            if _query:
 
-                _query = _query.select().where(cls.timestamp < less_than_timestamp).order_by(cls.id.desc())
+            conditions.append(cls.timestamp < less_than_timestamp)
+
+        _query = cls.select(cls, Users, Roles).join(Users).join(Roles)
 
-            else:
+        if conditions:
 
-                _query = cls.select().where(cls.timestamp < less_than_timestamp).order_by(cls.id.desc())
+            _query = _query.where(*conditions)
 
+        _query = cls.paginate(_query, timestamp=cls.timestamp, limit=limit, cursor=cursor)
 
         return [event.serialize() for event in _query]
     
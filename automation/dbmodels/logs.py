@@ -1,7 +1,7 @@
 from peewee import CharField, DateTimeField, ForeignKeyField
 from ..dbmodels.core import BaseModel
 from datetime import datetime
-from .users import Users
+from .users import Roles, Users
 from .events import Events
 from .alarms import AlarmSummary, Alarms
 from ..modules.users.users import User
@@ -14,11 +14,16 @@ class Logs(BaseModel):
     timestamp = DateTimeField()
     message = CharField(max_length=256)
     description = CharField(max_length=256, null=True)
-    classification = CharField(max_length=128, null=True)
+    classification = CharField(max_length=128, null=True, index=True)
     user = ForeignKeyField(Users, backref='logs', on_delete='CASCADE')
     alarm = ForeignKeyField(AlarmSummary, null=True, backref='logs', on_delete='CASCADE')
     event = ForeignKeyField(Events, null=True, backref='logs', on_delete='CASCADE')
 
+    class Meta:
+        indexes = (
+            (('timestamp', 'id'), False),
+        )
+
     @classmethod
     def create(
         cls, 
@@ -58,6 +63,59 @@ class Logs(BaseModel):
 
         return query, f"Event creation successful"
     
+    @classmethod
+    def create_many(cls, records:list[dict])->int:
+        r"""
+        Inserts several logs in a single transaction, records with an unknown user are skipped.
+
+        **Parameters**
+
+        * **records** (list[dict]): Same keyword arguments of *create*
+
+        **Returns**
+
+        * **int**: Number of inserted logs
+        """
+        users = dict()
+        event_ids = {record.get("event_id") for record in records if record.get("event_id")}
+        alarm_ids = {record.get("alarm_summary_id") for record in records if record.get("alarm_summary_id")}
+        event_ids = {event.id for event in Events.select(Events.id).where(Events.id.in_(list(event_ids)))} if event_ids else set()
+        alarm_ids = {alarm.id for alarm in AlarmSummary.select(AlarmSummary.id).where(AlarmSummary.id.in_(list(alarm_ids)))} if alarm_ids else set()
+        rows = list()
+        for record in records:
+
+            user = record["user"]
+
+            if not isinstance(user, User):
+
+                continue
+
+            if user.username not in users:
+
+                users[user.username] = Users.read_by_username(username=user.username)
+
+            if users[user.username] is None:
+
+                continue
+
+            rows.append({
+                "message": record["message"],
+                "user": users[user.username],
+                "description": record.get("description"),
+                "classification": record.get("classification"),
+                "timestamp": record.get("timestamp") or datetime.now(),
+                "event": record.get("event_id") if record.get("event_id") in event_ids else None,
+                "alarm": record.get("alarm_summary_id") if record.get("alarm_summary_id") in alarm_ids else None
+            })
+
+        if rows:
+
+            with cls._meta.database.atomic():
+
+                cls.insert_many(rows).execute()
+
+        return len(rows)
+
     @classmethod
     def read_lasts(cls, lasts:int=1):
         r"""
@@ -75,60 +133,58 @@ class Logs(BaseModel):
         event_ids:list[int]=None,
         classifications:list[str]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
         r"""
-        Documentation here
+        Filters logs, newest first, with keyset pagination (see *BaseModel.paginate*)
+
+        **Parameters**
+
+        * **limit** (int): Maximum logs, all of them if None.
+        * **cursor** (int): Id of the last log of the previous page.
+
+        **Returns**
+
+        * **list[dict]**: Serialized logs
         """
+        conditions = list()
+
         if usernames:
-            subquery = Users.select(Users.id).where(Users.username.in_(usernames))
-            _query = cls.select().join(Users).where(Users.id.in_(subquery)).order_by(cls.id.desc())
+
+            conditions.append(cls.user.in_(Users.select(Users.id).where(Users.username.in_(usernames))))
 
         if event_ids:
 
-            subquery = Events.select(Events.id).where(Events.id.in_(event_ids))
-            if _query:
-                _query = _query.select().join(Events).where(cls.in_(subquery)).order_by(cls.id.desc())
-            else:
-                _query = cls.select().join(Events).where(cls.in_(subquery)).order_by(cls.id.desc())
+            conditions.append(cls.event.in_(event_ids))
 
         if alarm_names:
-            subquery = Alarms.select(Alarms.id).where(Alarms.name.in_(alarm_names))
-            subquery = subquery.select().join(Alarms).where(Alarms.id.in_(subquery)).order_by(AlarmSummary.id.desc())
-            if _query:
-                _query = _query.select().join(AlarmSummary).where(cls.in_(subquery)).order_by(cls.id.desc())
-            else:
-                _query = cls.select().join(AlarmSummary).where(cls.in_(subquery)).order_by(cls.id.desc())
+
+            subquery = AlarmSummary.select(AlarmSummary.id).join(Alarms).where(Alarms.name.in_(alarm_names))
+            conditions.append(cls.alarm.in_(subquery))
 
         if classifications:
             
-            if _query:
-                _query = _query.select().where(cls.in_(classifications)).order_by(cls.id.desc())
-            else:
-                _query = cls.select().where(cls.in_(classifications)).order_by(cls.id.desc())
+            conditions.append(cls.classification.in_(classifications))
 
         if greater_than_timestamp:
-            
-            if _query:
 
-                _query = _query.select().where(cls.timestamp > greater_than_timestamp).order_by(cls.id.desc())
-
-            else:
-
-                _query = cls.select().where(cls.timestamp > greater_than_timestamp).order_by(cls.id.desc())
+            conditions.append(cls.timestamp > greater_than_timestamp)
 
         if less_than_timestamp:
-            
-            if _query:
 
-                _query = _query.select().where(cls.timestamp < less_than_timestamp).order_by(cls.id.desc())
+            conditions.append(cls.timestamp < less_than_timestamp)
+
+        _query = cls.select(cls, Users, Roles).join(Users).join(Roles)
 
-            else:
+        if conditions:
 
-                _query = cls.select().where(cls.timestamp < less_than_timestamp).order_by(cls.id.desc())
+            _query = _query.where(*conditions)
 
+        _query = cls.paginate(_query, timestamp=cls.timestamp, limit=limit, cursor=cursor)
 
-        return [event.serialize() for event in _query]
+        return [log.serialize() for log in _query]
 
     def serialize(self)-> dict:
 
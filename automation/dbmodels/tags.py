@@ -1,4 +1,4 @@
-from peewee import CharField, BooleanField, FloatField, ForeignKeyField, IntegerField, fn, TimestampField, BooleanField
+from peewee import CharField, BooleanField, FloatField, ForeignKeyField, IntegerField, fn, TimestampField, BooleanField, BigIntegerField, BlobField, MySQLDatabase
 from .core import BaseModel
 from datetime import datetime
 
@@ -653,6 +653,11 @@ class TagValue(BaseModel):
     value = FloatField()
     timestamp = TimestampField(utc=True)
 
+    class Meta:
+        indexes = (
+            (('tag', 'timestamp'), False),
+        )
+
     @classmethod
     def create(
         cls, 
@@ -669,4 +674,47 @@ class TagValue(BaseModel):
             timestamp=timestamp,
             unit=unit
             )
-        query.save()
\ No newline at end of file
+        query.save()
+
+
+class TagValueBlock(BaseModel):
+    r"""
+    Compressed historian block, the samples of one tag over *span* seconds (one minute by default) in a single row.
+
+    *data* holds the timestamps (milliseconds) and values encoded with [Gorilla](../utils/gorilla.py) compression,
+    *start* and *stop* (milliseconds) bound the block for range queries.
+    """
+    tag = ForeignKeyField(Tags, backref='blocks')
+    unit = ForeignKeyField(Units, backref='blocks')
+    start = BigIntegerField()
+    stop = BigIntegerField()
+    count = IntegerField()
+    data = BlobField()
+
+    class Meta:
+        indexes = (
+            (('tag', 'start'), True),
+        )
+
+    @classmethod
+    def upsert(cls, tag:int, unit:int, start:int, stop:int, count:int, data:bytes):
+        r"""
+        Creates or replaces the block of *tag* starting at *start*
+        """
+        query = cls.insert(tag=tag, unit=unit, start=start, stop=stop, count=count, data=data)
+        preserve = [cls.unit, cls.stop, cls.count, cls.data]
+
+        if isinstance(cls._meta.database.get_db(), MySQLDatabase):
+
+            query.on_conflict(preserve=preserve).execute()
+
+        else:
+
+            query.on_conflict(conflict_target=[cls.tag, cls.start], preserve=preserve).execute()
+
+    @classmethod
+    def read_by_range(cls, tag:int, start:int, stop:int):
+        r"""
+        Documentation here
+        """
+        return cls.select().where((cls.tag==tag) & (cls.stop >= start) & (cls.start <= stop)).order_by(cls.start.asc())
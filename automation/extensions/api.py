@@ -1,8 +1,8 @@
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 from flask_restx import Api as API
 from ..singleton import Singleton
 from functools import wraps
-import logging, jwt
+import logging, jwt, json
 from ..modules.users.users import Users as CVTUsers
 
 
@@ -127,4 +127,47 @@ class Api(Singleton):
 
             return users.get_active_user(token=token)
 
-        return None
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def stream_pages(fetch, limit:int=None, cursor:int=None, page_size:int=500)->Response:
+        r"""
+        Streams a keyset paginated query as a JSON response `{"data": [...], "next_cursor": int|None}`.
+
+        Records are fetched *page_size* at a time and written to the response as they come, so the server
+        never holds more than a page in memory, *next_cursor* is the cursor of the page after this one,
+        None when there are no more records.
+
+        **Parameters**
+
+        * **fetch** (callable): fetch(limit, cursor) -> list[dict], serialized records with their *id*.
+        * **limit** (int): Maximum records in the response, all of them if None.
+        * **cursor** (int): Id of the last record of the previous response.
+        * **page_size** (int): Records per database query.
+        """
+        def generate(cursor):
+
+            yield '{"data": ['
+            sent = 0
+            next_cursor = None
+
+            while limit is None or sent < limit:
+
+                size = page_size if limit is None else min(page_size, limit - sent)
+                records = fetch(limit=size, cursor=cursor) or list()
+
+                for record in records:
+
+                    yield ("," if sent else "") + json.dumps(record, default=str)
+                    sent += 1
+
+                if len(records) < size:
+
+                    next_cursor = None
+                    break
+
+                cursor = next_cursor = records[-1]["id"]
+
+            yield f'], "next_cursor": {json.dumps(next_cursor)}}}'
+
+        return Response(stream_with_context(generate(cursor)), mimetype="application/json")
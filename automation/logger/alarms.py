@@ -4,16 +4,79 @@
 from datetime import datetime
 from ..dbmodels import Alarms, AlarmSummary, AlarmTypes, AlarmStates
 from .core import BaseEngine, BaseLogger
+from .writer import BatchWriter, PendingRecord
 from ..alarms.trigger import TriggerType
 from ..alarms.states import AlarmState
 from ..utils.decorators import logging_error_handler, validate_types
 
 
 class AlarmsLogger(BaseLogger):
+    r"""
+    Alarms database logger.
+
+    Alarms and alarm states primary keys are cached by name, so writing an alarm summary record doesn't need
+    to look them up in the database, the cache is updated when alarms are created, updated or deleted through this logger.
+    """
 
     def __init__(self):
 
         super(AlarmsLogger, self).__init__()
+        self._alarm_ids = dict()
+        self._state_ids = dict()
+
+    def set_db(self, db):
+        r"""
+        Documentation here
+        """
+        super(AlarmsLogger, self).set_db(db)
+        self.clear_cache()
+
+    def clear_cache(self):
+        r"""
+        Clears the alarms and alarm states primary keys cache
+        """
+        self._alarm_ids.clear()
+        self._state_ids.clear()
+
+    def __get_alarm_id(self, name:str)->int|None:
+        r"""
+        Documentation here
+        """
+        if name not in self._alarm_ids:
+
+            alarm = Alarms.read_by_name(name=name)
+
+            if not alarm:
+
+                return None
+
+            self._alarm_ids[name] = alarm.id
+
+        return self._alarm_ids[name]
+
+    def __get_state_id(self, name:str)->int|None:
+        r"""
+        Documentation here
+        """
+        if name not in self._state_ids:
+
+            state = AlarmStates.read_by_name(name=name)
+
+            if not state:
+
+                return None
+
+            self._state_ids[name] = state.id
+
+        return self._state_ids[name]
+
+    def __uncache_alarm(self, alarm:Alarms):
+        r"""
+        Documentation here
+        """
+        for name in [name for name, id in self._alarm_ids.items() if id==alarm.id]:
+
+            self._alarm_ids.pop(name)
 
     @logging_error_handler
     def create_tables(self, tables):
@@ -26,6 +89,7 @@ class AlarmsLogger(BaseLogger):
         
         self._db.create_tables(tables, safe=True)
         self.__init_default_alarms_schema()
+        self.clear_cache()
 
     @logging_error_handler
     def __init_default_alarms_schema(self):
@@ -68,6 +132,10 @@ class AlarmsLogger(BaseLogger):
                 description=description
             )
 
+            if query:
+
+                self._alarm_ids[name] = query.id
+
     @logging_error_handler
     def get_alarms(self):
         r"""
@@ -110,7 +178,9 @@ class AlarmsLogger(BaseLogger):
             names:list[str]=None,
             tags:list[str]=None,
             greater_than_timestamp:datetime=None,
-            less_than_timestamp:datetime=None
+            less_than_timestamp:datetime=None,
+            limit:int=None,
+            cursor:int=None
         ):
         r"""
         Documentation here
@@ -122,7 +192,9 @@ class AlarmsLogger(BaseLogger):
                 names=names,
                 tags=tags,
                 greater_than_timestamp=greater_than_timestamp,
-                less_than_timestamp=less_than_timestamp
+                less_than_timestamp=less_than_timestamp,
+                limit=limit,
+                cursor=cursor
             )
         
         return list()
@@ -155,6 +227,7 @@ class AlarmsLogger(BaseLogger):
             id=alarm.id,
             **fields
         )
+        self.__uncache_alarm(alarm)
 
         return query
 
@@ -163,9 +236,13 @@ class AlarmsLogger(BaseLogger):
         r"""
         Documentation here
         """
-        # alarm = Alarms.read_by_identifier(identifier=id)
+        alarm = Alarms.read_by_identifier(identifier=id)
         Alarms.delete().where(Alarms.identifier==id)
 
+        if alarm:
+
+            self.__uncache_alarm(alarm)
+
     @logging_error_handler
     def create_record_on_alarm_summary(self, name:str, state:str, timestamp:datetime, ack_timestamp:datetime=None):
         r"""
@@ -173,7 +250,42 @@ class AlarmsLogger(BaseLogger):
         """
         if self.get_db():
             
-            AlarmSummary.create(name=name, state=state, timestamp=timestamp, ack_timestamp=ack_timestamp)
+            return self.create_many(records=[PendingRecord(name=name, state=state, timestamp=timestamp, ack_timestamp=ack_timestamp)])
+
+    @logging_error_handler
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Writes alarm summary records in a single transaction, records of unknown alarms or states are skipped.
+
+        **Parameters**
+
+        * **records** (list[PendingRecord]): fields *name*, *state*, *timestamp* and *ack_timestamp*
+
+        **Returns**
+
+        * **int**: Number of written records
+        """
+        if self.get_db():
+
+            rows = list()
+
+            for record in records:
+
+                alarm_id = self.__get_alarm_id(name=record.fields["name"])
+                state_id = self.__get_state_id(name=record.fields["state"])
+
+                if alarm_id is None or state_id is None:
+
+                    continue
+
+                rows.append({
+                    "alarm": alarm_id,
+                    "state": state_id,
+                    "alarm_time": record.fields["timestamp"],
+                    "ack_time": record.fields.get("ack_timestamp")
+                })
+
+            return AlarmSummary.create_many(rows=rows)
 
     @logging_error_handler
     def get_alarm_summary(self):
@@ -197,6 +309,7 @@ class AlarmsLoggerEngine(BaseEngine):
 
         super(AlarmsLoggerEngine, self).__init__()
         self.logger = AlarmsLogger()
+        self.writer = BatchWriter(name="AlarmsWriter", write=self.create_many)
 
     @logging_error_handler
     def create(
@@ -227,6 +340,7 @@ class AlarmsLoggerEngine(BaseEngine):
         lasts:int=1
         ):
 
+        self.writer.flush()
         _query = dict()
         _query["action"] = "get_lasts"
         _query["parameters"] = dict()
@@ -256,37 +370,59 @@ class AlarmsLoggerEngine(BaseEngine):
     @logging_error_handler
     def filter_alarm_summary_by(
         self,
-        usernames:list[str]=None,
-        priorities:list[int]=None,
-        criticities:list[int]=None,
+        states:list[str]=None,
+        names:list[str]=None,
+        tags:list[str]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
 
+        self.writer.flush()
         _query = dict()
         _query["action"] = "filter_alarm_summary_by"
         _query["parameters"] = dict()
-        _query["parameters"]["usernames"] = usernames
-        _query["parameters"]["priorities"] = priorities
-        _query["parameters"]["criticities"] = criticities
+        _query["parameters"]["states"] = states
+        _query["parameters"]["names"] = names
+        _query["parameters"]["tags"] = tags
         _query["parameters"]["greater_than_timestamp"] = greater_than_timestamp
         _query["parameters"]["less_than_timestamp"] = less_than_timestamp
+        _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
     
     @logging_error_handler
-    def create_record_on_alarm_summary(self, name:str, state:str, timestamp:datetime, ack_timestamp:datetime=None):
+    def create_record_on_alarm_summary(self, name:str, state:str, timestamp:datetime, ack_timestamp:datetime=None)->PendingRecord:
+        r"""
+        Queues the alarm summary record, it's written into the database in the next batch of the alarms writer,
+        so alarm state transitions never wait for the database.
+        """
+        if not self.get_db():
 
+            return None
+
+        return self.writer.put(PendingRecord(name=name, state=state, timestamp=timestamp, ack_timestamp=ack_timestamp))
+
+    @logging_error_handler
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Documentation here
+        """
         _query = dict()
-        _query["action"] = "create_record_on_alarm_summary"
+        _query["action"] = "create_many"
         _query["parameters"] = dict()
-        _query["parameters"]["name"] = name
-        _query["parameters"]["state"] = state
-        _query["parameters"]["timestamp"] = timestamp
-        _query["parameters"]["ack_timestamp"] = ack_timestamp
-        
+        _query["parameters"]["records"] = records
+
         return self.query(_query)
 
+    def flush(self)->bool:
+        r"""
+        Writes the queued alarm summary records now
+        """
+        return self.writer.flush()
+
     @logging_error_handler
     def put(
         self,
@@ -297,6 +433,7 @@ class AlarmsLoggerEngine(BaseEngine):
         alarm_type:str=None,
         trigger_value:str=None
         ):
+        self.writer.flush()
         _query = dict()
         _query["action"] = "put"
         _query["parameters"] = dict()
@@ -314,6 +451,7 @@ class AlarmsLoggerEngine(BaseEngine):
         r"""
         Documentation here
         """
+        self.writer.flush()
         _query = dict()
         _query["action"] = "delete"
         _query["parameters"] = dict()
@@ -325,6 +463,7 @@ class AlarmsLoggerEngine(BaseEngine):
         r"""
         Documentation here
         """
+        self.writer.flush()
         _query = dict()
         _query["action"] = "get_alarm_summary"
         _query["parameters"] = dict()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""automation/logger/archive.py
+
+This module implements the cold storage tier of the historian, tag values older than some days are
+moved from the database into Parquet files on local disk.
+"""
+import os, zlib, threading
+from datetime import date, datetime, timezone
+
+
+class Archive:
+    r"""
+    Parquet archive of *TagValue* rows, partitioned by day (hive style) and tag group.
+
+    ```
+    {folder}/day=2024-01-01/group=03.parquet
+    ```
+
+    A tag belongs to the group *crc32(tag name) % groups*, so a day of archived data is *groups* files at most
+    and a tag is always in the same file name. Rows are sorted by (tag, timestamp) so the Parquet row group
+    statistics let pyarrow skip the row groups out of the queried range (predicate pushdown), days out of
+    the range are skipped by their folder name.
+
+    It requires *pyarrow*, it's imported when the archive is used.
+
+    **Parameters**
+
+    * **folder** (str): Archive folder.
+    * **groups** (int): Tag groups per day.
+    """
+
+    def __init__(self, folder:str, groups:int=16):
+        r"""
+        Documentation here
+        """
+        self.folder = folder
+        self.groups = groups
+        self._lock = threading.Lock()
+
+    def get_group(self, tag:str)->int:
+        r"""
+        Documentation here
+        """
+        return zlib.crc32(tag.encode()) % self.groups
+
+    def get_path(self, day:date, group:int)->str:
+        r"""
+        Documentation here
+        """
+        return os.path.join(self.folder, f"day={day.isoformat()}", f"group={group:02d}.parquet")
+
+    def schema(self):
+        r"""
+        Documentation here
+        """
+        import pyarrow
+
+        return pyarrow.schema([
+            ("tag", pyarrow.string()),
+            ("timestamp", pyarrow.timestamp("ms", tz="UTC")),
+            ("value", pyarrow.float64()),
+            ("unit", pyarrow.string())
+        ])
+
+    def write(self, day:date, group:int, rows:list)->int:
+        r"""
+        Writes the rows of a tag group and day, merged with the rows already archived in its file (a row
+        archived twice, after a crash between writing the file and deleting the rows, is kept once).
+
+        The file is written next to the old one and renamed over it, a crash never leaves a partial file.
+
+        **Parameters**
+
+        * **day** (date): UTC day.
+        * **group** (int): Tag group.
+        * **rows** (list[tuple]): (tag, timestamp (UTC datetime), value, unit)
+
+        **Returns**
+
+        * **int**: Number of rows in the file
+        """
+        import pyarrow
+        import pyarrow.parquet as parquet
+
+        path = self.get_path(day=day, group=group)
+        samples = dict()
+
+        with self._lock:
+
+            if os.path.exists(path):
+
+                for tag, timestamp, value, unit in zip(*parquet.read_table(path).to_pydict().values()):
+
+                    samples[(tag, timestamp)] = value, unit
+
+            for tag, timestamp, value, unit in rows:
+
+                samples[(tag, timestamp.replace(tzinfo=timezone.utc) if timestamp.tzinfo is None else timestamp)] = value, unit
+
+            keys = sorted(samples)
+            table = pyarrow.table({
+                "tag": [tag for tag, _ in keys],
+                "timestamp": [timestamp for _, timestamp in keys],
+                "value": [samples[key][0] for key in keys],
+                "unit": [samples[key][1] for key in keys]
+            }, schema=self.schema())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            parquet.write_table(table, f"{path}.tmp", row_group_size=64 * 1024)
+            os.replace(f"{path}.tmp", path)
+
+        return len(keys)
+
+    def iter_values(self, tag:str, start:float, stop:float, batch_size:int=64 * 1024):
+        r"""
+        Yields the archived values of *tag* in (start, stop), timestamps in seconds.
+
+        Only the files of the tag group for the days in the range are opened, and they're scanned in record
+        batches with the tag and timestamp filter pushed down, so only the row groups that may hold matching
+        rows are read.
+
+        **Yields**
+
+        * **tuple**: (timestamp (seconds), value, unit) sorted by timestamp
+        """
+        _start = datetime.fromtimestamp(start, tz=timezone.utc)
+        _stop = datetime.fromtimestamp(stop, tz=timezone.utc)
+        paths = [self.get_path(day=day, group=self.get_group(tag)) for day in self.get_days() if _start.date() <= day <= _stop.date()]
+        paths = [path for path in paths if os.path.exists(path)]
+
+        if not paths:
+
+            return
+
+        import pyarrow
+        import pyarrow.dataset as dataset
+
+        _type = pyarrow.timestamp("ms", tz="UTC")
+        condition = (
+            (dataset.field("tag") == tag) &
+            (dataset.field("timestamp") > pyarrow.scalar(_start, type=_type)) &
+            (dataset.field("timestamp") < pyarrow.scalar(_stop, type=_type))
+        )
+
+        for path in paths:
+
+            file = dataset.dataset(path, format="parquet", schema=self.schema())
+
+            for batch in file.to_batches(columns=["timestamp", "value", "unit"], filter=condition, batch_size=batch_size, use_threads=False):
+
+                for timestamp, value, unit in zip(*batch.to_pydict().values()):
+
+                    yield timestamp.timestamp(), value, unit
+
+    def get_days(self)->list[date]:
+        r"""
+        Archived days
+        """
+        if not os.path.isdir(self.folder):
+
+            return list()
+
+        return sorted(date.fromisoformat(name[len("day="):]) for name in os.listdir(self.folder) if name.startswith("day="))
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        days = self.get_days()
+
+        return {
+            "folder": self.folder,
+            "groups": self.groups,
+            "days": len(days),
+            "first_day": days[0].isoformat() if days else None,
+            "last_day": days[-1].isoformat() if days else None
+        }
@@ -1,6 +1,9 @@
 import threading, logging
+from contextlib import contextmanager
+from playhouse.pool import PooledDatabase
 from ..singleton import Singleton
 from ..dbmodels import (
+    proxy,
     Variables, 
     Units,
     DataTypes
@@ -80,17 +83,24 @@ class BaseLogger(Singleton):
 
 class BaseEngine(Singleton):
     r"""
-    Alarms logger Engine class for Tag thread-safe database logging.
+    Logger Engine base class for thread-safe database logging.
+
+    Read actions (*get_*, *read_*, *filter_*) run concurrently, each thread on its own database connection.
+    Write actions of the same engine are serialized by a write lock, so rows written to its tables keep their order,
+    while writes of different engines (historian, alarms, events...) don't wait for each other.
+
+    With a pooled database (*PooledPostgresqlDatabase*, *PooledMySQLDatabase*) every query borrows a connection from
+    the pool and gives it back when done.
+
+    If a read database is configured (see *PyAutomation.set_read_db*) read actions are routed to it.
     """
     logger = BaseLogger()
+    READ_ACTIONS = ("get_", "read_", "filter_")
 
     def __init__(self):
 
         super(BaseEngine, self).__init__()
-        self._request_lock = threading.Lock()
-        self._response_lock = threading.Lock()
-        self._response = None
-        self._response_lock.acquire()
+        self._write_lock = threading.RLock()
 
     def set_db(self, db):
         r"""
@@ -128,36 +138,52 @@ class BaseEngine(Singleton):
         """
         return self.logger.get_db()
 
+    def is_read_action(self, action:str)->bool:
+        r"""
+        Documentation here
+        """
+        return action.startswith(self.READ_ACTIONS)
+
     def query(self, query:dict)->dict:
         r"""
         Documentation here
         """
-        self.request(query)
-        result = self.response()
+        if self.is_read_action(query["action"]):
+
+            with proxy.reading():
+
+                result = self.request(query)
+
+        else:
+
+            with self._write_lock:
+
+                result = self.request(query)
+
         if result["result"]:
             return result["response"]
 
-    def request(self, query:dict):
-        r"""Documentation here
+    def request(self, query:dict)->dict:
+        r"""
+        Executes *query* on the logger
 
         # Parameters
 
-        - 
+        - query (dict): {"action": logger method name, "parameters": method kwargs}
 
         # Returns
 
-        - 
+        - dict: {"result": bool, "response": method result}
         """
-        self._request_lock.acquire()
         action = query["action"]
         error_msg = f"Error in BaseEngine: {action}"
 
         try:
 
-            if hasattr(self.logger, action):
+            method = getattr(self.logger, action)
+
+            with self.connection():
 
-                method = getattr(self.logger, action)
-                
                 if 'parameters' in query:
                     
                     resp = method(**query["parameters"])
@@ -166,61 +192,62 @@ class BaseEngine(Singleton):
 
                     resp = method()
 
-            self.__true_response(resp)
+            return self.__true_response(resp)
 
         except Exception as e:
 
-            self.__log_error(e, error_msg)
-
-        self._response_lock.release()
+            return self.__log_error(e, error_msg)
 
-    def __log_error(self, e:Exception, msg:str):
+    @contextmanager
+    def connection(self):
         r"""
-        Documentation here
+        Borrows a connection from the pool of the database in use (read or primary) for the current thread if it's
+        pooled and the thread has no open connection yet, it's given back to the pool on exit.
         """
-        logging.error(f"{e} Message: {msg}")
-        self._response = {
-            "result": False,
-            "response": None
-        }
+        db = proxy.get_db(read=True) if proxy.is_reading() else self.get_db()
 
-    def response(self):
-        r"""Documentation here
+        if not isinstance(db, PooledDatabase) or not db.is_closed():
 
-        # Parameters
+            yield
+            return
 
-        - 
+        db.connect()
 
-        # Returns
+        try:
+
+            yield
+
+        finally:
 
-        - 
+            db.close()
+
+    def __log_error(self, e:Exception, msg:str)->dict:
+        r"""
+        Documentation here
         """
-        self._response_lock.acquire()
-        result = self._response
-        self._request_lock.release()
-        return result
+        logging.error(f"{e} Message: {msg}")
+        
+        return {
+            "result": False,
+            "response": None
+        }
     
-    def __true_response(self, resp):
+    def __true_response(self, resp)->dict:
         r"""
         Documentation here
         """
-        self._response = {
+        return {
             "result": True,
             "response": resp
         }
 
     def __getstate__(self):
 
-        self._response_lock.release()
         state = self.__dict__.copy()
-        del state['_request_lock']
-        del state['_response_lock']
+        del state['_write_lock']
         return state
 
     def __setstate__(self, state):
         
         self.__dict__.update(state)
-        self._request_lock = threading.Lock()
-        self._response_lock = threading.Lock()
-
-        self._response_lock.acquire()
+        self._write_lock = threading.RLock()
@@ -4,15 +4,19 @@
 This module implements a database logger for the CVT instance, 
 will create a time-serie for each tag in a short memory data base.
 """
-import logging, sys, os, pytz
-from datetime import datetime
+import logging, sys, os, pytz, io, csv, calendar, heapq, threading, time
+from datetime import datetime, date, timedelta, timezone
+from peewee import OperationalError, InterfaceError, PostgresqlDatabase, chunked, fn
 from ..tags.tag import Tag
-from ..dbmodels import Tags, TagValue, Units
+from ..dbmodels import Tags, TagValue, TagValueBlock, Units
 from ..modules.users.users import User
 from ..tags.cvt import CVTEngine
 from .core import BaseLogger, BaseEngine
+from .spool import Spool
+from .archive import Archive
 from ..variables import *
 from ..utils.decorators import logging_error_handler
+from ..utils import gorilla
 
 
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
@@ -35,6 +39,117 @@ class DataLogger(BaseLogger):
 
         super(DataLogger, self).__init__()
         self.tag_engine = CVTEngine()
+        self.spool = Spool(folder=os.path.join(".", "spool", "historian"))
+        self.block_spool = Spool(folder=os.path.join(".", "spool", "historian", "blocks"))
+        self.bulk_ingest = True
+        self.insert_chunk_size = 1000
+        self.storage = "rows"
+        self.block_span = 60
+        self.block_write_period = 60
+        self._blocks = dict()
+        self._blocks_lock = threading.Lock()
+        self._blocks_written = time.monotonic()
+        self._blocks_recovered = False
+        self.archive = None
+        self.archive_days = 30
+
+    def set_storage(self, storage:str="rows", block_span:int=60, write_period:float=None):
+        r"""
+        Sets the historian storage mode
+
+        **Parameters**
+
+        * **storage** (str): 'rows', one TagValue row per sample, or 'blocks', one compressed [TagValueBlock](../dbmodels/tags.py) row per tag every *block_span* seconds.
+        * **block_span** (int): Block span in seconds.
+        * **write_period** (float): Seconds between writes of the open blocks, *block_span* by default. Their
+        samples not written yet are also appended to a log next to the spool (*{spool}/blocks*), if the process
+        stops before they're written they're written from the log on the next batch.
+        """
+        if storage not in ("rows", "blocks"):
+
+            raise ValueError(f"Storage {storage} not supported, use 'rows' or 'blocks'")
+
+        self.storage = storage
+        self.block_span = block_span
+        self.block_write_period = block_span if write_period is None else write_period
+
+        with self._blocks_lock:
+
+            # The samples of the open blocks not written are in the blocks log, they're recovered on the next batch
+            self._blocks = dict()
+            self._blocks_written = time.monotonic()
+            self._blocks_recovered = False
+
+    def set_spool(self, folder:str, segment_size:int=4 * 1024 * 1024, max_bytes:int=256 * 1024 * 1024):
+        r"""
+        Sets the local spool where historian batches are kept while the database is unreachable.
+        """
+        self.spool.close()
+        self.spool = Spool(folder=folder, segment_size=segment_size, max_bytes=max_bytes)
+        self.block_spool.close()
+        self.block_spool = Spool(folder=os.path.join(folder, "blocks"), segment_size=segment_size, max_bytes=max_bytes)
+
+    def set_archive(self, folder:str, days:int=30, groups:int=16):
+        r"""
+        Sets the Parquet archive (cold storage tier), *TagValue* rows older than *days* full days are moved into it
+        by [DataLoggerEngine.archive](#DataLoggerEngine.archive) and *read_trends* reads them back transparently.
+
+        **Parameters**
+
+        * **folder** (str): Archive folder.
+        * **days** (int): Days kept in the database.
+        * **groups** (int): Tag groups (files) per archived day.
+        """
+        self.archive = Archive(folder=folder, groups=groups)
+        self.archive_days = days
+
+    def get_archive(self)->dict|None:
+        r"""
+        Documentation here
+        """
+        if self.archive:
+
+            return self.archive.serialize()
+
+    def read_oldest_timestamp(self)->datetime|None:
+        r"""
+        Timestamp (UTC) of the oldest *TagValue* row
+        """
+        return TagValue.select(fn.MIN(TagValue.timestamp).python_value(TagValue.timestamp.python_value)).scalar()
+
+    def archive_partition(self, day:date, group:int)->int:
+        r"""
+        Moves the *TagValue* rows of a UTC day and tag group into the archive, rows are deleted from the
+        database only after the archive file was written.
+
+        **Returns**
+
+        * **int**: Number of archived rows
+        """
+        tags = [tag.id for tag in Tags.select(Tags.id, Tags.name) if self.archive.get_group(tag.name)==group]
+
+        if not tags:
+
+            return 0
+
+        start = calendar.timegm(day.timetuple())
+        condition = TagValue.tag.in_(tags) & (TagValue.timestamp >= start) & (TagValue.timestamp < start + 24 * 3600)
+        rows = list(TagValue
+            .select(Tags.name, TagValue.timestamp, TagValue.value, Units.unit)
+            .join(Tags)
+            .switch(TagValue)
+            .join(Units)
+            .where(condition)
+            .tuples())
+
+        if not rows:
+
+            return 0
+
+        self.archive.write(day=day, group=group, rows=rows)
+        TagValue.delete().where(condition).execute()
+
+        return len(rows)
 
     @logging_error_handler
     def set_tag(
@@ -121,19 +236,32 @@ class DataLogger(BaseLogger):
 
     def write_tags(self, tags:list):
         r"""
-        Documentation here
+        Writes a batch of tag values, if the database is unreachable the batch is kept in the local [Spool](./spool.py)
+        and the spooled batches are written in order, before any new batch, once the database is back.
         """
-        _tags = tags.copy()
+        if self.storage=="blocks" and not self._blocks_recovered:
+
+            if not self.__recover_blocks():
+
+                self.spool.append(tags)
+                return
+
+        if not self.spool.is_empty():
+
+            if not self.spool.replay(self.__replay_tags):
+
+                self.spool.append(tags)
+                return
+
         try:
-            for counter, tag in enumerate(tags):
-                _tag = Tags.read_by_name(tag['tag'])
-                unit = Units.get_or_none(id=_tag.display_unit.id)
-                _tags[counter].update({
-                    'tag': _tag,
-                    'unit': unit
-                })
-            
-            TagValue.insert_many(_tags).execute()
+
+            self.__insert_tags(tags)
+
+        except (OperationalError, InterfaceError) as e:
+
+            logging.warning(f"Database unreachable, {len(tags)} tag values spooled: {e}")
+            self.__rollback()
+            self.spool.append(tags)
 
         except Exception as e:
             _, _, e_traceback = sys.exc_info()
@@ -141,9 +269,318 @@ class DataLogger(BaseLogger):
             e_message = str(e)
             e_line_number = e_traceback.tb_lineno
             logging.warning(f"Rollback done in database due to conflicts writing tags: {e_line_number} - {e_filename} - {e_message}")
+            self.__rollback()
+
+    def __insert_tags(self, tags:list):
+        r"""
+        Writes a batch of tag values, on PostgreSQL it's streamed with `COPY ... FROM STDIN` when *bulk_ingest* is enabled,
+        otherwise it's inserted with multi-row INSERTs of *insert_chunk_size* rows in a single transaction.
+        """
+        if not tags:
+
+            return
+
+        rows = self.__get_rows(tags)
+
+        if self.storage=="blocks":
+
+            self.__write_blocks(rows, tags)
+
+        elif self.bulk_ingest and isinstance(self._db, PostgresqlDatabase):
+
+            self.__copy_rows(rows)
+
+        else:
+
+            self.__insert_rows(rows)
+
+    def __get_rows(self, tags:list)->list:
+        r"""
+        (tag_id, unit_id, value, timestamp) rows of a batch of tag values
+        """
+        _tags = dict()
+        rows = list()
+        for tag in tags:
+
+            if tag['tag'] not in _tags:
+
+                _tag = Tags.read_by_name(tag['tag'])
+                _tags[tag['tag']] = (_tag.id, _tag.display_unit_id)
+
+            tag_id, unit_id = _tags[tag['tag']]
+            rows.append((tag_id, unit_id, tag['value'], tag['timestamp']))
+
+        return rows
+
+    def __insert_rows(self, rows:list):
+        r"""
+        Documentation here
+        """
+        fields = [TagValue.tag, TagValue.unit, TagValue.value, TagValue.timestamp]
+
+        with self._db.atomic():
+
+            for batch in chunked(rows, self.insert_chunk_size):
+
+                TagValue.insert_many(batch, fields=fields).execute()
+
+    def __copy_rows(self, rows:list):
+        r"""
+        Streams the rows through `COPY ... FROM STDIN` from an in-memory CSV buffer.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for tag_id, unit_id, value, timestamp in rows:
+
+            writer.writerow((tag_id, unit_id, repr(float(value)), TagValue.timestamp.db_value(timestamp)))
+
+        buffer.seek(0)
+        columns = ", ".join(f'"{field.column_name}"' for field in (TagValue.tag, TagValue.unit, TagValue.value, TagValue.timestamp))
+        sql = f'COPY "{TagValue._meta.table_name}" ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+        with self._db.atomic():
+
+            with self._db.cursor() as cursor:
+
+                cursor.copy_expert(sql, buffer)
+
+    def __write_blocks(self, rows:list, tags:list):
+        r"""
+        Appends the rows to the open block of their tag, kept in memory.
+
+        A block is written (upsert) when it closes, i.e. the first sample of the next block arrives, and the open
+        blocks are written every *block_write_period* seconds, so a block is encoded a few times instead of on
+        every batch. Samples of the open blocks not written yet are read from memory by the trend readers.
+
+        The batch is appended to the blocks log before it's written, the log is cleared when all the open blocks
+        are written, so a crash doesn't lose the samples kept in memory. The blocks in memory only change once
+        the database took the writes, a batch rejected by the database goes to the spool and is appended again
+        on the replay, the samples a block already has (same timestamp) are not added twice.
+        """
+        self.block_spool.append(tags)
+        blocks = dict(self._blocks)
+        writes = list()
+
+        for (tag_id, start), (unit_id, _samples) in sorted(self.__group_blocks(rows).items(), key=lambda item: item[0][1]):
+
+            block = blocks.get(tag_id)
+
+            if block is not None and block["start"] > start:
+
+                # Late samples of a closed block
+                closed = self.__load_block(tag_id=tag_id, unit_id=unit_id, start=start)
+                closed["samples"] = self.__merge_samples(closed["samples"], _samples)
+                writes.append(closed)
+                continue
+
+            if block is None or block["start"] < start:
+
+                if block is not None and block["pending"]:
+
+                    writes.append(block)
+
+                block = self.__load_block(tag_id=tag_id, unit_id=unit_id, start=start)
+
+            blocks[tag_id] = dict(block, unit=unit_id, samples=self.__merge_samples(block["samples"], _samples), pending=True)
+
+        now = time.monotonic()
+        flush = now - self._blocks_written >= self.block_write_period
+
+        if flush:
+
+            writes.extend(block for block in blocks.values() if block["pending"] and not any(block is write for write in writes))
+
+        if writes:
+
+            with self._db.atomic():
+
+                for block in writes:
+
+                    self.__upsert_block(block)
+
+        for block in writes:
+
+            block["pending"] = False
+
+        with self._blocks_lock:
+
+            self._blocks = blocks
+
+        if flush:
+
+            self._blocks_written = now
+            self.block_spool.clear()
+
+    def write_blocks(self)->int:
+        r"""
+        Writes the open blocks with samples not written yet (i.e. before stopping), returns the blocks written
+        """
+        with self._blocks_lock:
+
+            writes = [block for block in self._blocks.values() if block["pending"]]
+
+        if writes:
+
+            with self._db.atomic():
+
+                for block in writes:
+
+                    self.__upsert_block(block)
+
+        for block in writes:
+
+            block["pending"] = False
+
+        self._blocks_written = time.monotonic()
+        self.block_spool.clear()
+
+        return len(writes)
+
+    def __recover_blocks(self)->bool:
+        r"""
+        Writes the samples of the blocks log, left by a process that stopped before writing its open blocks,
+        returns False if the database is unreachable
+        """
+        if not self.block_spool.is_empty():
+
+            logging.warning("Historian: writing the open blocks samples of the blocks log")
+
+            if not self.block_spool.replay(self.__recover_batch):
+
+                return False
+
+        self._blocks_recovered = True
+
+        return True
+
+    def __recover_batch(self, tags:list):
+        r"""
+        Adds a batch of the blocks log to the blocks in the database
+        """
+        rows = self.__get_rows(tags)
+
+        with self._db.atomic():
+
+            for (tag_id, start), (unit_id, samples) in self.__group_blocks(rows).items():
+
+                block = self.__load_block(tag_id=tag_id, unit_id=unit_id, start=start)
+                block["samples"] = self.__merge_samples(block["samples"], samples)
+                self.__upsert_block(block)
+
+    def __group_blocks(self, rows:list)->dict:
+        r"""
+        Samples (milliseconds, value) of the rows by tag and block start, {(tag_id, start): (unit_id, samples)}
+        """
+        span = self.block_span * 1000
+        samples = dict()
+        for tag_id, unit_id, value, timestamp in rows:
+
+            timestamp = self.to_milliseconds(timestamp)
+            key = (tag_id, timestamp - timestamp % span)
+            samples.setdefault(key, (unit_id, list()))[1].append((timestamp, value))
+
+        return samples
+
+    @staticmethod
+    def __merge_samples(samples:list, new:list)->list:
+        r"""
+        Samples of a block with the new ones it doesn't have yet
+        """
+        timestamps = {sample[0] for sample in samples}
+
+        return samples + [sample for sample in new if sample[0] not in timestamps]
+
+    def __upsert_block(self, block:dict):
+        r"""
+        Documentation here
+        """
+        samples = sorted(block["samples"], key=lambda sample: sample[0])
+        TagValueBlock.upsert(
+            tag=block["tag"],
+            unit=block["unit"],
+            start=block["start"],
+            stop=samples[-1][0],
+            count=len(samples),
+            data=gorilla.encode([sample[0] for sample in samples], [sample[1] for sample in samples])
+            )
+
+    def __load_block(self, tag_id:int, unit_id:int, start:int)->dict:
+        r"""
+        Documentation here
+        """
+        result = {"tag": tag_id, "unit": unit_id, "start": start, "samples": list(), "pending": False}
+        block = TagValueBlock.get_or_none((TagValueBlock.tag==tag_id) & (TagValueBlock.start==start))
+
+        if block is not None:
+
+            timestamps, values = gorilla.decode(bytes(block.data))
+            result["samples"] = list(zip(timestamps, values))
+
+        return result
+
+    def __get_open_block(self, tag_id:int)->dict|None:
+        r"""
+        Open block of a tag with samples not written yet, its samples sorted, None if the database has all of them
+        """
+        with self._blocks_lock:
+
+            block = self._blocks.get(tag_id)
+
+            if block is None or not block["pending"]:
+
+                return None
+
+            samples = list(block["samples"])
+
+        samples.sort(key=lambda sample: sample[0])
+
+        return {"start": block["start"], "unit": block["unit"], "samples": samples}
+
+    @staticmethod
+    def to_milliseconds(timestamp:datetime)->int:
+        r"""
+        Unix time in milliseconds, naive datetimes are taken as UTC like TagValue.timestamp does
+        """
+        return calendar.timegm(timestamp.utctimetuple()) * 1000 + timestamp.microsecond // 1000
+
+    def __replay_tags(self, tags:list):
+        r"""
+        Writes a spooled batch, batches rejected by the database for other reasons than an outage are dropped
+        so they don't block the replay.
+        """
+        try:
+
+            self.__insert_tags(tags)
+
+        except (OperationalError, InterfaceError):
+
+            self.__rollback()
+            raise
+
+        except Exception as e:
+
+            logging.warning(f"Spooled batch dropped: {e}")
+            self.__rollback()
+
+    def get_spool(self)->dict:
+        r"""
+        Documentation here
+        """
+        return self.spool.serialize()
+
+    def __rollback(self):
+        r"""
+        Documentation here
+        """
+        try:
+
             conn = self._db.connection()
             conn.rollback()
 
+        except Exception:
+
+            pass
+
     def read_trends(self, start:str, stop:str, timezone:str, tags):
         r"""
         Documentation here
@@ -166,8 +603,136 @@ class DataLogger(BaseLogger):
             for value in values:
                 result[tag]['values'].append({"x": value.timestamp.strftime(self.tag_engine.DATETIME_FORMAT), "y": eval(f"{variable}.convert_value({value.value}, from_unit={'value.unit.unit'}, to_unit={'_tag.get_display_unit()'})")})
 
+            blocks = self.__read_blocks(trend=trend, start=start, stop=stop, variable=eval(variable), to_unit=_tag.get_display_unit())
+            archived = self.__read_archive(tag=tag, start=start, stop=stop, variable=eval(variable), to_unit=_tag.get_display_unit())
+            sources = [values for values in (result[tag]['values'], blocks, archived) if values]
+
+            if len(sources) > 1:
+
+                result[tag]['values'] = sorted(sum(sources, list()), key=lambda value: datetime.strptime(value["x"], self.tag_engine.DATETIME_FORMAT))
+
+            elif sources:
+
+                result[tag]['values'] = sources[0]
+
         return result
 
+    def __read_blocks(self, trend:Tags, start:float, stop:float, variable, to_unit:str)->list:
+        r"""
+        Decodes the compressed blocks of *trend* overlapping (start, stop), timestamps in seconds
+        """
+        result = list()
+        units = dict()
+        start, stop = start * 1000, stop * 1000
+
+        blocks = [(block.unit_id, *gorilla.decode(bytes(block.data))) for block in TagValueBlock.read_by_range(tag=trend.id, start=int(start), stop=int(stop) + 1)]
+        open_block = self.__get_open_block(tag_id=trend.id)
+
+        if open_block:
+
+            # The open block replaces its last written copy
+            blocks = [block for block in blocks if not block[1] or block[1][0] < open_block["start"]]
+            blocks.append((open_block["unit"], [sample[0] for sample in open_block["samples"]], [sample[1] for sample in open_block["samples"]]))
+
+        for unit_id, timestamps, values in blocks:
+
+            if unit_id not in units:
+
+                units[unit_id] = Units.get_by_id(unit_id).unit
+
+            from_unit = units[unit_id]
+
+            for timestamp, value in zip(timestamps, values):
+
+                if start < timestamp < stop:
+
+                    result.append({
+                        "x": datetime.utcfromtimestamp(timestamp / 1000).strftime(self.tag_engine.DATETIME_FORMAT),
+                        "y": variable.convert_value(value, from_unit=from_unit, to_unit=to_unit)
+                        })
+
+        return result
+
+    def __read_archive(self, tag:str, start:float, stop:float, variable, to_unit:str)->list:
+        r"""
+        Reads the archived values of *tag* in (start, stop), timestamps in seconds
+        """
+        if not self.archive:
+
+            return list()
+
+        return [{
+            "x": datetime.utcfromtimestamp(timestamp).strftime(self.tag_engine.DATETIME_FORMAT),
+            "y": variable.convert_value(value, from_unit=unit, to_unit=to_unit)
+            } for timestamp, value, unit in self.archive.iter_values(tag=tag, start=start, stop=stop)]
+
+    def read_trend_rows(self, tag:str, start:float, stop:float, after:tuple=None, limit:int=5000)->list:
+        r"""
+        Reads a chunk of the *TagValue* rows of *tag* in (start, stop), timestamps in seconds.
+
+        Rows are ordered by (timestamp, id) and the chunk starts right after the key *after*, so a full range
+        is read chunk by chunk with constant memory.
+
+        **Returns**
+
+        * **list[tuple]**: (timestamp, id, value, unit)
+        """
+        query = (TagValue
+            .select(TagValue.timestamp, TagValue.id, TagValue.value, Units.unit)
+            .join(Units)
+            .switch(TagValue)
+            .join(Tags)
+            .where((Tags.name==tag) & (TagValue.timestamp > start) & (TagValue.timestamp < stop)))
+
+        if after:
+
+            timestamp, id = after
+            query = query.where((TagValue.timestamp > timestamp) | ((TagValue.timestamp == timestamp) & (TagValue.id > id)))
+
+        return list(query.order_by(TagValue.timestamp.asc(), TagValue.id.asc()).limit(limit).tuples())
+
+    def read_trend_blocks(self, tag:str, start:float, stop:float, after:int=None, limit:int=10)->list:
+        r"""
+        Reads a chunk of the compressed blocks of *tag* overlapping (start, stop), timestamps in seconds.
+
+        Blocks are ordered by their start and the chunk starts right after the block starting at *after* (milliseconds).
+
+        **Returns**
+
+        * **list[tuple]**: (start, unit, data)
+        """
+        trend = Tags.get_or_none(Tags.name==tag)
+
+        if not trend:
+
+            return list()
+
+        query = TagValueBlock.read_by_range(tag=trend.id, start=int(start * 1000), stop=int(stop * 1000) + 1)
+
+        if after is not None:
+
+            query = query.where(TagValueBlock.start > after)
+
+        blocks = [(block.start, Units.get_by_id(block.unit_id).unit, bytes(block.data)) for block in query.limit(limit)]
+        open_block = self.__get_open_block(tag_id=trend.id)
+
+        if open_block and open_block["samples"][0][0] <= stop * 1000 and open_block["samples"][-1][0] >= start * 1000:
+
+            # The open block replaces its last written copy, it's the newest block so it ends the last chunk
+            data = gorilla.encode([sample[0] for sample in open_block["samples"]], [sample[1] for sample in open_block["samples"]])
+            unit = Units.get_by_id(open_block["unit"]).unit
+            written = [counter for counter, block in enumerate(blocks) if block[0]==open_block["start"]]
+
+            if written:
+
+                blocks[written[0]] = (open_block["start"], unit, data)
+
+            elif len(blocks) < limit and (after is None or open_block["start"] > after):
+
+                blocks.append((open_block["start"], unit, data))
+
+        return blocks
+
 class DataLoggerEngine(BaseEngine):
     r"""
     Data logger Engine class for Tag thread-safe database logging.
@@ -385,6 +950,137 @@ class DataLoggerEngine(BaseEngine):
 
         return self.query(_query)
     
+    def set_spool(self, folder:str, segment_size:int=4 * 1024 * 1024, max_bytes:int=256 * 1024 * 1024):
+        r"""
+        Sets the local spool folder and its bounds on a thread-safe mechanism
+
+        **Parameters**
+
+        * **folder** (str): Spool folder
+        * **segment_size** (int): Segment size in bytes
+        * **max_bytes** (int): Maximum disk usage in bytes
+        """
+        _query = dict()
+        _query["action"] = "set_spool"
+        _query["parameters"] = dict()
+        _query["parameters"]["folder"] = folder
+        _query["parameters"]["segment_size"] = segment_size
+        _query["parameters"]["max_bytes"] = max_bytes
+
+        return self.query(_query)
+
+    def set_storage(self, storage:str="rows", block_span:int=60, write_period:float=None):
+        r"""
+        Sets the historian storage mode on a thread-safe mechanism
+
+        **Parameters**
+
+        * **storage** (str): 'rows' or 'blocks'
+        * **block_span** (int): Block span in seconds for the 'blocks' storage
+        * **write_period** (float): Seconds between writes of the open blocks, *block_span* by default, their samples are also kept in a log until written
+        """
+        _query = dict()
+        _query["action"] = "set_storage"
+        _query["parameters"] = dict()
+        _query["parameters"]["storage"] = storage
+        _query["parameters"]["block_span"] = block_span
+        _query["parameters"]["write_period"] = write_period
+
+        return self.query(_query)
+
+    def write_blocks(self)->int:
+        r"""
+        Writes the samples of the open blocks kept in memory on a thread-safe mechanism
+        """
+        _query = dict()
+        _query["action"] = "write_blocks"
+        _query["parameters"] = dict()
+
+        return self.query(_query)
+
+    def get_spool(self)->dict:
+        r"""
+        Returns the spool status (segments, size, dropped records)
+        """
+        _query = dict()
+        _query["action"] = "get_spool"
+
+        return self.query(_query)
+
+    def set_archive(self, folder:str, days:int=30, groups:int=16):
+        r"""
+        Sets the Parquet archive on a thread-safe mechanism
+
+        **Parameters**
+
+        * **folder** (str): Archive folder
+        * **days** (int): Days kept in the database
+        * **groups** (int): Tag groups (files) per archived day
+        """
+        _query = dict()
+        _query["action"] = "set_archive"
+        _query["parameters"] = dict()
+        _query["parameters"]["folder"] = folder
+        _query["parameters"]["days"] = days
+        _query["parameters"]["groups"] = groups
+
+        return self.query(_query)
+
+    def get_archive(self)->dict|None:
+        r"""
+        Returns the archive status (folder, archived days), None if there is no archive
+        """
+        _query = dict()
+        _query["action"] = "get_archive"
+
+        return self.query(_query)
+
+    def archive(self, days:int=None)->int:
+        r"""
+        Moves the *TagValue* rows older than *days* full UTC days (the archive days by default) into the archive.
+
+        Every (day, tag group) partition is moved by its own write query, so historian writes wait for one
+        partition at most.
+
+        **Returns**
+
+        * **int**: Number of archived rows
+        """
+        if not self.logger.archive:
+
+            return 0
+
+        if days is None:
+
+            days = self.logger.archive_days
+
+        _query = dict()
+        _query["action"] = "read_oldest_timestamp"
+        oldest = self.query(_query)
+
+        if not oldest:
+
+            return 0
+
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
+        day = oldest.date()
+        result = 0
+
+        while day < cutoff:
+
+            for group in range(self.logger.archive.groups):
+
+                _query = dict()
+                _query["action"] = "archive_partition"
+                _query["parameters"] = dict()
+                _query["parameters"]["day"] = day
+                _query["parameters"]["group"] = group
+                result += self.query(_query) or 0
+
+            day += timedelta(days=1)
+
+        return result
+
     def read_trends(self, start:str, stop:str, timezone:str, *tags):
         r"""
         Read tag value from database on a thread-safe mechanism
@@ -406,3 +1102,107 @@ class DataLoggerEngine(BaseEngine):
         _query["parameters"]["tags"] = tags
         return self.query(_query)
 
+    def iter_trends(self, start:str, stop:str, timezone:str, *tags, chunk_size:int=5000):
+        r"""
+        Reads the values of *tags* between *start* and *stop* for exports.
+
+        Unlike *read_trends* the values are read chunk by chunk (*chunk_size* rows per read query) and yielded
+        as they come, so exporting a long range keeps a single chunk in memory.
+
+        **Parameters**
+
+        * **start** (str): Start datetime in *timezone*, format "%Y-%m-%d %H:%M:%S.%f".
+        * **stop** (str): Stop datetime in *timezone*, same format.
+        * **timezone** (str): pytz timezone name.
+        * **tags** (str): Tag names.
+        * **chunk_size** (int): Rows per read query.
+
+        **Yields**
+
+        * **tuple**: (tag, timestamp (datetime in *timezone*), value in the tag display unit), sorted by tag and timestamp
+        """
+        _timezone = pytz.timezone(timezone)
+        _start = _timezone.localize(datetime.strptime(start, DATETIME_FORMAT)).astimezone(pytz.UTC).timestamp()
+        _stop = _timezone.localize(datetime.strptime(stop, DATETIME_FORMAT)).astimezone(pytz.UTC).timestamp()
+
+        for tag in tags:
+
+            _tag = self.logger.tag_engine.get_tag_by_name(name=tag)
+
+            if not _tag:
+
+                continue
+
+            variable = eval(_tag.get_variable())
+            to_unit = _tag.get_display_unit()
+            samples = heapq.merge(
+                self.__iter_rows(tag=tag, start=_start, stop=_stop, chunk_size=chunk_size),
+                self.__iter_blocks(tag=tag, start=_start, stop=_stop),
+                self.logger.archive.iter_values(tag=tag, start=_start, stop=_stop) if self.logger.archive else iter(())
+            )
+
+            for timestamp, value, unit in samples:
+
+                yield tag, datetime.fromtimestamp(timestamp, tz=_timezone), variable.convert_value(value, from_unit=unit, to_unit=to_unit)
+
+    def __iter_rows(self, tag:str, start:float, stop:float, chunk_size:int):
+        r"""
+        Yields (timestamp, value, unit) of the *TagValue* rows of *tag*, timestamps in seconds
+        """
+        after = None
+
+        while True:
+
+            _query = dict()
+            _query["action"] = "read_trend_rows"
+            _query["parameters"] = dict()
+            _query["parameters"]["tag"] = tag
+            _query["parameters"]["start"] = start
+            _query["parameters"]["stop"] = stop
+            _query["parameters"]["after"] = after
+            _query["parameters"]["limit"] = chunk_size
+            rows = self.query(_query) or list()
+
+            for timestamp, _, value, unit in rows:
+
+                yield calendar.timegm(timestamp.utctimetuple()) + timestamp.microsecond / 1e6, value, unit
+
+            if len(rows) < chunk_size:
+
+                return
+
+            after = rows[-1][0], rows[-1][1]
+
+    def __iter_blocks(self, tag:str, start:float, stop:float, chunk_size:int=10):
+        r"""
+        Yields (timestamp, value, unit) of the compressed blocks of *tag*, timestamps in seconds
+        """
+        after = None
+
+        while True:
+
+            _query = dict()
+            _query["action"] = "read_trend_blocks"
+            _query["parameters"] = dict()
+            _query["parameters"]["tag"] = tag
+            _query["parameters"]["start"] = start
+            _query["parameters"]["stop"] = stop
+            _query["parameters"]["after"] = after
+            _query["parameters"]["limit"] = chunk_size
+            blocks = self.query(_query) or list()
+
+            for _, unit, data in blocks:
+
+                timestamps, values = gorilla.decode(data)
+
+                for timestamp, value in zip(timestamps, values):
+
+                    if start * 1000 < timestamp < stop * 1000:
+
+                        yield timestamp / 1000, value, unit
+
+            if len(blocks) < chunk_size:
+
+                return
+
+            after = blocks[-1][0]
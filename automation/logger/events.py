@@ -5,6 +5,7 @@ from datetime import datetime
 from ..dbmodels.events import Events
 from ..modules.users.users import User
 from .core import BaseEngine, BaseLogger
+from .writer import BatchWriter, PendingRecord
 
 
 class EventsLogger(BaseLogger):
@@ -39,6 +40,14 @@ class EventsLogger(BaseLogger):
                 timestamp=timestamp
             )
 
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Documentation here
+        """
+        if self.get_db():
+
+            return Events.create_many(records=[record.fields for record in records])
+
     def get_lasts(self, lasts:int=1):
         r"""
         Documentation here
@@ -53,7 +62,9 @@ class EventsLogger(BaseLogger):
         priorities:list[int]=None,
         criticities:list[int]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
         r"""
         Documentation here
@@ -65,7 +76,9 @@ class EventsLogger(BaseLogger):
                 priorities=priorities,
                 criticities=criticities,
                 greater_than_timestamp=greater_than_timestamp,
-                less_than_timestamp=less_than_timestamp
+                less_than_timestamp=less_than_timestamp,
+                limit=limit,
+                cursor=cursor
             )
         
     def get_summary(self)->tuple[list, str]:
@@ -88,6 +101,7 @@ class EventsLoggerEngine(BaseEngine):
 
         super(EventsLoggerEngine, self).__init__()
         self.logger = EventsLogger()
+        self.writer = BatchWriter(name="EventsWriter", write=self.create_many)
 
     def create(
         self,
@@ -98,32 +112,61 @@ class EventsLoggerEngine(BaseEngine):
         priority:int=None,
         criticity:int=None,
         timestamp:datetime=None
-        ):
+        )->PendingRecord:
+        r"""
+        Queues the event, it's written into the database in the next batch of the events writer.
+        """
+        if not self.get_db():
+
+            return None
+
+        return self.writer.put(PendingRecord(
+            message=message,
+            user=user,
+            description=description,
+            classification=classification,
+            priority=priority,
+            criticity=criticity,
+            timestamp=timestamp
+        ))
 
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Documentation here
+        """
         _query = dict()
-        _query["action"] = "create"
+        _query["action"] = "create_many"
         _query["parameters"] = dict()
-        _query["parameters"]["message"] = message
-        _query["parameters"]["user"] = user
-        _query["parameters"]["description"] = description
-        _query["parameters"]["classification"] = classification
-        _query["parameters"]["priority"] = priority
-        _query["parameters"]["criticity"] = criticity
-        _query["parameters"]["timestamp"] = timestamp
-        
+        _query["parameters"]["records"] = records
+
         return self.query(_query)
     
     def get_lasts(
         self,
         lasts:int=1
         ):
+        r"""
+        Returns the last events, the ones still queued in the events writer included.
+        """
+        with self.writer.pending() as pending:
 
-        _query = dict()
-        _query["action"] = "get_lasts"
-        _query["parameters"] = dict()
-        _query["parameters"]["lasts"] = lasts
-        
-        return self.query(_query)
+            result = [record.serialize() for record in pending[:lasts]]
+
+            if len(result) < lasts:
+
+                _query = dict()
+                _query["action"] = "get_lasts"
+                _query["parameters"] = dict()
+                _query["parameters"]["lasts"] = lasts - len(result)
+                result.extend(self.query(_query) or list())
+
+        return result
+
+    def flush(self)->bool:
+        r"""
+        Writes the queued events now
+        """
+        return self.writer.flush()
     
     def filter_by(
         self,
@@ -131,7 +174,9 @@ class EventsLoggerEngine(BaseEngine):
         priorities:list[int]=None,
         criticities:list[int]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
 
         _query = dict()
@@ -142,6 +187,8 @@ class EventsLoggerEngine(BaseEngine):
         _query["parameters"]["criticities"] = criticities
         _query["parameters"]["greater_than_timestamp"] = greater_than_timestamp
         _query["parameters"]["less_than_timestamp"] = less_than_timestamp
+        _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
 
@@ -2,9 +2,39 @@
 """pyhades/logger/events.py
 """
 from datetime import datetime
-from ..dbmodels.logs import Logs
+from ..dbmodels.logs import Logs, DATETIME_FORMAT
+from ..dbmodels.users import Users
+from ..dbmodels.events import Events
+from ..dbmodels.alarms import AlarmSummary
 from ..modules.users.users import User
 from .core import BaseEngine, BaseLogger
+from .writer import BatchWriter, PendingRecord
+
+
+class PendingLog(PendingRecord):
+    r"""
+    Log queued in the logs writer and not written into the database yet.
+    """
+
+    def serialize(self)->dict:
+        r"""
+        Same structure as the serialized [Logs](../dbmodels/logs.py) record, *id* is None until it's written.
+        """
+        fields = self.fields
+        user = Users.read_by_username(username=fields["user"].username)
+        event = Events.get_or_none(id=fields["event_id"]) if fields.get("event_id") else None
+        alarm = AlarmSummary.get_or_none(id=fields["alarm_summary_id"]) if fields.get("alarm_summary_id") else None
+
+        return {
+            "id": None,
+            "timestamp": fields["timestamp"].strftime(DATETIME_FORMAT),
+            "user": user.serialize() if user else fields["user"].serialize(),
+            "message": fields["message"],
+            "description": fields.get("description"),
+            "classification": fields.get("classification"),
+            "event": event.serialize() if event else None,
+            "alarm": alarm.serialize() if alarm else None
+        }
 
 
 class LogsLogger(BaseLogger):
@@ -42,6 +72,14 @@ class LogsLogger(BaseLogger):
 
         return None, f"DB Not Initialized"
 
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Documentation here
+        """
+        if self.get_db():
+
+            return Logs.create_many(records=[record.fields for record in records])
+
     def get_lasts(self, lasts:int=1):
         r"""
         Documentation here
@@ -59,7 +97,9 @@ class LogsLogger(BaseLogger):
         event_ids:list[int]=None,
         classifications:list[str]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
         r"""
         Documentation here
@@ -72,7 +112,9 @@ class LogsLogger(BaseLogger):
                 event_ids=event_ids,
                 classifications=classifications,
                 greater_than_timestamp=greater_than_timestamp,
-                less_than_timestamp=less_than_timestamp
+                less_than_timestamp=less_than_timestamp,
+                limit=limit,
+                cursor=cursor
             )
         
         return list(), f"DB Not Initialized"
@@ -97,6 +139,7 @@ class LogsLoggerEngine(BaseEngine):
 
         super(LogsLoggerEngine, self).__init__()
         self.logger = LogsLogger()
+        self.writer = BatchWriter(name="LogsWriter", write=self.create_many)
 
     def create(
         self,
@@ -107,32 +150,68 @@ class LogsLoggerEngine(BaseEngine):
         alarm_summary_id:int=None,
         event_id:int=None,
         timestamp:datetime=None
-        ):
+        )->tuple[PendingLog, str]:
+        r"""
+        Queues the log, it's written into the database in the next batch of the logs writer, its *id* is None
+        until then.
+        """
+        if not self.get_db():
+
+            return None, f"DB Not Initialized"
+
+        if not isinstance(user, User):
+
+            return None, f"User {user} - {type(user)} must be an User Object"
 
+        record = self.writer.put(PendingLog(
+            message=message,
+            user=user,
+            description=description,
+            classification=classification,
+            alarm_summary_id=alarm_summary_id,
+            event_id=event_id,
+            timestamp=timestamp
+        ))
+
+        return record, f"Log creation successful"
+
+    def create_many(self, records:list[PendingRecord])->int:
+        r"""
+        Documentation here
+        """
         _query = dict()
-        _query["action"] = "create"
+        _query["action"] = "create_many"
         _query["parameters"] = dict()
-        _query["parameters"]["message"] = message
-        _query["parameters"]["user"] = user
-        _query["parameters"]["description"] = description
-        _query["parameters"]["classification"] = classification
-        _query["parameters"]["alarm_summary_id"] = alarm_summary_id
-        _query["parameters"]["event_id"] = event_id
-        _query["parameters"]["timestamp"] = timestamp
-        
+        _query["parameters"]["records"] = records
+
         return self.query(_query)
     
     def get_lasts(
         self,
         lasts:int=1
         ):
+        r"""
+        Returns the last logs, the ones still queued in the logs writer included.
+        """
+        with self.writer.pending() as pending:
 
-        _query = dict()
-        _query["action"] = "get_lasts"
-        _query["parameters"] = dict()
-        _query["parameters"]["lasts"] = lasts
-        
-        return self.query(_query)
+            result = [record.serialize() for record in pending[:lasts]]
+
+            if len(result) < lasts:
+
+                _query = dict()
+                _query["action"] = "get_lasts"
+                _query["parameters"] = dict()
+                _query["parameters"]["lasts"] = lasts - len(result)
+                result.extend(self.query(_query) or list())
+
+        return result
+
+    def flush(self)->bool:
+        r"""
+        Writes the queued logs now
+        """
+        return self.writer.flush()
     
     def filter_by(
         self,
@@ -141,7 +220,9 @@ class LogsLoggerEngine(BaseEngine):
         event_ids:list[int]=None,
         classifications:list[str]=None,
         greater_than_timestamp:datetime=None,
-        less_than_timestamp:datetime=None
+        less_than_timestamp:datetime=None,
+        limit:int=None,
+        cursor:int=None
         ):
 
         _query = dict()
@@ -153,6 +234,8 @@ class LogsLoggerEngine(BaseEngine):
         _query["parameters"]["classifications"] = classifications
         _query["parameters"]["greater_than_timestamp"] = greater_than_timestamp
         _query["parameters"]["less_than_timestamp"] = less_than_timestamp
+        _query["parameters"]["limit"] = limit
+        _query["parameters"]["cursor"] = cursor
         
         return self.query(_query)
 
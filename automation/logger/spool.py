@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""automation/logger/spool.py
+
+This module implements a local write-ahead spool for historian batches that couldn't be written
+into the database.
+"""
+import os, json, struct, zlib, logging, threading
+from datetime import datetime
+
+
+class Spool:
+    r"""
+    Append-only segmented spool on local disk.
+
+    Every record is a batch of tag values `[{"tag", "value", "timestamp"}, ...]` stored as
+    `length (uint32) | crc32 (uint32) | json payload`, records are appended to the active segment
+    *{sequence}.seg* and flushed to disk, when it reaches *segment_size* it's closed and a new segment is opened.
+
+    On start up the last segment is checked and a torn record (incomplete or bad CRC, left by a crash)
+    is truncated. Replay goes through the segments in order and a segment file is only removed after all
+    its records were written into the database, so a crash during replay may write some batches twice
+    but never loses it.
+
+    When the spool exceeds *max_bytes* the oldest segments are dropped.
+
+    **Parameters**
+
+    * **folder** (str): Spool folder, it's created on the first append.
+    * **segment_size** (int): Segment size in bytes.
+    * **max_bytes** (int): Maximum disk usage in bytes.
+    """
+    HEADER = struct.Struct("<II")
+    SUFFIX = ".seg"
+
+    def __init__(self, folder:str, segment_size:int=4 * 1024 * 1024, max_bytes:int=256 * 1024 * 1024):
+        r"""
+        Documentation here
+        """
+        self.folder = folder
+        self.segment_size = segment_size
+        self.max_bytes = max_bytes
+        self.dropped_records = 0
+        self._file = None
+        self._active = None
+        self._replayed = dict()
+        self._lock = threading.RLock()
+        self._segments = list()
+
+        if os.path.isdir(folder):
+
+            self._segments = sorted(int(name[:-len(self.SUFFIX)]) for name in os.listdir(folder) if name.endswith(self.SUFFIX))
+
+            if self._segments:
+
+                self.__recover(self._segments[-1])
+
+    def __path(self, sequence:int)->str:
+        r"""
+        Documentation here
+        """
+        return os.path.join(self.folder, f"{sequence:012d}{self.SUFFIX}")
+
+    def __recover(self, sequence:int):
+        r"""
+        Truncates a torn record at the end of the segment.
+        """
+        path = self.__path(sequence)
+        valid = 0
+
+        with open(path, "rb") as file:
+
+            for _, end in self.__iter_segment(file):
+
+                valid = end
+
+        if valid < os.path.getsize(path):
+
+            logging.warning(f"Spool: truncating torn record in {path}")
+
+            with open(path, "r+b") as file:
+
+                file.truncate(valid)
+
+    def __iter_segment(self, file):
+        r"""
+        Yields (payload, end offset) of every valid record of a segment.
+        """
+        while True:
+
+            header = file.read(self.HEADER.size)
+
+            if len(header) < self.HEADER.size:
+
+                return
+
+            length, crc = self.HEADER.unpack(header)
+            payload = file.read(length)
+
+            if len(payload) < length or zlib.crc32(payload) != crc:
+
+                return
+
+            yield payload, file.tell()
+
+    def __open_active(self):
+        r"""
+        Documentation here
+        """
+        if self._file is None:
+
+            os.makedirs(self.folder, exist_ok=True)
+            self._active = self._segments[-1] + 1 if self._segments else 0
+            self._segments.append(self._active)
+            self._file = open(self.__path(self._active), "ab")
+
+        return self._file
+
+    def rotate(self):
+        r"""
+        Closes the active segment, the next append opens a new one.
+        """
+        with self._lock:
+
+            if self._file is not None:
+
+                self._file.close()
+                self._file = None
+                self._active = None
+
+    def append(self, tags:list):
+        r"""
+        Appends a batch of tag values `[{"tag", "value", "timestamp"}, ...]`.
+        """
+        payload = json.dumps([{
+            "tag": tag["tag"],
+            "value": tag["value"],
+            "timestamp": tag["timestamp"].isoformat() if isinstance(tag["timestamp"], datetime) else tag["timestamp"]
+            } for tag in tags]).encode()
+
+        with self._lock:
+
+            file = self.__open_active()
+            file.write(self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            file.flush()
+            os.fsync(file.fileno())
+
+            if file.tell() >= self.segment_size:
+
+                self.rotate()
+
+            self.__enforce_max_bytes()
+
+    def __enforce_max_bytes(self):
+        r"""
+        Drops the oldest closed segments while the spool is bigger than *max_bytes*.
+        """
+        while len(self._segments) > 1 and self.get_size() > self.max_bytes:
+
+            sequence = self._segments.pop(0)
+            path = self.__path(sequence)
+            self._replayed.pop(sequence, None)
+
+            if os.path.exists(path):
+
+                with open(path, "rb") as file:
+
+                    self.dropped_records += sum(1 for _ in self.__iter_segment(file))
+
+                os.remove(path)
+                logging.warning(f"Spool: max size reached, {path} dropped")
+
+    def get_size(self)->int:
+        r"""
+        Spool size in bytes.
+        """
+        return sum(os.path.getsize(self.__path(sequence)) for sequence in self._segments if os.path.exists(self.__path(sequence)))
+
+    def is_empty(self)->bool:
+        r"""
+        Documentation here
+        """
+        return self.get_size()==0
+
+    def replay(self, write)->bool:
+        r"""
+        Replays the spooled batches in order through *write(tags)*, it stops at the first batch that raises an exception
+        and the next replay resumes from that batch.
+
+        **Returns**
+
+        * **bool**: True if the spool was fully replayed.
+        """
+        with self._lock:
+
+            self.rotate()
+
+            for sequence in list(self._segments):
+
+                path = self.__path(sequence)
+
+                if os.path.exists(path):
+
+                    with open(path, "rb") as file:
+
+                        file.seek(self._replayed.get(sequence, 0))
+
+                        for payload, end in self.__iter_segment(file):
+
+                            tags = json.loads(payload)
+
+                            for tag in tags:
+
+                                tag["timestamp"] = datetime.fromisoformat(tag["timestamp"])
+
+                            try:
+
+                                write(tags)
+
+                            except Exception as e:
+
+                                logging.warning(f"Spool: replay stopped at {path} - {e}")
+
+                                return False
+
+                            self._replayed[sequence] = end
+
+                    os.remove(path)
+
+                self._segments.remove(sequence)
+                self._replayed.pop(sequence, None)
+
+            return True
+
+    def clear(self):
+        r"""
+        Removes every segment, i.e. the records were written by other means.
+        """
+        with self._lock:
+
+            self.rotate()
+
+            for sequence in self._segments:
+
+                path = self.__path(sequence)
+
+                if os.path.exists(path):
+
+                    os.remove(path)
+
+            self._segments = list()
+            self._replayed = dict()
+
+    def close(self):
+        r"""
+        Documentation here
+        """
+        with self._lock:
+
+            if self._file is not None:
+
+                self._file.close()
+                self._file = None
+                self._active = None
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        return {
+            "folder": self.folder,
+            "segments": len([sequence for sequence in self._segments if os.path.exists(self.__path(sequence))]),
+            "size": self.get_size(),
+            "max_bytes": self.max_bytes,
+            "dropped_records": self.dropped_records
+        }
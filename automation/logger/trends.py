@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""automation/logger/trends.py
+
+This module implements the cache of the historical trends read from the data logger.
+"""
+import math, threading, time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from .datalogger import DataLoggerEngine, DATETIME_FORMAT
+from ..utils.decimation import min_max
+
+
+class TrendsCache:
+    r"""
+    LRU cache of the historical trends of the tags for the trends viewer.
+
+    Trends are read decimated to the zoom level: a time range is drawn in *budget* pixels, so it's read with
+    min-max buckets of the power of two seconds closest to *range / budget*. Every (tag, level) keeps the time
+    ranges already read as sorted segments, a read only queries the sub-ranges not covered yet (the new part
+    of the range after a pan) and merges them in. Segments are aligned to the buckets, so they join without
+    duplicated or split buckets.
+
+    The (tag, level) entries least recently read are dropped when the cache holds more than *capacity* points.
+    The last *delay* seconds may not be logged yet, they're read every time and not cached.
+
+    **Parameters**
+
+    * **capacity** (int): Points kept in the cache.
+    * **budget** (int): Pixels of the trend plot.
+    * **delay** (float): Seconds the data logger may take to write a value.
+    """
+
+    def __init__(self, capacity:int=500000, budget:int=1000, delay:float=60.0):
+        r"""
+        Documentation here
+        """
+        self.capacity = capacity
+        self.budget = budget
+        self.delay = delay
+        self.logger_engine = DataLoggerEngine()
+        self._segments = OrderedDict()
+        self._points = 0
+        self._in_flight = dict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.queries = 0
+
+    def get_level(self, start:float, stop:float)->int:
+        r"""
+        Zoom level of a range, its buckets are *2 \*\* level* seconds wide
+        """
+        return math.ceil(math.log2(max(stop - start, 1e-3) / self.budget))
+
+    def read(self, tag:str, start:datetime, stop:datetime)->tuple[list, list]:
+        r"""
+        Trend of *tag* between *start* and *stop*, decimated to the range zoom level.
+
+        The data logger is queried outside the cache lock, a sub-range being queried for another read of the
+        same (tag, level) is marked in flight and awaited instead of queried twice, so a wide read only blocks
+        the reads that need the same data.
+
+        **Parameters**
+
+        * **tag** (str): Tag name.
+        * **start** (datetime): Range start, naive datetimes are UTC.
+        * **stop** (datetime): Range stop.
+
+        **Returns**
+
+        * **tuple**: (timestamps (UTC datetimes), values in the tag display unit)
+        """
+        start, stop = self.__seconds(start), self.__seconds(stop)
+        level = self.get_level(start, stop)
+        width = 2.0 ** level
+        key = (tag, level)
+        _start = math.floor(start / width) * width
+        _stop = math.ceil(stop / width) * width
+        horizon = max(_start, min(_stop, math.floor((time.time() - self.delay) / width) * width))
+
+        with self._lock:
+
+            self.reads += 1
+
+        while True:
+
+            with self._lock:
+
+                segments = self.__get_segments(key)
+                in_flight = self._in_flight.setdefault(key, list())
+                covered = sorted(segments + in_flight, key=lambda segment: segment[0])
+                missing = [[missing_start, missing_stop, threading.Event(), None] for missing_start, missing_stop in self.__missing(covered, _start, horizon)]
+                awaited = [segment[2] for segment in in_flight if segment[0] < horizon and segment[1] > _start]
+                in_flight.extend(missing)
+                generation = self._generation
+
+            try:
+
+                results = [(segment, self.__query(tag, segment[0], segment[1], width)) for segment in missing]
+
+            finally:
+
+                with self._lock:
+
+                    for segment in missing:
+
+                        in_flight.remove(segment)
+                        segment[2].set()
+
+                    if not in_flight and self._in_flight.get(key) is in_flight:
+
+                        self._in_flight.pop(key)
+
+            with self._lock:
+
+                if generation==self._generation:
+
+                    segments = self.__get_segments(key)
+
+                    for (missing_start, missing_stop, _, _), (timestamps, values) in results:
+
+                        self.__insert(segments, [missing_start, missing_stop, timestamps, values])
+                        self._points += len(timestamps)
+
+            if not awaited:
+
+                break
+
+            # Ranges queried by other reads, checked again once they're in
+            for event in awaited:
+
+                event.wait()
+
+        tail = self.__query(tag, horizon, _stop, width) if horizon < _stop else (list(), list())
+
+        with self._lock:
+
+            timestamps, values = self.__collect(self.__get_segments(key), start, stop)
+            self.__evict(key)
+
+        for timestamp, value in zip(*tail):
+
+            if timestamp <= stop:
+
+                timestamps.append(timestamp)
+                values.append(value)
+
+        return [datetime.fromtimestamp(timestamp, tz=timezone.utc) for timestamp in timestamps], values
+
+    def clear(self, tag:str=None):
+        r"""
+        Drops the cached trends of *tag*, or of every tag
+        """
+        with self._lock:
+
+            self._generation += 1
+
+            for key in [key for key in self._segments if tag is None or key[0]==tag]:
+
+                self._points -= sum(len(segment[2]) for segment in self._segments.pop(key))
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        with self._lock:
+
+            return {
+                "entries": len(self._segments),
+                "points": self._points,
+                "capacity": self.capacity,
+                "reads": self.reads,
+                "queries": self.queries
+            }
+
+    def __get_segments(self, key:tuple)->list:
+        r"""
+        Segments of *key*, marked as the most recently used
+        """
+        segments = self._segments.pop(key, list())
+        self._segments[key] = segments
+
+        return segments
+
+    def __query(self, tag:str, start:float, stop:float, width:float)->tuple[list, list]:
+        r"""
+        Reads the values of *tag* in [start, stop) from the data logger and decimates them, timestamps in seconds
+        """
+        with self._lock:
+
+            self.queries += 1
+
+        timestamps = list()
+        values = list()
+        # The data logger range is open, it starts a microsecond earlier to include a value logged at *start*
+        _start = datetime.fromtimestamp(start - 1e-6, tz=timezone.utc).strftime(DATETIME_FORMAT)
+        _stop = datetime.fromtimestamp(stop, tz=timezone.utc).strftime(DATETIME_FORMAT)
+
+        for _, timestamp, value in self.logger_engine.iter_trends(_start, _stop, "UTC", tag):
+
+            timestamp = timestamp.timestamp()
+
+            if start <= timestamp < stop:
+
+                timestamps.append(timestamp)
+                values.append(value)
+
+        return min_max(timestamps, values, width=width)
+
+    def __missing(self, segments:list, start:float, stop:float)->list:
+        r"""
+        Sub-ranges of [start, stop) not covered by *segments*
+        """
+        missing = list()
+        cursor = start
+
+        for segment_start, segment_stop, _, _ in segments:
+
+            if segment_stop <= cursor:
+
+                continue
+
+            if segment_start >= stop:
+
+                break
+
+            if segment_start > cursor:
+
+                missing.append((cursor, segment_start))
+
+            cursor = segment_stop
+
+        if cursor < stop:
+
+            missing.append((cursor, stop))
+
+        return missing
+
+    def __insert(self, segments:list, segment:list):
+        r"""
+        Inserts a segment in the sorted *segments* and joins it with the contiguous ones
+        """
+        index = 0
+
+        while index < len(segments) and segments[index][0] < segment[0]:
+
+            index += 1
+
+        segments.insert(index, segment)
+
+        if index + 1 < len(segments) and segments[index + 1][0]==segment[1]:
+
+            _, segment[1], timestamps, values = segments.pop(index + 1)
+            segment[2] = segment[2] + timestamps
+            segment[3] = segment[3] + values
+
+        if index > 0 and segments[index - 1][1]==segment[0]:
+
+            previous = segments[index - 1]
+            previous[1] = segment[1]
+            previous[2] = previous[2] + segment[2]
+            previous[3] = previous[3] + segment[3]
+            segments.pop(index)
+
+    def __collect(self, segments:list, start:float, stop:float)->tuple[list, list]:
+
+        timestamps = list()
+        values = list()
+
+        for segment_start, segment_stop, _timestamps, _values in segments:
+
+            if segment_stop <= start or segment_start > stop:
+
+                continue
+
+            for timestamp, value in zip(_timestamps, _values):
+
+                if start <= timestamp <= stop:
+
+                    timestamps.append(timestamp)
+                    values.append(value)
+
+        return timestamps, values
+
+    def __evict(self, key:tuple):
+
+        while self._points > self.capacity and len(self._segments) > 1:
+
+            _key = next(iter(self._segments))
+
+            if _key==key:
+
+                break
+
+            self._points -= sum(len(segment[2]) for segment in self._segments.pop(_key))
+
+    def __seconds(self, timestamp:datetime)->float:
+
+        if timestamp.tzinfo is None:
+
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return timestamp.timestamp()
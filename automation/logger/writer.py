@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""automation/logger/writer.py
+
+This module implements a background batch writer for append-only records (events, logs).
+"""
+import logging, threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+DATETIME_FORMAT = "%m/%d/%Y, %H:%M:%S.%f"
+
+
+class PendingRecord:
+    r"""
+    Record queued in a [BatchWriter](#BatchWriter) and not written into the database yet.
+
+    **Parameters**
+
+    * **fields** (dict): Record fields, *timestamp* is set to now if not given.
+    """
+
+    def __init__(self, **fields):
+        r"""
+        Documentation here
+        """
+        if not fields.get("timestamp"):
+
+            fields["timestamp"] = datetime.now()
+
+        self.fields = fields
+
+    def serialize(self)->dict:
+        r"""
+        Fields of the record, datetimes formatted like the database records, *id* is None until it's written.
+
+        Records whose database serialization has other fields (i.e. resolved foreign keys) override it, like
+        [PendingLog](./logs.py).
+        """
+        result = {"id": None}
+
+        for key, value in self.fields.items():
+
+            if isinstance(value, datetime):
+
+                value = value.strftime(DATETIME_FORMAT)
+
+            elif hasattr(value, "serialize"):
+
+                value = value.serialize()
+
+            result[key] = value
+
+        return result
+
+
+class BatchWriter:
+    r"""
+    Writes queued records into the database in batches from a background thread, so the caller
+    (an operator acknowledging alarms, a decorated API call...) never waits for a database INSERT.
+
+    Records not written yet are readable with *pending*, readers holding it see every record either
+    in the pending queue or in the database, never in both or none.
+
+    If the database rejects a batch it's kept and retried on the next period, at most *max_pending*
+    records are kept, the oldest ones are dropped beyond it.
+
+    A stopped writer starts a new thread on the next queued record, so it keeps writing after a stop/run cycle
+    of the app.
+
+    **Parameters**
+
+    * **name** (str): Thread name.
+    * **write** (callable): Writes a list of [PendingRecord](#PendingRecord)s, it must return None on failure.
+    * **period** (float): Seconds between flushes.
+    * **max_batch** (int): Maximum records per flush, a flush is triggered as soon as they're queued.
+    * **max_pending** (int): Maximum queued records.
+    """
+
+    def __init__(self, name:str, write, period:float=0.5, max_batch:int=500, max_pending:int=10000):
+        r"""
+        Documentation here
+        """
+        self.name = name
+        self._write = write
+        self._period = period
+        self._max_batch = max_batch
+        self._pending = deque(maxlen=max_pending)
+        self._queue_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.written = 0
+        self.failed_flushes = 0
+
+    def put(self, record:PendingRecord)->PendingRecord:
+        r"""
+        Queues *record*, the writer thread is started on the first record.
+        """
+        with self._queue_lock:
+
+            if len(self._pending)==self._pending.maxlen:
+
+                logging.warning(f"{self.name}: max pending records reached, oldest record dropped")
+
+            self._pending.append(record)
+            full = len(self._pending) >= self._max_batch
+
+            if not self.is_alive():
+
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self.run, args=(self._stop_event, ), name=self.name, daemon=True)
+                self._thread.start()
+
+        if full:
+
+            self._wake_up.set()
+
+        return record
+
+    def is_alive(self)->bool:
+        r"""
+        Whether the writer thread is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self, stop_event:threading.Event):
+        r"""
+        Documentation here
+        """
+        while not stop_event.is_set():
+
+            self._wake_up.wait(self._period)
+            self._wake_up.clear()
+            self.flush()
+
+    def flush(self)->bool:
+        r"""
+        Writes the pending records, returns False if the database rejected them.
+        """
+        with self._flush_lock:
+
+            while True:
+
+                with self._queue_lock:
+
+                    batch = [self._pending[counter] for counter in range(min(len(self._pending), self._max_batch))]
+
+                if not batch:
+
+                    return True
+
+                if self._write(batch) is None:
+
+                    self.failed_flushes += 1
+
+                    return False
+
+                with self._queue_lock:
+
+                    for record in batch:
+
+                        if self._pending and self._pending[0] is record:
+
+                            self._pending.popleft()
+
+                self.written += len(batch)
+
+    def configure(self, period:float=None, max_batch:int=None)->dict:
+        r"""
+        Changes the flush period and the batch size (i.e. fewer and bigger batches during an alarm flood),
+        returns the previous ones.
+        """
+        previous = {"period": self._period, "max_batch": self._max_batch}
+
+        if period is not None:
+
+            self._period = period
+
+        if max_batch is not None:
+
+            self._max_batch = max_batch
+
+        return previous
+
+    @contextmanager
+    def pending(self):
+        r"""
+        Yields the pending records, newest first, while no flush is in progress.
+        """
+        with self._flush_lock:
+
+            with self._queue_lock:
+
+                records = list(reversed(self._pending))
+
+            yield records
+
+    def stop(self):
+        r"""
+        Stops the writer thread after writing the pending records.
+        """
+        with self._queue_lock:
+
+            thread = self._thread
+            self._stop_event.set()
+            self._thread = None
+
+        self._wake_up.set()
+
+        if thread is not None and thread.is_alive():
+
+            thread.join(timeout=self._period * 4)
+
+        self.flush()
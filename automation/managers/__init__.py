@@ -1,4 +1,5 @@
 from .state_machine import StateMachineManager
 from .db import DBManager
 from .opcua_client import OPCUAClientManager
-from .alarms import AlarmManager
\ No newline at end of file
+from .alarms import AlarmManager
+from .async_opcua_client import AsyncOPCUAClientManager
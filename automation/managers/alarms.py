@@ -3,16 +3,36 @@
 This module implements Alarm Manager.
 """
 from datetime import datetime
-import queue
+from collections import OrderedDict
+from itertools import islice
+import queue, logging, threading
 from ..singleton import Singleton
 from ..tags import CVTEngine, TagObserver
 from ..alarms import AlarmState, Alarm
-from ..dbmodels.alarms import AlarmSummary
+from ..alarms.states import States
+from ..alarms.evaluation import AlarmEvaluationEngine, ACTIVE_STATES
+from ..alarms.flood import AlarmFlood
+from ..utils.timer_wheel import TimerWheel
+from ..utils.updates import UpdatesBroker
 from ..modules.users.users import User
 from ..models import FloatType, StringType
 from ..utils.decorators import set_event, logging_error_handler
 
 
+# Alarm state machine state id: AlarmState name
+STATE_NAMES = {
+    "normal": States.NORM.value,
+    "unack_alarm": States.UNACK.value,
+    "ack_alarm": States.ACKED.value,
+    "rtn_unack": States.RTNUN.value,
+    "shelved": States.SHLVD.value,
+    "suppressed_by_design": States.DSUPR.value,
+    "out_of_service": States.OOSRV.value
+}
+# States listed as active alarms, triggered or not acknowledged yet
+ANNUNCIATED_STATES = ("unack_alarm", "ack_alarm", "rtn_unack")
+
+
 class AlarmManager(Singleton):
     r"""
     This class implements all definitions for the Alarm Management System
@@ -23,6 +43,18 @@ class AlarmManager(Singleton):
         self._alarms = dict()
         self._tag_queue = queue.Queue()
         self.tag_engine = CVTEngine()
+        self.evaluation = AlarmEvaluationEngine()
+        self.timer_wheel = TimerWheel(name="AlarmTimerWheel")
+        self.evaluation.set_timer_wheel(self.timer_wheel)
+        self.evaluation.set_listener(self)
+        self.flood = AlarmFlood()
+        self._parents = dict()
+        self._flood_settings = {"refresh_interval": 5.0, "write_period": 5.0, "write_batch": 5000, "check_period": 10.0}
+        self._writer_settings = None
+        self._state_counters = {state: 0 for state in STATE_NAMES}
+        self._active_alarms = OrderedDict()
+        self._summary_lock = threading.Lock()
+        self.updates = UpdatesBroker()
 
     def get_queue(self)->queue.Queue:
         r"""
@@ -43,7 +75,10 @@ class AlarmManager(Singleton):
             timestamp:str=None,
             ack_timestamp:str=None,
             user:User=None,
-            reload:bool=False
+            reload:bool=False,
+            deadband:float=0.0,
+            on_delay:float=0.0,
+            off_delay:float=0.0
         )->tuple[Alarm, str]:
         r"""
         Append alarm to the Alarm Manager
@@ -51,6 +86,9 @@ class AlarmManager(Singleton):
         **Paramters**
 
         * **alarm**: (Alarm Object)
+        * **deadband** (float): Value change back from the trigger value needed to return to normal.
+        * **on_delay** (float): Seconds the value must stay abnormal before the alarm is triggered.
+        * **off_delay** (float): Seconds the value must stay normal before the alarm returns to normal.
 
         **Returns**
 
@@ -82,6 +120,9 @@ class AlarmManager(Singleton):
             description=description,
             alarm_type=StringType(type),
             alarm_setpoint=FloatType(trigger_value),
+            alarm_deadband=FloatType(float(deadband)),
+            alarm_on_delay=FloatType(float(on_delay)),
+            alarm_off_delay=FloatType(float(off_delay)),
             identifier=identifier,
             state=state,
             timestamp=timestamp,
@@ -90,6 +131,9 @@ class AlarmManager(Singleton):
             reload=reload
         )
         self._alarms[alarm.identifier] = alarm
+        self.__count(alarm=alarm, state=alarm.current_state.id, increment=1)
+        alarm.add_observer(self)
+        self.updates.publish("alarms", alarm.identifier, alarm)
 
         return alarm, f"Alarm creation successful"
 
@@ -154,6 +198,7 @@ class AlarmManager(Singleton):
             trigger_value=trigger_value
             )
         self._alarms[id] = alarm
+        self.updates.publish("alarms", id, alarm)
 
     @logging_error_handler
     @set_event(message=f"Deleted", classification="Alarm", priority=3, criticity=5)
@@ -168,6 +213,10 @@ class AlarmManager(Singleton):
         if id in self._alarms:
 
             alarm = self._alarms.pop(id)
+            alarm.remove_observer(self)
+            self.__count(alarm=alarm, state=alarm.current_state.id, increment=-1)
+            self.evaluation.remove(alarm)
+            self.updates.delete("alarms", id)
 
         return alarm, f"Alarm: {alarm.name} - Tag: {alarm.tag}"
 
@@ -266,18 +315,52 @@ class AlarmManager(Singleton):
     @logging_error_handler
     def get_lasts_active_alarms(self, lasts:int=None)->list:
         r"""
-        Documentation here
+        Active alarms (unacknowledged, acknowledged or returned to normal unacknowledged), the last triggered first
+
+        **Parameters**
+
+        * **lasts** (int): Maximum alarms, all of them if it's None
         """
-        original_list = [alarm.serialize() for _, alarm in self.get_alarms().items()]
-        filtered_list = [elem for elem in original_list if elem['triggered']]
-        sorted_list = sorted(filtered_list, key=lambda x: x['timestamp'] if x['timestamp'] else '')
-        if lasts:
+        with self._summary_lock:
+
+            alarms = list(islice(reversed(self._active_alarms.values()), lasts))
+
+        return [alarm.serialize() for alarm in alarms]
+
+    def on_transition(self, alarm:Alarm, source:str, target:str):
+        r"""
+        Alarm observer, keeps the state counters and the active alarms after every alarm transition and publishes it to the UI
+        """
+        with self._summary_lock:
+
+            self._state_counters[source] -= 1
+            self._state_counters[target] += 1
+
+            if target=="unack_alarm":
 
-            if len(sorted_list)>lasts:
+                # Triggered again, it's the last one
+                self._active_alarms.pop(alarm.identifier, None)
+                self._active_alarms[alarm.identifier] = alarm
 
-                sorted_list = sorted_list[0:lasts]
+            elif target not in ANNUNCIATED_STATES:
 
-        return sorted_list
+                self._active_alarms.pop(alarm.identifier, None)
+
+        self.updates.publish("alarms", alarm.identifier, alarm)
+
+    def __count(self, alarm:Alarm, state:str, increment:int):
+
+        with self._summary_lock:
+
+            self._state_counters[state] += increment
+
+            if increment > 0 and state in ANNUNCIATED_STATES:
+
+                self._active_alarms[alarm.identifier] = alarm
+
+            elif increment < 0:
+
+                self._active_alarms.pop(alarm.identifier, None)
 
     @logging_error_handler
     def serialize(self)->list:
@@ -287,6 +370,26 @@ class AlarmManager(Singleton):
 
         return [alarm.serialize() for _, alarm in self._alarms.items()]
 
+    def changes_since(self, version:int=0)->dict:
+        r"""
+        Alarms changed since *version*, every change (transition or definition) takes the next version.
+
+        **Parameters**
+
+        * **version** (int): Last version seen, 0 for every alarm.
+
+        **Returns**
+
+        * **dict**: {"version": last version, "rows": [serialized alarms], "deleted": [alarm identifiers]}
+        """
+        return self.updates.changes_since("alarms", version)
+
+    def get_version(self, id:str=None)->int:
+        r"""
+        Version of the last change of the alarm *id*, or of the last change of any alarm.
+        """
+        return self.updates.get_version("alarms", id)
+
     @logging_error_handler
     def get_tag_alarms(self)->list:
         r"""
@@ -373,37 +476,179 @@ class AlarmManager(Singleton):
     @logging_error_handler
     def filter_by(self, **fields):
         r"""
-        Documentation here
+        Filters the alarm summary through the alarms logger engine, so the records queued in its writer are
+        written before the query
         """
+        from ..logger.alarms import AlarmsLoggerEngine
 
-        return AlarmSummary.filter_by(**fields), 200
+        return AlarmsLoggerEngine().filter_alarm_summary_by(**fields), 200
 
     @logging_error_handler
     def get_lasts(self, lasts:int=10):
         r"""
-        Documentation here
+        Last alarm summary records, through the alarms logger engine like [filter_by](#filter_by)
         """
+        from ..logger.alarms import AlarmsLoggerEngine
 
-        return AlarmSummary.read_lasts(lasts=lasts), 200
+        return AlarmsLoggerEngine().get_lasts(lasts=lasts), 200
 
     @logging_error_handler
     def summary(self)->dict:
         r"""
-        Summarizes all Alarm Manager
+        Summarizes all Alarm Manager, from the counters kept on every alarm transition
 
         **Returns**
 
-        * **summary**: (dict)
+        * **summary**: (dict) {"length": alarms, "active": active alarms, "states": {state name: alarms}}
+        """
+        with self._summary_lock:
+
+            return {
+                "length": len(self._alarms),
+                "active": len(self._active_alarms),
+                "states": {STATE_NAMES[state]: counter for state, counter in self._state_counters.items()}
+            }
+
+    @logging_error_handler
+    def set_flood(
+            self,
+            threshold:int=10,
+            window:float=600.0,
+            operators:int=1,
+            refresh_interval:float=5.0,
+            write_period:float=5.0,
+            write_batch:int=5000,
+            check_period:float=10.0
+        ):
+        r"""
+        Configures the alarm flood mode.
+
+        **Parameters**
+
+        * **threshold** (int): Alarms per operator in *window* that start a flood (ISA-18.2: 10 per 10 minutes).
+        * **window** (float): Seconds.
+        * **operators** (int): Operators sharing the alarm load.
+        * **refresh_interval** (float): UI refresh interval during a flood, seconds.
+        * **write_period** (float): Alarm summary flush period during a flood, seconds.
+        * **write_batch** (int): Alarm summary batch size during a flood.
+        * **check_period** (float): Seconds between checks for the end of a flood.
         """
-        result = dict()
-        alarms = [_alarm.name for id, _alarm in self.get_alarms().items()]
-        result["length"] = len(alarms)
-        result["alarms"] = alarms
-        result["alarm_tags"] = self.get_tag_alarms()
-        result["tags"] = self.tags()
+        self.flood = AlarmFlood(threshold=threshold, window=window, operators=operators)
+        self._flood_settings = {
+            "refresh_interval": refresh_interval,
+            "write_period": write_period,
+            "write_batch": write_batch,
+            "check_period": check_period
+        }
+
+    @logging_error_handler
+    def set_parent(self, name:str, parent:str=None):
+        r"""
+        Sets the parent of alarm *name*, during a flood *name* is a consequential alarm: it's suppressed while its
+        parent is active. *parent=None* removes the relationship.
+
+        **Parameters**
+
+        * **name** (str): Child alarm name.
+        * **parent** (str): Parent alarm name.
+        """
+        if parent is None:
+
+            self._parents.pop(name, None)
+
+        else:
+
+            self._parents[name] = parent
+
+    def get_parents(self)->dict:
+        r"""
+        Documentation here
+        """
+        return dict(self._parents)
+
+    def on_alarm(self, alarm:Alarm)->bool:
+        r"""
+        Evaluation engine listener, called before *alarm* is triggered.
+
+        It counts the alarm for the flood detection and returns False to suppress it when it's a consequential
+        alarm during a flood.
+        """
+        if self.flood.flooding and alarm.name in self._parents:
+
+            parent = self.get_alarm_by_name(name=self._parents[alarm.name])
+
+            if parent and parent.current_state.id in ACTIVE_STATES:
+
+                self.flood.suppress(alarm.name)
+
+                return False
+
+        if self.flood.record():
+
+            self.__start_flood()
+
+        return True
+
+    def check_flood(self):
+        r"""
+        Ends the flood when the alarm rate is back under the release threshold, scheduled in the timer wheel while flooding
+        """
+        if self.flood.update():
+
+            self.__end_flood()
+
+        elif self.flood.flooding:
+
+            self.timer_wheel.schedule("alarm_flood", self._flood_settings["check_period"], self.check_flood)
+
+    def get_refresh_interval(self)->float:
+        r"""
+        UI refresh interval in seconds, longer during a flood
+        """
+        if self.flood.flooding:
+
+            return self._flood_settings["refresh_interval"]
+
+        return 1.0
+
+    def get_flood_metrics(self)->dict:
+        r"""
+        Documentation here
+        """
+        result = self.flood.serialize()
+        result["suppressed_alarms"] = self.evaluation.get_suppressed()
+        result["parents"] = self.get_parents()
 
         return result
 
+    def __start_flood(self):
+        r"""
+        Flood mode, alarm summary records are written in bigger and fewer batches
+        """
+        from ..logger.alarms import AlarmsLoggerEngine
+
+        logging.warning(f"Alarm flood: {self.flood.get_rate()} alarms in {self.flood.window} s")
+        self._writer_settings = AlarmsLoggerEngine().writer.configure(
+            period=self._flood_settings["write_period"],
+            max_batch=self._flood_settings["write_batch"]
+        )
+        self.timer_wheel.schedule("alarm_flood", self._flood_settings["check_period"], self.check_flood)
+
+    def __end_flood(self):
+        r"""
+        Documentation here
+        """
+        from ..logger.alarms import AlarmsLoggerEngine
+
+        logging.warning(f"Alarm flood ended, {sum(self.flood.suppressed.values())} consequential alarms suppressed")
+
+        if self._writer_settings:
+
+            AlarmsLoggerEngine().writer.configure(**self._writer_settings)
+            self._writer_settings = None
+
+        self.evaluation.release()
+
     @logging_error_handler
     def attach(self, alarm_name:str):
 
@@ -0,0 +1,180 @@
+import asyncio, threading
+from ..opcua.async_models import AsyncClient
+from ..dbmodels import OPCUA
+from ..logger.datalogger import DataLoggerEngine
+
+
+class AsyncOPCUAClientManager:
+    r"""
+    Drop-in alternative to [OPCUAClientManager](./opcua_client.py) backed by *asyncua*.
+
+    All clients live in a single asyncio event loop running in a background daemon thread, the public
+    methods are a thread-safe facade over that loop so they can be called from the DAQ machines, the
+    workers or the Flask/Dash threads exactly like the synchronous manager.
+
+    Requests over several namespaces or several servers are issued concurrently, one slow PLC doesn't
+    delay the reads of the others.
+
+    **Parameters**
+
+    * **timeout** (float): Seconds to wait for any request sent to the event loop.
+    """
+
+    def __init__(self, timeout:float=10):
+        r"""
+        Documentation here
+        """
+        self._clients = dict()
+        self._timeout = timeout
+        self.logger = DataLoggerEngine()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="AsyncOPCUAClientManager", daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine):
+        r"""
+        Schedules *coroutine* in the manager's event loop and blocks the calling thread until its result is available.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+        return future.result(timeout=self._timeout)
+
+    def add(self, client_name:str, host:str, port:int):
+        r"""
+        Documentation here
+        """
+        endpoint_url = f"opc.tcp://{host}:{port}"
+        if client_name in self._clients:
+
+            return KeyError(f"Client Name {client_name} duplicated")
+
+        opcua_client = AsyncClient(endpoint_url, client_name=client_name)
+        message, status_connection = self._run(opcua_client.connect())
+        if status_connection==200:
+
+            self._clients[client_name] = opcua_client
+
+            # DATABASE PERSISTENCY
+            if self.logger.get_db():
+
+                OPCUA.create(client_name=client_name, host=host, port=port)
+
+        return message
+
+    def remove(self, client_name:str):
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            opcua_client = self._clients.pop(client_name)
+            self._run(opcua_client.disconnect())
+            # DATABASE PERSISTENCY
+            if self.logger.get_db():
+                opcua = OPCUA.get_by_client_name(client_name=client_name)
+                if opcua:
+                    opcua.delete_instance()
+
+    def connect(self, client_name:str)->dict:
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            return self._run(self._clients[client_name].connect())
+
+    def disconnect(self, client_name:str)->dict:
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            return self._run(self._clients[client_name].disconnect())
+
+    def get(self, client_name:str)->AsyncClient:
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            return self._clients[client_name]
+
+    def get_node_values(self, client_name:str, namespaces:list)->list:
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            client = self._clients[client_name]
+
+            return self._run(client.get_nodes_values(namespaces=namespaces))
+
+    def get_values(self, requests:dict)->dict:
+        r"""
+        Reads the Value attribute of several clients at once.
+
+        **Parameters**
+
+        * **requests** (dict): {client_name: [namespace, ...]}
+
+        **Returns**
+
+        * **dict**: {client_name: [{"Namespace", "Value", "Timestamp"}, ...]}, clients that fail map to an empty list.
+        """
+        client_names = [client_name for client_name in requests if client_name in self._clients]
+
+        async def gather():
+
+            return await asyncio.gather(
+                *[self._clients[client_name].get_values(namespaces=requests[client_name]) for client_name in client_names],
+                return_exceptions=True
+                )
+
+        results = self._run(gather())
+
+        return {client_name: [] if isinstance(result, Exception) else result[0] for client_name, result in zip(client_names, results)}
+
+    def get_node_value_by_opcua_address(self, opcua_address:str, namespace:str)->list:
+        r"""
+        Documentation here
+        """
+        for client_name, client in self._clients.items():
+
+            if opcua_address==client.serialize()["server_url"]:
+
+                return self.get_node_attributes(client_name=client_name, namespaces=[namespace])
+
+    def get_node_attributes(self, client_name:str, namespaces:list)->list:
+        r"""
+        Documentation here
+        """
+        if client_name in self._clients:
+
+            client = self._clients[client_name]
+
+            return self._run(client.get_nodes_attributes(namespaces=namespaces))
+
+    def serialize(self, client_name:str=None)->dict:
+        r"""
+        Documentation here
+        """
+        if client_name:
+
+            if client_name in self._clients:
+
+                return self._clients[client_name].serialize()
+
+            return
+
+        return {client_name: client.serialize() for client_name, client in self._clients.items()}
+
+    def stop(self):
+        r"""
+        Disconnects every client and stops the background event loop.
+        """
+        for client_name in list(self._clients):
+
+            self.disconnect(client_name=client_name)
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=self._timeout)
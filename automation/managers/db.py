@@ -18,6 +18,7 @@ from ..utils.decorators import logging_error_handler
 from ..dbmodels import (
     Tags, 
     TagValue, 
+    TagValueBlock,
     AlarmTypes,
     AlarmStates, 
     Alarms,  
@@ -61,6 +62,7 @@ class DBManager(Singleton):
             DataTypes, 
             Tags, 
             TagValue, 
+            TagValueBlock,
             AlarmTypes,
             AlarmStates,
             Alarms,
@@ -1,4 +1,6 @@
+import logging
 from ..opcua.models import Client
+from ..opcua.supervisor import ConnectionSupervisor
 from ..dbmodels import OPCUA
 from ..logger.datalogger import DataLoggerEngine
 from ..tags import CVTEngine
@@ -14,6 +16,7 @@ class OPCUAClientManager:
         Documentation here
         """
         self._clients = dict()
+        self._supervisors = dict()
         self.logger = DataLoggerEngine()
         self.cvt = CVTEngine()
         self.das = DAS()
@@ -44,18 +47,10 @@ class OPCUAClientManager:
                 
                 OPCUA.create(client_name=client_name, host=host, port=port)
 
-            # RECONNECT TO SUBSCRIPTION 
-            for tag in self.cvt.get_tags():
-                
-                if tag["opcua_address"]==endpoint_url:
-
-                    if not tag["scan_time"]:
+            self._supervisors[client_name] = ConnectionSupervisor()
 
-                        subscription = opcua_client.create_subscription(1000, self.das)
-                        node_id = opcua_client.get_node_id_by_namespace(tag["node_namespace"])
-                        self.das.subscribe(subscription=subscription, client_name=client_name, node_id=node_id)
-
-                    self.das.restart_buffer(tag=self.cvt.get_tag(id=tag["id"]))
+            # RECONNECT TO SUBSCRIPTION 
+            self.restore_subscriptions(client_name=client_name, restart_buffer=True)
         
         return message
 
@@ -66,12 +61,13 @@ class OPCUAClientManager:
         if client_name in self._clients:
 
             opcua_client = self._clients.pop(client_name)
+            self._supervisors.pop(client_name, None)
             opcua_client.disconnect()
             # DATABASE PERSISTENCY
-            opcua = OPCUA.get_by_client_name(client_name=client_name)
-            if opcua:
-                if self.logger.get_db():
-                    OPCUA.delete(id=opcua.id)
+            if self.logger.get_db():
+                opcua = OPCUA.get_by_client_name(client_name=client_name)
+                if opcua:
+                    opcua.delete_instance()
 
     def connect(self, client_name:str)->dict:
         r"""
@@ -79,7 +75,13 @@ class OPCUAClientManager:
         """
         if client_name in self._clients:
 
-            self._clients[client_name].connect()
+            message, status = self._clients[client_name].connect()
+            if status==200:
+
+                self._supervisors[client_name].enabled = True
+                self._supervisors[client_name].reset()
+
+            return message
 
     def disconnect(self, client_name:str)->dict:
         r"""
@@ -87,6 +89,7 @@ class OPCUAClientManager:
         """
         if client_name in self._clients:
 
+            self._supervisors[client_name].enabled = False
             self._clients[client_name].disconnect()
 
     def get(self, client_name:str)->Client:
@@ -112,6 +115,16 @@ class OPCUAClientManager:
 
             return client.get_nodes_values(namespaces=namespaces)
         
+    def get_client_name_by_opcua_address(self, opcua_address:str)->str|None:
+        r"""
+        Documentation here
+        """
+        for client_name, client in self._clients.items():
+
+            if opcua_address==client.serialize()["server_url"]:
+
+                return client_name
+
     def get_node_value_by_opcua_address(self, opcua_address:str, namespace:str)->list:
         r"""
         Documentation here
@@ -119,6 +132,10 @@ class OPCUAClientManager:
         for client_name, client in self._clients.items():
 
             if opcua_address==client.serialize()["server_url"]:
+
+                if not self.is_connected(client_name=client_name):
+
+                    return None
                 
                 return self.get_node_attributes(client_name=client_name, namespaces=[namespace])
         
@@ -136,6 +153,131 @@ class OPCUAClientManager:
 
             return result
 
+    def is_connected(self, client_name:str)->bool:
+        r"""
+        Connection state as seen by the supervisor, it doesn't hit the network.
+        """
+        if client_name in self._supervisors:
+
+            return self._supervisors[client_name].connected
+
+        return False
+
+    def restore_subscriptions(self, client_name:str, restart_buffer:bool=False):
+        r"""
+        Subscribes again the DAS tags (tags without scan time) served by *client_name*.
+
+        Monitored items belong to the session, so the old ones are forgotten instead of unsubscribed.
+        """
+        opcua_client = self._clients[client_name]
+        endpoint_url = opcua_client.serialize()["server_url"]
+        self.das.forget_client(client_name=client_name)
+
+        for tag in self.cvt.get_tags():
+            
+            if tag["opcua_address"]==endpoint_url:
+
+                if not tag["scan_time"]:
+
+                    subscription = opcua_client.create_subscription(1000, self.das)
+                    node_id = opcua_client.get_node_id_by_namespace(tag["node_namespace"])
+                    self.das.subscribe(subscription=subscription, client_name=client_name, node_id=node_id)
+
+                if restart_buffer:
+
+                    self.das.restart_buffer(tag=self.cvt.get_tag(id=tag["id"]))
+
+    def supervise(self):
+        r"""
+        One supervision cycle over all clients, it's called periodically by the OPCUAClientWorker.
+
+        * Connected clients are probed with a keepalive read, when it fails their tags are flagged with "Bad" quality.
+        * Disconnected clients are reconnected when their backoff delay is due, on success the DAS subscriptions are replayed.
+        """
+        for client_name, opcua_client in list(self._clients.items()):
+
+            supervisor = self._supervisors[client_name]
+
+            if not supervisor.enabled:
+
+                continue
+
+            if supervisor.connected:
+
+                if opcua_client.check_connection():
+
+                    continue
+
+                logging.warning(f"OPC UA client {client_name} lost connection to {opcua_client.serialize()['server_url']}")
+                supervisor.connection_lost()
+                self.__set_quality(client_name=client_name, quality="Bad")
+
+            if not supervisor.is_due():
+
+                continue
+
+            if opcua_client.reconnect():
+
+                samples_lost = self.__estimate_samples_lost(client_name=client_name, outage=supervisor.get_outage_duration())
+                supervisor.reconnected(samples_lost=samples_lost)
+                logging.warning(f"OPC UA client {client_name} reconnected after {supervisor.last_reconnect_latency:.2f}s")
+
+                try:
+
+                    self.restore_subscriptions(client_name=client_name)
+
+                except Exception as err:
+
+                    logging.error(f"OPC UA client {client_name} could not restore its subscriptions: {err}")
+                    supervisor.connection_lost()
+
+            else:
+
+                supervisor.attempt_failed()
+
+    def get_connection_metrics(self, client_name:str=None)->dict:
+        r"""
+        Reconnect latency, outages and samples lost per client, see [ConnectionSupervisor](../opcua/supervisor.py).
+        """
+        if client_name:
+
+            if client_name in self._supervisors:
+
+                return self._supervisors[client_name].serialize()
+
+            return dict()
+
+        return {client_name: supervisor.serialize() for client_name, supervisor in self._supervisors.items()}
+
+    def __get_client_tags(self, client_name:str)->list[dict]:
+        r"""
+        Documentation here
+        """
+        endpoint_url = self._clients[client_name].serialize()["server_url"]
+
+        return [tag for tag in self.cvt.get_tags() if tag["opcua_address"]==endpoint_url and tag["node_namespace"]]
+
+    def __set_quality(self, client_name:str, quality:str):
+        r"""
+        Documentation here
+        """
+        for tag in self.__get_client_tags(client_name=client_name):
+
+            self.cvt.set_quality(id=tag["id"], quality=quality)
+
+    def __estimate_samples_lost(self, client_name:str, outage:float)->int:
+        r"""
+        Samples that would have been acquired during *outage* seconds, DAS subscriptions publish every second.
+        """
+        samples_lost = 0
+
+        for tag in self.__get_client_tags(client_name=client_name):
+
+            period = tag["scan_time"] / 1000 if tag["scan_time"] else 1.0
+            samples_lost += int(outage // period)
+
+        return samples_lost
+
     def serialize(self, client_name:str=None)->dict:
         r"""
         Documentation here
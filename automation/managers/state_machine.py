@@ -6,6 +6,7 @@ This module implements Function Manager.
 from statemachine import StateMachine
 from ..models import StringType
 from ..tags import TagObserver, CVTEngine, Tag
+from ..utils.updates import UpdatesBroker
 import queue
 
 class StateMachineManager:
@@ -19,6 +20,7 @@ class StateMachineManager:
 
         self._machines = list()
         self._tag_queue = queue.Queue()
+        self.updates = UpdatesBroker()
 
     def get_queue(self)->queue.Queue:
         r"""Documentation here
@@ -41,7 +43,7 @@ class StateMachineManager:
 
         * **machine:** (PyHadesStateMachine) instance
         * **interval:** (float) Execution interval in seconds
-        * **mode:** (str) Thread mode of the state machine, allowed mode ('sync', 'async')
+        * **mode:** (str) Thread mode of the state machine, allowed mode ('sync', 'async', 'shared', 'process')
 
         **Returns** `None`
 
@@ -54,6 +56,7 @@ class StateMachineManager:
         """
         
         self._machines.append(machine)
+        self.updates.publish("machines", machine[0].name.value, machine[0])
 
     def get_machines(self)->list:
         r"""
@@ -26,7 +26,10 @@ append_alarm_resource_model = api.model("append_alarm_resource_model",{
     'tag': fields.String(required=True, description='Tag to whom the alarm will be subscribed'),
     'description': fields.String(required=False, description='Alarm description'),
     'type': fields.String(required=True, description='Alarm Type - Allowed ["HIGH-HIGH", "HIGH", "BOOL", "LOW", "LOW-LOW"]'),
-    'trigger_value': fields.Float(required=True, description="Alarm trigger value")
+    'trigger_value': fields.Float(required=True, description="Alarm trigger value"),
+    'deadband': fields.Float(required=False, description="Value change back from the trigger value needed to return to normal"),
+    'on_delay': fields.Float(required=False, description="Seconds the value must stay abnormal before the alarm is triggered"),
+    'off_delay': fields.Float(required=False, description="Seconds the value must stay normal before the alarm returns to normal")
 })
 
 
@@ -41,6 +44,17 @@ class AlarmsCollection(Resource):
         """
         return app.alarm_manager.serialize(), 200
     
+@ns.route('/flood')
+class AlarmsFloodResource(Resource):
+
+    @api.doc(security='apikey')
+    @Api.token_required(auth=True)
+    def get(self):
+        """
+        Get alarm flood metrics
+        """
+        return app.get_alarm_flood_metrics(), 200
+
 @ns.route('/actions/<alarm_name>')
 class AlarmsActionsCollection(Resource):
 
@@ -14,7 +14,9 @@ events_filter_model = api.model("events_filter_model",{
     'priorities': fields.List(fields.Integer(), required=False),
     'criticities': fields.List(fields.Integer(), required=False),
     'greater_than_timestamp': fields.DateTime(required=False, default=datetime.now() - timedelta(minutes=2), description=f'Greater than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}'),
-    'less_than_timestamp': fields.DateTime(required=False, default=datetime.now(), description=f'Less than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}')
+    'less_than_timestamp': fields.DateTime(required=False, default=datetime.now(), description=f'Less than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}'),
+    'limit': fields.Integer(required=False, description="Maximum records, all of them if not given"),
+    'cursor': fields.Integer(required=False, description="next_cursor of the previous response")
 })
 
     
@@ -27,9 +29,14 @@ class EventsSummaryFilterByResource(Resource):
     def post(self):
         r"""
         Events Summary Filter By
+
+        Newest events first, streamed as `{"data": [...], "next_cursor": int|None}`
         """
-        
-        return app.filter_events_by(**api.payload)
+        filters = dict(api.payload)
+        limit = filters.pop("limit", None)
+        cursor = filters.pop("cursor", None)
+
+        return Api.stream_pages(lambda **page: app.filter_events_by(**filters, **page), limit=limit, cursor=cursor)
     
 
 @ns.route('/lasts/<lasts>')
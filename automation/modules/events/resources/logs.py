@@ -12,9 +12,11 @@ logs_filter_model = api.model("logs_filter_model",{
     'usernames': fields.List(fields.String(), required=False),
     'alarm_names': fields.List(fields.String(), required=False),
     'event_ids': fields.List(fields.Integer(), required=False),
-    'classification': fields.List(fields.String(), required=False),
+    'classifications': fields.List(fields.String(), required=False),
     'greater_than_timestamp': fields.DateTime(required=False, default=datetime.now() - timedelta(minutes=2), description=f'Greater than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}'),
-    'less_than_timestamp': fields.DateTime(required=False, default=datetime.now(), description=f'Less than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}')
+    'less_than_timestamp': fields.DateTime(required=False, default=datetime.now(), description=f'Less than timestamp - DateTime Format: {app.cvt.DATETIME_FORMAT}'),
+    'limit': fields.Integer(required=False, description="Maximum records, all of them if not given"),
+    'cursor': fields.Integer(required=False, description="next_cursor of the previous response")
 })
 
 logs_model = api.model("logs_model",{
@@ -33,6 +35,8 @@ class AddLogsByResource(Resource):
     def post(self):
         r"""
         Create Log
+
+        The log is queued and written in the next batch of the logs writer, its *id* is null until then.
         """
         user = Api.get_current_user()
         api.payload.update({
@@ -68,9 +72,14 @@ class LogsFilterByResource(Resource):
     def post(self):
         r"""
         Logs Filter By
+
+        Newest logs first, streamed as `{"data": [...], "next_cursor": int|None}`
         """
-        
-        return app.filter_logs_by(**api.payload), 200
+        filters = dict(api.payload)
+        limit = filters.pop("limit", None)
+        cursor = filters.pop("cursor", None)
+
+        return Api.stream_pages(lambda **page: app.filter_logs_by(**filters, **page), limit=limit, cursor=cursor)
     
 
 @ns.route('/lasts/<lasts>')
@@ -1,9 +1,11 @@
-import pytz
+import pytz, importlib.util
 from datetime import datetime, timedelta
+from flask import Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from .... import PyAutomation
 from ....extensions.api import api
 from ....extensions import _api as Api
+from ....utils import export
 
 
 ns = Namespace('Tags', description='Tags')
@@ -16,6 +18,14 @@ query_trends_model = api.model("query_trends_model",{
     'timezone': fields.String(required=True, default='UTC')
 })
 
+export_trends_model = api.model("export_trends_model",{
+    'tags':  fields.List(fields.String(), required=True),
+    'greater_than_timestamp': fields.DateTime(required=True, default=datetime.now().astimezone(pytz.UTC) - timedelta(minutes=5), description='Greater than DateTime'),
+    'less_than_timestamp': fields.DateTime(required=True, default=datetime.now().astimezone(pytz.UTC), description='Less than DateTime'),
+    'timezone': fields.String(required=True, default='UTC'),
+    'format': fields.String(required=False, default='ndjson', enum=list(export.FORMATS), description='ndjson, csv or arrow (Arrow IPC stream, requires pyarrow)')
+})
+
 
 @ns.route('/')
 class TagsCollection(Resource):
@@ -59,6 +69,52 @@ class QueryTrendsResource(Resource):
         
         return result, 200
     
+@ns.route('/export')
+class ExportTrendsResource(Resource):
+
+    @api.doc(security='apikey')
+    @Api.token_required(auth=True)
+    @ns.expect(export_trends_model)
+    def post(self):
+        """
+        Export tag values filtering by timestamp
+
+        The values are streamed as NDJSON, CSV or Arrow IPC while they're read from the database, chunk by chunk.
+        """
+        timezone = api.payload.get("timezone", "UTC")
+        _format = api.payload.get("format", "ndjson")
+
+        if timezone not in pytz.all_timezones:
+
+            return f"Invalid Timezone", 400
+
+        if _format not in export.FORMATS:
+
+            return f"Invalid format, it must be one of {list(export.FORMATS)}", 400
+
+        if _format=="arrow" and importlib.util.find_spec("pyarrow") is None:
+
+            return f"Arrow export requires pyarrow", 400
+        
+        separator = '.'
+        start = api.payload['greater_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        stop = api.payload['less_than_timestamp'].replace("T", " ").split(separator, 1)[0] + '.00'
+        samples = app.iter_trends(start, stop, timezone, *api.payload['tags'])
+
+        if _format=="arrow":
+
+            chunks = export.to_arrow(samples, timezone=timezone)
+
+        elif _format=="csv":
+
+            chunks = export.to_csv(samples)
+
+        else:
+
+            chunks = export.to_ndjson(samples)
+        
+        return Response(stream_with_context(chunks), mimetype=export.FORMATS[_format])
+    
 @ns.route('/timezones')
 class TimezonesCollection(Resource):
 
@@ -0,0 +1,197 @@
+import asyncio, uuid, logging
+from asyncua import Client as AsyncOPCClient
+from asyncua import ua
+
+
+class AsyncClient(AsyncOPCClient):
+    r"""
+    asyncio counterpart of [Client](./models.py) built on top of *asyncua*.
+
+    Every public method is a coroutine and must be awaited inside the event loop owned by
+    [AsyncOPCUAClientManager](../managers/async_opcua_client.py), reads over several nodes are issued
+    concurrently instead of one blocking round trip after the other.
+    """
+    def __init__(self, url, client_name:str, timeout=4):
+        r"""
+        Documentation here
+        """
+        super(AsyncClient, self).__init__(url, timeout)
+        self._id = None
+        self._url = url
+        self._timeout = timeout
+        self.name = client_name
+        self._is_open = False
+
+    def get_id(self):
+        r"""
+        Documentation here
+        """
+        return self._id
+
+    async def connect(self):
+        r"""
+        Documentation here
+        """
+        try:
+
+            await super(AsyncClient, self).connect()
+            self._is_open = True
+            self._id = str(uuid.uuid4())
+            result = {
+                'message': 'Successful connection',
+                'url': self._url,
+                'is_connected': self._is_open,
+                'id': self.get_id()
+                }
+            return result, 200
+
+        except Exception as _err:
+
+            logging.error(f"Error during connection: {_err}")
+            self._is_open = False
+            result = {
+                'message': 'Connection could not be established',
+                'url': self._url,
+                'is_connected': self._is_open,
+                'id': self.get_id()
+                }
+            return result, 404
+
+    async def disconnect(self):
+        r"""
+        Documentation here
+        """
+        try:
+            await super(AsyncClient, self).disconnect()
+            self._is_open = False
+            result = {
+                'message': 'Successful disconnection',
+                'is_connected': False
+                }
+            return result, 200
+
+        except Exception as _err:
+            result = {'message': 'Disconnect could not be performed'}
+            return result, 404
+
+    def is_connected(self):
+        r"""
+        Documentation here
+        """
+        try:
+
+            return self._is_open and self.uaclient.protocol is not None and self.uaclient.protocol.state == 'open'
+
+        except Exception as _err:
+
+            return False
+
+    def get_node_id_by_namespace(self, namespace:str):
+        r"""
+        Documentation here
+        """
+        return self.get_node(ua.NodeId.from_string(namespace))
+
+    async def get_values(self, namespaces:list)->list:
+        r"""
+        Reads the Value attribute of all *namespaces* in a single Read service call.
+        """
+        nodes = [self.get_node_id_by_namespace(namespace) for namespace in namespaces]
+        results = await self.uaclient.read_attributes([node.nodeid for node in nodes], ua.AttributeIds.Value)
+        result = [{"Namespace": namespace, "Value": data_value.Value.Value, "Timestamp": data_value.SourceTimestamp} for namespace, data_value in zip(namespaces, results)]
+
+        return result, 200
+
+    async def __get_node_value(self, namespace:str):
+        r"""
+        Documentation here
+        """
+        _node = self.get_node_id_by_namespace(namespace)
+
+        if (await _node.read_node_class()).name.lower()=='variable':
+
+            return {
+                "Namespace": namespace,
+                "Value": await _node.read_value()
+                }
+
+    async def get_nodes_values(self, namespaces:list)->list:
+        r"""
+        Documentation here
+        """
+        nodes = await asyncio.gather(*[self.__get_node_value(namespace) for namespace in namespaces])
+
+        return [node for node in nodes if node is not None], 200
+
+    async def get_node_attributes(self, node_namespace)->dict:
+        r"""
+        Documentation here
+        """
+        _node = self.get_node_id_by_namespace(node_namespace)
+        node_class, browse_name, display_name, description = await asyncio.gather(
+            _node.read_node_class(),
+            _node.read_browse_name(),
+            _node.read_display_name(),
+            _node.read_description()
+        )
+
+        if node_class.name.lower()=='variable':
+
+            data_value, data_type, access_level, user_access_level, array_dimensions, value_rank = await asyncio.gather(
+                _node.read_data_value(),
+                _node.read_data_type_as_variant_type(),
+                _node.get_access_level(),
+                _node.get_user_access_level(),
+                _node.read_array_dimensions(),
+                _node.read_value_rank()
+            )
+
+            result = {
+                "NamespaceIndex": _node.nodeid.NamespaceIndex,
+                "NamespaceUri": getattr(_node.nodeid, "NamespaceUri", None),
+                "Identifier": _node.nodeid.Identifier,
+                "Namespace": _node.nodeid.to_string(),
+                "NodeClass": node_class.name,
+                "BrowseName": browse_name.Name,
+                "DataValue": data_value,
+                "DisplayName": display_name.Text,
+                "DataType": data_type.name,
+                "AccesLevel": [access_lvl.name for access_lvl in access_level],
+                "UserAccessLevel": [user_access_lvl.name for user_access_lvl in user_access_level],
+                "Description": description.Text if description else None,
+                "Value": data_value.Value.Value,
+                "ArrayDimensions": array_dimensions,
+                "ValueRank": value_rank.name
+            }
+
+        else:
+
+            result = {
+                "NamespaceIndex": _node.nodeid.NamespaceIndex,
+                "NamespaceUri": getattr(_node.nodeid, "NamespaceUri", None),
+                "Identifier": _node.nodeid.Identifier,
+                "Namespace": _node.nodeid.to_string(),
+                "NodeClass": node_class.name,
+                "BrowseName": browse_name.Name,
+                "DisplayName": display_name.Text,
+                "Description": description.Text if description else ''
+            }
+
+        return result, 200
+
+    async def get_nodes_attributes(self, namespaces:list)->list:
+        r"""
+        Documentation here
+        """
+        return list(await asyncio.gather(*[self.get_node_attributes(node_namespace=namespace) for namespace in namespaces]))
+
+    def serialize(self):
+        r"""
+        Documentation here
+        """
+        return {
+            'client_id': self.get_id(),
+            'server_url': self._url,
+            'timeout': self._timeout,
+            'is_opened': self._is_open
+        }
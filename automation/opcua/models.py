@@ -33,24 +33,7 @@ class Client(OPCClient):
         """
         try:
 
-            
-
-            try:
-                # Connect to the server
-                super(Client, self).connect()
-
-                # Re-establish the connection by creating a new SecureChannel
-                super(Client, self).open_secure_channel()
-
-                # Activate a session (you can create a new session if needed)
-                super(Client, self).activate_session()
-
-                # Now you're connected again!
-                
-            except Exception as e:
-
-                logging.error(f"Error during connection: {e}")
-
+            super(Client, self).connect()
             self._is_open = True
             self._id = str(uuid.uuid4())
             result = {
@@ -62,7 +45,8 @@ class Client(OPCClient):
             return result, 200
 
         except Exception as _err:
-            
+
+            logging.error(f"Error during connection: {_err}")
             self._is_open = False
             result = {
                 'message': 'Connection could not be established',
@@ -72,6 +56,48 @@ class Client(OPCClient):
                 }
             return result, 404
 
+    def reconnect(self)->bool:
+        r"""
+        Tears down whatever is left of the previous session and opens a new one against the same server,
+        unlike *disconnect* the client keeps its url so it can be supervised.
+
+        **Returns**
+
+        * **bool**: True if the new session was activated.
+        """
+        try:
+
+            super(Client, self).disconnect()
+
+        except Exception as _err:
+
+            pass
+
+        _, status = self.connect()
+
+        return status==200
+
+    def check_connection(self)->bool:
+        r"""
+        Keepalive probe, reads the server state node through the current session.
+
+        **Returns**
+
+        * **bool**: False if the socket is closed or the server doesn't answer within the client timeout.
+        """
+        if not self._is_open or not self.is_connected():
+
+            return False
+
+        try:
+
+            self.get_node(ua.NodeId(ua.ObjectIds.Server_ServerStatus_State)).get_value()
+            return True
+
+        except Exception as _err:
+
+            return False
+
     def __reset_object_attributes(self):
         r"""
         Documentation here
@@ -191,6 +217,24 @@ class Client(OPCClient):
         
         return result, 200
 
+    def register_nodes_by_namespaces(self, namespaces:list)->list:
+        r"""
+        Calls the RegisterNodes service for *namespaces* and returns their nodes, the node ids of the returned nodes
+        are the aliases given by the server, so reads over them are optimized server side and the namespace strings
+        are not parsed again.
+
+        The aliases belong to the current session, after a reconnection they must be registered again.
+        """
+        nodes = self.get_nodes_id_by_namespaces(namespaces=namespaces)
+
+        return self.register_nodes(nodes)
+
+    def get_data_values(self, nodes:list)->list:
+        r"""
+        Reads the Value attribute (DataValue) of *nodes* in a single Read service call.
+        """
+        return self.uaclient.get_attributes([node.nodeid for node in nodes], ua.AttributeIds.Value)
+
     def get_nodes_id_by_namespaces(self, namespaces:list):
         r"""
         Documentar here
@@ -0,0 +1,191 @@
+import time, heapq
+from math import gcd
+from ..tags import Tag
+
+
+class PollGroup:
+    r"""
+    Tags served by the same OPC UA server with the same scan time, they are read with a single Read service call.
+
+    **Parameters**
+
+    * **opcua_address** (str): OPC UA server url.
+    * **scan_time** (int): Scan time in milliseconds.
+    """
+
+    def __init__(self, opcua_address:str, scan_time:int):
+        r"""
+        Documentation here
+        """
+        self.opcua_address = opcua_address
+        self.scan_time = scan_time
+        self.period = scan_time / 1000
+        self.tags = dict()
+        self.next_deadline = None
+        self.runs = 0
+        self.deadline_misses = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self.read_errors = 0
+
+    def get_key(self)->tuple:
+        r"""
+        Documentation here
+        """
+        return (self.opcua_address, self.scan_time)
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        return {
+            "opcua_address": self.opcua_address,
+            "scan_time": self.scan_time,
+            "tags": list(self.tags),
+            "runs": self.runs,
+            "deadline_misses": self.deadline_misses,
+            "last_lateness": self.last_lateness,
+            "max_lateness": self.max_lateness,
+            "read_errors": self.read_errors
+        }
+
+
+class PollingScheduler:
+    r"""
+    Schedules the polling of tags with arbitrary scan times (milliseconds) from a single DAQ machine.
+
+    Tags are merged in [PollGroup](#PollGroup)s by (opcua_address, scan_time), the groups are kept in a heap ordered by
+    their next deadline and the DAQ machine wakes up every *tick*, the greatest common divisor of the scan times
+    (bounded by *min_tick* and *max_tick*).
+
+    New groups get a phase offset inside their period taken from the golden ratio sequence, so groups with the same
+    scan time don't fire on the same tick.
+
+    A group served after a whole period or more counts the skipped periods as deadline misses.
+
+    **Parameters**
+
+    * **min_tick** (int): Minimum tick in milliseconds.
+    * **max_tick** (int): Maximum tick in milliseconds.
+    """
+    GOLDEN_RATIO = 0.6180339887498949
+
+    def __init__(self, min_tick:int=10, max_tick:int=1000):
+        r"""
+        Documentation here
+        """
+        self.min_tick = min_tick
+        self.max_tick = max_tick
+        self._groups = dict()
+        self._heap = list()
+        self._sequence = 0
+        self._created = 0
+        self._tick = max_tick / 1000
+
+    def add(self, tag:Tag):
+        r"""
+        Adds *tag* to the group of its OPC UA server and scan time.
+        """
+        self.remove(tag_name=tag.get_name())
+        key = (tag.get_opcua_address(), int(tag.get_scan_time()))
+
+        if key not in self._groups:
+
+            group = PollGroup(opcua_address=key[0], scan_time=key[1])
+            self._groups[key] = group
+            self.__update_tick()
+            phase = (self._created * self.GOLDEN_RATIO) % 1 * group.period
+            phase = phase - phase % self._tick
+            self._created += 1
+            self.__push(group=group, deadline=time.monotonic() + phase)
+
+        self._groups[key].tags[tag.get_name()] = tag
+
+    def remove(self, tag_name:str):
+        r"""
+        Removes *tag_name* from its group, empty groups are dropped.
+        """
+        for key, group in list(self._groups.items()):
+
+            if tag_name in group.tags:
+
+                group.tags.pop(tag_name)
+
+                if not group.tags:
+
+                    self._groups.pop(key)
+                    self.__update_tick()
+
+                return
+
+    def get_groups(self)->list[PollGroup]:
+        r"""
+        Documentation here
+        """
+        return list(self._groups.values())
+
+    def get_tick(self)->float:
+        r"""
+        Machine interval in seconds needed to serve every group on time.
+        """
+        return self._tick
+
+    def __update_tick(self):
+        r"""
+        Documentation here
+        """
+        tick = 0
+
+        for scan_time in {group.scan_time for group in self._groups.values()}:
+
+            tick = gcd(tick, scan_time)
+
+        if not tick:
+
+            tick = self.max_tick
+
+        self._tick = min(max(tick, self.min_tick), self.max_tick) / 1000
+
+    def pop_due(self, now:float=None)->list[PollGroup]:
+        r"""
+        Returns the groups whose deadline is reached and schedules their next deadline.
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        due = list()
+        horizon = now + self._tick / 2
+
+        while self._heap and self._heap[0][0] <= horizon:
+
+            deadline, _, group = heapq.heappop(self._heap)
+
+            if self._groups.get(group.get_key()) is not group or group.next_deadline!=deadline:
+
+                continue
+
+            lateness = max(now - deadline, 0.0)
+            skipped = int(lateness // group.period)
+            group.runs += 1
+            group.deadline_misses += skipped
+            group.last_lateness = lateness
+            group.max_lateness = max(group.max_lateness, lateness)
+            self.__push(group=group, deadline=deadline + (skipped + 1) * group.period)
+            due.append(group)
+
+        return due
+
+    def serialize(self)->list[dict]:
+        r"""
+        Documentation here
+        """
+        return [group.serialize() for group in self._groups.values()]
+
+    def __push(self, group:PollGroup, deadline:float):
+        r"""
+        Documentation here
+        """
+        self._sequence += 1
+        group.next_deadline = deadline
+        heapq.heappush(self._heap, (deadline, self._sequence, group))
@@ -140,6 +140,12 @@ class DAS(Singleton):
                     }
                 })
 
+    def forget_client(self, client_name:str):
+        r"""
+        Drops the monitored items of *client_name* without calling the server, used when its session was lost
+        """
+        self.monitored_items.pop(client_name, None)
+
     def unsubscribe(self, client_name:str, node_id):
         r"""
         Documentation here
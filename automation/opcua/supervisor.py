@@ -0,0 +1,142 @@
+import time, random
+from datetime import datetime
+
+
+class ConnectionSupervisor:
+    r"""
+    Keeps the connection state of one OPC UA client and decides when the next reconnect attempt is due.
+
+    Reconnect attempts are spaced with exponential backoff and full jitter, delay = uniform(0, min(cap, base * 2 ** attempts)),
+    so several clients dropped by the same network outage don't hammer the servers in lockstep.
+
+    It also keeps the outage metrics:
+
+    * **outages**: Number of detected connection losses.
+    * **reconnects**: Number of successful reconnections.
+    * **last_reconnect_latency**: Seconds between the outage detection and the session being active again.
+    * **samples_lost**: Estimated samples not acquired during the outages (outage duration / scan time per tag).
+
+    **Parameters**
+
+    * **backoff_base** (float): Seconds of the first backoff window.
+    * **backoff_cap** (float): Maximum backoff window in seconds.
+    """
+
+    def __init__(self, backoff_base:float=1.0, backoff_cap:float=60.0):
+        r"""
+        Documentation here
+        """
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.enabled = True
+        self.connected = True
+        self.attempts = 0
+        self.next_attempt = 0.0
+        self.outage_started = None
+        self.outages = 0
+        self.reconnects = 0
+        self.last_reconnect_latency = None
+        self.max_reconnect_latency = None
+        self.samples_lost = 0
+        self.last_outage = None
+
+    def next_delay(self)->float:
+        r"""
+        Backoff delay in seconds for the current number of failed attempts.
+        """
+        window = min(self.backoff_cap, self.backoff_base * 2 ** self.attempts)
+
+        return random.uniform(0, window)
+
+    def is_due(self, now:float=None)->bool:
+        r"""
+        Documentation here
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        return self.enabled and not self.connected and now >= self.next_attempt
+
+    def connection_lost(self, now:float=None):
+        r"""
+        Documentation here
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        if self.connected:
+
+            self.connected = False
+            self.attempts = 0
+            self.outage_started = now
+            self.outages += 1
+            self.last_outage = datetime.now()
+            self.next_attempt = now
+
+    def attempt_failed(self, now:float=None):
+        r"""
+        Documentation here
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        self.next_attempt = now + self.next_delay()
+        self.attempts += 1
+
+    def reconnected(self, now:float=None, samples_lost:int=0):
+        r"""
+        Documentation here
+        """
+        if now is None:
+
+            now = time.monotonic()
+
+        latency = now - self.outage_started
+        self.last_reconnect_latency = latency
+        self.max_reconnect_latency = max(self.max_reconnect_latency or 0.0, latency)
+        self.samples_lost += samples_lost
+        self.reconnects += 1
+        self.reset()
+
+    def get_outage_duration(self, now:float=None)->float:
+        r"""
+        Seconds since the current outage was detected, 0 if connected.
+        """
+        if self.connected or self.outage_started is None:
+
+            return 0.0
+
+        if now is None:
+
+            now = time.monotonic()
+
+        return now - self.outage_started
+
+    def reset(self):
+        r"""
+        Documentation here
+        """
+        self.connected = True
+        self.attempts = 0
+        self.next_attempt = 0.0
+        self.outage_started = None
+
+    def serialize(self)->dict:
+        r"""
+        Documentation here
+        """
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "attempts": self.attempts,
+            "outages": self.outages,
+            "reconnects": self.reconnects,
+            "last_outage": self.last_outage,
+            "outage_duration": self.get_outage_duration(),
+            "last_reconnect_latency": self.last_reconnect_latency,
+            "max_reconnect_latency": self.max_reconnect_latency,
+            "samples_lost": self.samples_lost
+        }
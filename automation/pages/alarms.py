@@ -27,7 +27,8 @@ layout = dbc.Container(
             no_button_id="update-delete-alarm-no"
         ),
         AlarmsComponents.create_alarm_form(),
-        AlarmsComponents.alarms_table()
+        AlarmsComponents.alarms_table(),
+        dash.dcc.Store(id="alarms_datatable_version", data=0)
     ],
     fluid=False,
     className="my-3"
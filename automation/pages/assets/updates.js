@@ -0,0 +1,94 @@
+/*
+ * Applies the changes pushed by the server on /updates (server-sent events) to the tables.
+ *
+ * The rows of every channel are kept here by key, each event updates, adds or removes only the rows it has
+ * and the table of the channel is set from them if it is on the page. A table is left as is while it's being
+ * edited or a modal is open, so the pushed rows don't overwrite an edit waiting for confirmation, it's set
+ * once the edit is done. The table version store, if the page has one, gets the version of the rows set, so
+ * the page callbacks patch the table with the changes after it only.
+ */
+(function () {
+
+    var channels = {
+        tags: {table: "tags_datatable", key: "id", version: "tags_datatable_version"},
+        alarms: {table: "alarms_datatable", key: "id", version: "alarms_datatable_version"},
+        machines: {table: "machines_datatable", key: "name"}
+    };
+    var rows = {};
+    var versions = {};
+    var dirty = {};
+
+    function editing(table) {
+
+        var active = document.activeElement;
+
+        return document.querySelector(".modal.show") !== null || (active !== null && table.contains(active) && active.tagName === "INPUT");
+    }
+
+    function flush() {
+
+        if (!window.dash_clientside || !window.dash_clientside.set_props) {
+
+            return;
+        }
+
+        Object.keys(dirty).forEach(function (channel) {
+
+            var table = document.getElementById(channels[channel].table);
+
+            if (table === null || editing(table)) {
+
+                return;
+            }
+
+            window.dash_clientside.set_props(channels[channel].table, {data: Array.from(rows[channel].values())});
+
+            if (channels[channel].version) {
+
+                window.dash_clientside.set_props(channels[channel].version, {data: versions[channel]});
+            }
+            delete dirty[channel];
+        });
+    }
+
+    function apply(channel, event) {
+
+        var changes = JSON.parse(event.data);
+        var key = channels[channel].key;
+
+        if (changes.snapshot || !rows[channel]) {
+
+            rows[channel] = new Map();
+        }
+
+        changes.rows.forEach(function (row) {
+
+            rows[channel].set(row[key], row);
+        });
+        changes.deleted.forEach(function (deleted) {
+
+            rows[channel].delete(deleted);
+        });
+        versions[channel] = changes.version;
+        dirty[channel] = true;
+        flush();
+    }
+
+    if (!window.EventSource) {
+
+        return;
+    }
+
+    var source = new EventSource("/updates?channels=" + Object.keys(channels).join(","));
+
+    Object.keys(channels).forEach(function (channel) {
+
+        source.addEventListener(channel, function (event) {
+
+            apply(channel, event);
+        });
+    });
+
+    // Tables left as is while they were edited
+    setInterval(flush, 1000);
+})();
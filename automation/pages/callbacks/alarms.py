@@ -1,6 +1,6 @@
 import dash
 from ...tags.cvt import CVTEngine
-from ...utils import find_differences_between_lists, generate_dropdown_conditional
+from ...utils import find_differences_between_lists, generate_dropdown_conditional, patch_table_data
 
 
 tag_engine = CVTEngine()
@@ -35,6 +35,23 @@ def init_callback(app:dash.Dash):
             
             dash.set_props("create_alarm_button", {'disabled': True})
 
+    @app.callback(
+        dash.Output('timestamp-interval', 'interval'),
+        dash.Input('timestamp-interval', 'n_intervals'),
+        dash.State('timestamp-interval', 'interval')
+    )
+    def refresh_interval(n_intervals, interval):
+        r"""
+        Slows down the UI refresh during an alarm flood
+        """
+        _interval = int(app.automation.alarm_manager.get_refresh_interval() * 1000)
+
+        if _interval!=interval:
+
+            return _interval
+
+        return dash.no_update
+
     @app.callback(
         dash.Output("modal-alarm-create", "is_open"),
         dash.Input("close-model-alarm-create", "n_clicks"),
@@ -63,6 +80,7 @@ def init_callback(app:dash.Dash):
 
     @app.callback(
         dash.Output('alarms_datatable', 'data', allow_duplicate=True),
+        dash.Output('alarms_datatable_version', 'data', allow_duplicate=True),
         dash.Output('tag_alarm_input', 'options'),
         dash.Output('alarms_datatable', 'dropdown'),
         dash.Output('alarm_type_input', 'options'),
@@ -76,7 +94,8 @@ def init_callback(app:dash.Dash):
         """
         if pathname=="/alarms":
 
-            data = app.alarms_table_data()
+            changes = app.automation.alarm_manager.changes_since(0)
+            data = [app.alarm_row(row) for row in changes["rows"]]
 
             dropdown_options_type = [
                 {'label': 'HIGH-HIGH', 'value': 'HIGH-HIGH'},
@@ -95,18 +114,21 @@ def init_callback(app:dash.Dash):
                 }
             }
 
-            return data, dropdown_options_tag, dropdown, dropdown_options_type, generate_dropdown_conditional()
+            return data, changes["version"], dropdown_options_tag, dropdown, dropdown_options_type, generate_dropdown_conditional()
         
-        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
     
     @app.callback(
         dash.Output('alarms_datatable', 'data', allow_duplicate=True),
+        dash.Output('alarms_datatable_version', 'data', allow_duplicate=True),
         dash.Input('create_alarm_button', 'n_clicks'),
         dash.State("tag_alarm_input", "value"),
         dash.State("alarm_name_input", "value"), 
         dash.State("alarm_description_input", "value"),
         dash.State("alarm_type_input", "value"),
         dash.State("alarm_trigger_value_input", "value"),
+        dash.State('alarms_datatable', 'data'),
+        dash.State('alarms_datatable_version', 'data'),
         prevent_initial_call=True
     )
     def CreateAlarmButton(
@@ -115,7 +137,9 @@ def init_callback(app:dash.Dash):
         alarm_name,
         alarm_description,
         alarm_type,
-        trigger_value
+        trigger_value,
+        data,
+        version
         ):
         r"""
         Documentation here
@@ -134,8 +158,10 @@ def init_callback(app:dash.Dash):
                 
                 dash.set_props("modal-body-alarm-create", {"children": message})
                 dash.set_props("modal-alarm-create", {'is_open': True})
+
+            changes = app.automation.alarm_manager.changes_since(version or 0)
             
-            return app.alarms_table_data()
+            return patch_table_data(data, changes, row=app.alarm_row), changes["version"]
         
     @app.callback(
         dash.Input('alarms_datatable', 'data_timestamp'),
@@ -161,6 +187,7 @@ def init_callback(app:dash.Dash):
         [
             dash.Output("modal-update-delete-alarm", "is_open"), 
             dash.Output('alarms_datatable', 'data'), 
+            dash.Output('alarms_datatable_version', 'data'),
             dash.Output('alarms_datatable', 'data_timestamp'),
             dash.Output("update-delete-alarm-yes", "n_clicks"),
             dash.Output("update-delete-alarm-no", "n_clicks")
@@ -170,17 +197,22 @@ def init_callback(app:dash.Dash):
             dash.State('alarms_datatable', 'data_timestamp'),
             dash.State("modal-update-delete-alarm", "is_open"),
             dash.State('alarms_datatable', 'data_previous'),
-            dash.State('alarms_datatable', 'data')
+            dash.State('alarms_datatable', 'data'),
+            dash.State('alarms_datatable_version', 'data')
         ]
     )
-    def toggle_modal_update_delete_alarm(yes_n, no_n, timestamp, is_open, previous, current):
+    def toggle_modal_update_delete_alarm(yes_n, no_n, timestamp, is_open, previous, current, version):
         r"""
-        Documentation here
+        Applies or discards the table edit, only the alarms changed since the table version are sent back, the
+        edit is discarded (the table gets its previous rows back) if the alarm didn't change
         """
+        version = version or 0
         
         if yes_n:
             
             if timestamp:
+
+                ids = list()
                 
                 if len(previous) > len(current): # DELETE ALARM
 
@@ -188,6 +220,7 @@ def init_callback(app:dash.Dash):
                     
                     for row in removed_rows:
                         _id = row['id']
+                        ids.append(_id)
                         message = app.automation.delete_alarm(id=_id)
                         
                         if message:
@@ -198,19 +231,26 @@ def init_callback(app:dash.Dash):
                     to_updates = find_differences_between_lists(previous, current)
                     alarm_to_update = to_updates[0]
                     alarm_id = alarm_to_update.pop("id")
+                    ids.append(alarm_id)
                     message = app.automation.update_alarm(id=alarm_id, **alarm_to_update)
                     
                     if message:
                         dash.set_props("modal-body-alarm-create", {"children": message})
                         dash.set_props("modal-alarm-create", {'is_open': True})
+
+                if any(app.automation.alarm_manager.get_version(id=_id) > version for _id in ids):
+
+                    changes = app.automation.alarm_manager.changes_since(version)
+
+                    return not is_open, patch_table_data(current, changes, row=app.alarm_row), changes["version"], None, 0, 0
                 
-                return not is_open, app.alarms_table_data(), None, 0, 0
+                return not is_open, previous, dash.no_update, None, 0, 0
         
         elif no_n:
             
-            return not is_open, app.alarms_table_data(), None, 0, 0
+            return not is_open, previous, dash.no_update, None, 0, 0
 
         else:
 
-            return is_open, app.alarms_table_data(), None, 0, 0
+            return is_open, dash.no_update, dash.no_update, None, 0, 0
         
\ No newline at end of file
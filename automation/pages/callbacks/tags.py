@@ -1,5 +1,5 @@
 import dash
-from ...utils import find_differences_between_lists, generate_dropdown_conditional
+from ...utils import find_differences_between_lists, generate_dropdown_conditional, patch_table_data
 from ...variables import VARIABLES
 
 def init_callback(app:dash.Dash):
@@ -122,6 +122,7 @@ def init_callback(app:dash.Dash):
     
     @app.callback(
         dash.Output('tags_datatable', 'data', allow_duplicate=True),
+        dash.Output('tags_datatable_version', 'data', allow_duplicate=True),
         dash.Output('opcua_address_input', 'options'),
         dash.Output('tags_datatable', 'dropdown'),
         dash.Output('tags_datatable', 'dropdown_conditional'),
@@ -157,10 +158,12 @@ def init_callback(app:dash.Dash):
         dropdown_conditional = generate_dropdown_conditional()
 
         if pathname=="/tags":
+
+            changes = app.automation.cvt.changes_since(0)
             
-            return app.tags_table_data(), opcua_client_options, dropdown, dropdown_conditional
+            return changes["rows"], changes["version"], opcua_client_options, dropdown, dropdown_conditional
         
-        return dash.no_update, opcua_client_options, dropdown, dropdown_conditional
+        return dash.no_update, dash.no_update, opcua_client_options, dropdown, dropdown_conditional
         
     @app.callback(
         dash.Output('node_namespace_input', 'options'),
@@ -192,6 +195,7 @@ def init_callback(app:dash.Dash):
         
     @app.callback(
         dash.Output('tags_datatable', 'data', allow_duplicate=True),
+        dash.Output('tags_datatable_version', 'data', allow_duplicate=True),
         dash.Output('tags_datatable', 'dropdown_conditional', allow_duplicate=True),
         dash.Input('create_tag_button', 'n_clicks'),
         dash.State("tag_name_input", "value"), 
@@ -205,6 +209,8 @@ def init_callback(app:dash.Dash):
         dash.State("node_namespace_input", "value"),
         dash.State("scan_time_input", "value"),
         dash.State("dead_band_input", "value"),
+        dash.State('tags_datatable', 'data'),
+        dash.State('tags_datatable_version', 'data'),
         prevent_initial_call=True
     )
     def displayClick(
@@ -219,7 +225,9 @@ def init_callback(app:dash.Dash):
         opcua_address,
         node_namespace,
         scan_time:int|None=None,
-        dead_band:float|None=None
+        dead_band:float|None=None,
+        data:list=None,
+        version:int=0
         ):
         r"""
         Documentation here
@@ -252,8 +260,10 @@ def init_callback(app:dash.Dash):
                 
                 dash.set_props("modal-body", {"children": message})
                 dash.set_props("modal-centered", {'is_open': True})
+
+            changes = app.automation.cvt.changes_since(version or 0)
             
-            return app.tags_table_data(), generate_dropdown_conditional()
+            return patch_table_data(data, changes), changes["version"], generate_dropdown_conditional()
         
     @app.callback(
         dash.Input('tags_datatable', 'data_timestamp'),
@@ -306,6 +316,7 @@ def init_callback(app:dash.Dash):
         [
             dash.Output("modal-update_delete-centered", "is_open"), 
             dash.Output('tags_datatable', 'data'), 
+            dash.Output('tags_datatable_version', 'data'),
             dash.Output('tags_datatable', 'data_timestamp'),
             dash.Output("update-delete-tag-yes", "n_clicks"),
             dash.Output("update-delete-tag-no", "n_clicks")
@@ -315,17 +326,22 @@ def init_callback(app:dash.Dash):
             dash.State('tags_datatable', 'data_timestamp'),
             dash.State("modal-update_delete-centered", "is_open"),
             dash.State('tags_datatable', 'data_previous'),
-            dash.State('tags_datatable', 'data')
+            dash.State('tags_datatable', 'data'),
+            dash.State('tags_datatable_version', 'data')
         ]
     )
-    def toggle_modal_update_delete_tag(yes_n, no_n, timestamp, is_open, previous, current):
+    def toggle_modal_update_delete_tag(yes_n, no_n, timestamp, is_open, previous, current, version):
         r"""
-        Documentation here
+        Applies or discards the table edit, only the tags changed since the table version are sent back, the
+        edit is discarded (the table gets its previous rows back) if the tag didn't change
         """
+        version = version or 0
         
         if yes_n:
             
             if timestamp:
+
+                ids = list()
                 
                 if len(previous) > len(current): # DELETE TAG
 
@@ -333,6 +349,7 @@ def init_callback(app:dash.Dash):
                     
                     for row in removed_rows:
                         _id = row['id']
+                        ids.append(_id)
                         message = app.automation.delete_tag(id=_id)
                         
                         if message:
@@ -343,21 +360,28 @@ def init_callback(app:dash.Dash):
                     to_updates = find_differences_between_lists(previous, current)
                     tag_to_update = to_updates[0]
                     tag_id = tag_to_update.pop("id")
+                    ids.append(tag_id)
                     tag, message = app.automation.update_tag(id=tag_id, **tag_to_update)
                     
                     if not tag:
                         dash.set_props("modal-body", {"children": message})
                         dash.set_props("modal-centered", {'is_open': True})
 
-                return not is_open, app.tags_table_data(), None, 0, 0
+                if any(app.automation.cvt.get_version(id=_id) > version for _id in ids):
+
+                    changes = app.automation.cvt.changes_since(version)
+
+                    return not is_open, patch_table_data(current, changes), changes["version"], None, 0, 0
+
+                return not is_open, previous, dash.no_update, None, 0, 0
         
         elif no_n:
             
-            return not is_open, app.tags_table_data(), None, 0, 0
+            return not is_open, previous, dash.no_update, None, 0, 0
 
         else:
 
-            return is_open, app.tags_table_data(), None, 0, 0
+            return is_open, dash.no_update, dash.no_update, None, 0, 0
         
     @app.callback(
         [
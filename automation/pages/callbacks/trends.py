@@ -1,9 +1,13 @@
 from math import ceil
+from datetime import datetime, timedelta, timezone
 import dash
 import plotly.graph_objects as go
 from ...tags import CVTEngine
+from ...utils.decimation import get_bucket_width, get_closed, min_max
 
 cvt = CVTEngine()
+# Plot width in pixels, a window with more than two points per pixel is decimated
+PIXEL_BUDGET = 1000
 
 
 def init_callback(app:dash.Dash):
@@ -27,62 +31,196 @@ def init_callback(app:dash.Dash):
         return dash.no_update
     
     @app.callback(
-        dash.Output('trends_cvt_datatable', 'data'),
         dash.Output('trends_figure', 'figure'),
+        dash.Output('trends_cursor', 'data'),
+        dash.Input('trends_tags_dropdown', 'value'),
+        dash.Input('trends_last_values_dropdown', 'value'),
+        dash.Input('trends_mode', 'value'),
+        dash.Input('trends_history_range', 'start_date'),
+        dash.Input('trends_history_range', 'end_date'),
+        dash.Input('trends_figure', 'relayoutData'),
+        prevent_initial_call=False
+        )
+    def figure(values, window, mode, start_date, end_date, relayout):
+        r"""
+        Builds the figure of the selected tags.
+
+        In live mode it has their buffered points, decimated if they don't fit in the plot, and runs only when
+        the tags or the window change, the new points are appended by *extend*.
+
+        In historical mode it has their logged points in the dates range, or in the range zoomed or panned to,
+        read decimated to the zoom level from the trends cache, which queries only the part of the range not
+        read before.
+        """
+        historical = mode=="historical"
+
+        zoomed = dash.ctx.triggered_id=="trends_figure"
+
+        if zoomed and (not historical or not any(key.startswith("xaxis.") for key in relayout or dict())):
+
+            return dash.no_update, dash.no_update
+
+        fig = go.Figure()
+        fig.update_layout(uirevision=mode)
+        # Historical figures have no cursor, so they're not extended
+        cursor = {"tags": None if historical else values or list(), "last": dict()}
+
+        if not values:
+
+            return fig, cursor
+
+        if historical:
+
+            start, stop = get_history_range(start_date, end_date, relayout if zoomed else None)
+            fig.update_layout(xaxis={"range": [start, stop]})
+
+        counter_axis = 0
+        labels = dict()
+        units = list()
+
+        for tag_name in values:
+
+            unit = app.automation.das.buffer[tag_name]["unit"]
+
+            if historical:
+
+                timestamp, _values = app.automation.get_historical_trend(tag_name, start, stop) or (list(), list())
+
+            else:
+
+                timestamp, _values, last = get_points(tag_name=tag_name, window=window)
+
+                if last:
+
+                    cursor["last"][tag_name] = last.isoformat()
+
+            if unit not in units:
+                counter_axis += 1
+                units.append(unit)
+
+            if counter_axis==1:
+
+                fig.add_trace(go.Scatter(x=timestamp, y=_values, name=tag_name))
+                labels["yaxis"] =  {
+                        "title": unit
+                    }
+            else:
+
+                fig.add_trace(go.Scatter(x=timestamp, y=_values, name=tag_name, yaxis=f"y{counter_axis}"))
+                labels[f"yaxis{counter_axis}"] = {
+                        "title": unit,
+                        "anchor": "free",
+                        "overlaying": "y",
+                        "autoshift": True
+                    }            
+
+        fig.update_layout(**labels)
+
+        return fig, cursor
+
+    def get_history_range(start_date:str, end_date:str, relayout:dict=None)->tuple[datetime, datetime]:
+        r"""
+        Range (UTC) of the historical trends: the one zoomed or panned to, or the dates range, the last day by default
+        """
+        relayout = relayout or dict()
+
+        if "xaxis.range[0]" in relayout:
+
+            return datetime.fromisoformat(relayout["xaxis.range[0]"]), datetime.fromisoformat(relayout["xaxis.range[1]"])
+
+        if "xaxis.range" in relayout:
+
+            return datetime.fromisoformat(relayout["xaxis.range"][0]), datetime.fromisoformat(relayout["xaxis.range"][1])
+
+        stop = datetime.fromisoformat(end_date) + timedelta(days=1) if end_date else datetime.now(timezone.utc).replace(tzinfo=None)
+        start = datetime.fromisoformat(start_date) if start_date else stop - timedelta(days=1)
+
+        return start, stop
+
+    @app.callback(
+        dash.Output('trends_figure', 'extendData'),
+        dash.Output('trends_cursor', 'data', allow_duplicate=True),
+        dash.Output('trends_cvt_datatable', 'data'),
         dash.Input('timestamp-interval', 'n_intervals'),
         dash.State('trends_tags_dropdown', 'value'),
+        dash.State('trends_last_values_dropdown', 'value'),
+        dash.State('trends_cursor', 'data'),
         prevent_initial_call=True
         )
-    def tags(n_intervals, values):
+    def extend(n_intervals, values, window, cursor):
         r"""
-        Documentation here
+        Appends to the figure only the points buffered after the last one it covers (*cursor*), decimated the same
+        way the figure was, the oldest points beyond the window are dropped by the client.
         """
-        if values:
+        if not values or not cursor or cursor["tags"]!=values:
 
-            fig = go.Figure()
-            counter_axis = 0
-            labels = dict()
-            data = list()
-            units = list()
-            
-            for tag_name in values:
+            return dash.no_update, dash.no_update, dash.no_update
 
-                timestamp = app.automation.das.buffer[tag_name]["timestamp"]
-                values = app.automation.das.buffer[tag_name]["values"]
-                unit = app.automation.das.buffer[tag_name]["unit"]
+        data = list()
+        x = list()
+        y = list()
+        max_points = list()
 
-                current_value = values.current()
-                if current_value:
-                    data.append({
-                        "tag": tag_name, "value": f"{current_value} {unit}"
-                    })
+        for tag_name in values:
 
-                if unit not in units:
-                    counter_axis += 1
-                    units.append(unit)
+            buffer = app.automation.das.buffer[tag_name]
+            current_value = buffer["values"].current()
+            if current_value:
+                data.append({
+                    "tag": tag_name, "value": f"{current_value} {buffer['unit']}"
+                })
 
-                if counter_axis==1:
+            since = cursor["last"].get(tag_name)
+            timestamp, _values, last = get_points(tag_name=tag_name, window=window, since=datetime.fromisoformat(since) if since else None)
 
-                    fig.add_trace(go.Scatter(x=timestamp, y=values, name=tag_name))
-                    labels["yaxis"] =  {
-                            "title": unit
-                        }
-                else:
+            if last:
 
-                    fig.add_trace(go.Scatter(x=timestamp, y=values, name=tag_name, yaxis=f"y{counter_axis}"))
-                    labels[f"yaxis{counter_axis}"] = {
-                            "title": unit,
-                            "anchor": "free",
-                            "overlaying": "y",
-                            "autoshift": True
-                        }            
+                cursor["last"][tag_name] = last.isoformat()
 
-            fig.update_layout(**labels)
+            x.append(timestamp)
+            y.append(_values)
+            max_points.append(min(buffer["timestamp"].size, 2 * PIXEL_BUDGET))
 
-            return data, fig
-        
-        return dash.no_update, dash.no_update
-    
+        if not any(x):
+
+            return dash.no_update, dash.no_update, data
+
+        return (dict(x=x, y=y), list(range(len(values))), {"x": max_points, "y": max_points}), cursor, data
+
+    def get_points(tag_name:str, window:int, since:datetime=None)->tuple[list, list, datetime|None]:
+        r"""
+        Buffered points of a tag after *since*, in chronological order and decimated if the window doesn't fit in the plot,
+        and the last point they cover, the next *since*.
+
+        A decimated series leaves out its newest bucket until it's closed, decimating it before would draw its
+        extrema again when it's extended.
+        """
+        timestamps = app.automation.das.buffer[tag_name]["timestamp"]
+        values = app.automation.das.buffer[tag_name]["values"]
+        length = min(len(timestamps), len(values))
+        indexes = range(length) if timestamps.roll=="forward" else range(length - 1, -1, -1)
+        timestamp = list()
+        _values = list()
+
+        # Newest first, up to the last point sent
+        for index in indexes:
+
+            if since is not None and timestamps[index] <= since:
+
+                break
+
+            timestamp.append(timestamps[index])
+            _values.append(values[index])
+
+        timestamp.reverse()
+        _values.reverse()
+        width = get_bucket_width(window=window, points=timestamps.size, budget=PIXEL_BUDGET)
+        closed = get_closed(timestamp, width=width)
+        timestamp = timestamp[:closed]
+        _values = _values[:closed]
+        last = timestamp[-1] if timestamp else None
+
+        return *min_max(timestamp, _values, width=width), last
 
     @app.callback(
         dash.Input('trends_last_values_dropdown', 'value'),
@@ -1,4 +1,5 @@
 import dash
+import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 
 fig = go.Figure()
@@ -36,6 +37,32 @@ class TrendsComponents:
             id="trends_last_values_dropdown"
         )
 
+    @classmethod
+    def mode(cls)->dbc.RadioItems:
+        r"""
+        Live trends from the buffers or historical trends from the data logger
+        """
+        return dbc.RadioItems(
+            options=[
+                {'label': 'Live', 'value': 'live'},
+                {'label': 'Historical', 'value': 'historical'}
+            ],
+            value='live',
+            inline=True,
+            id="trends_mode"
+        )
+
+    @classmethod
+    def history_range(cls)->dash.dcc.DatePickerRange:
+        r"""
+        Dates (UTC) of the historical trends
+        """
+        return dash.dcc.DatePickerRange(
+            display_format="YYYY-MM-DD",
+            clearable=True,
+            id="trends_history_range"
+        )
+
     @classmethod
     def current_value_table(cls)->dash.dash_table.DataTable:
         r"""
@@ -1,5 +1,9 @@
-import dash
+import dash, flask, json, time
 from ..pages.components import Components
+from ..utils.updates import UpdatesBroker
+
+# Seconds without changes before a keep alive comment is sent to the update stream clients
+KEEP_ALIVE = 15.0
 
 
 class ConfigView(dash.Dash):
@@ -16,6 +20,8 @@ class ConfigView(dash.Dash):
             Components.navbar(),
             dash.page_container
         ])
+        self.updates = UpdatesBroker()
+        self.server.add_url_rule("/updates", "updates", self.stream_updates)
 
     def set_automation_app(self, automation_app):
 
@@ -26,18 +32,81 @@ class ConfigView(dash.Dash):
         return self.automation.get_tags()
     
     def alarms_table_data(self):
-        data = [{
-                "id": alarm["identifier"],
-                "tag": alarm["tag"], 
-                "name": alarm["name"],
-                "description": alarm["description"],
-                "state": alarm["state"]["state"],
-                "alarm_type": alarm["alarm_setpoint"]["type"],
-                "trigger_value": alarm["alarm_setpoint"]["value"],
-                } for alarm in self.automation.alarm_manager.serialize()]
+        data = [self.alarm_row(alarm) for alarm in self.automation.alarm_manager.serialize()]
 
         return data
+
+    @staticmethod
+    def alarm_row(alarm:dict)->dict:
+        r"""
+        Alarms table row of a serialized alarm
+        """
+        return {
+            "id": alarm["identifier"],
+            "tag": alarm["tag"], 
+            "name": alarm["name"],
+            "description": alarm["description"],
+            "state": alarm["state"]["state"],
+            "alarm_type": alarm["alarm_setpoint"]["type"],
+            "trigger_value": alarm["alarm_setpoint"]["value"],
+        }
     
     def machines_table_data(self):
 
-        return self.automation.serialize_machines()
\ No newline at end of file
+        return self.automation.serialize_machines()
+
+    def stream_updates(self):
+        r"""
+        Server-sent events stream of the tags, alarms and machines tables, */updates?channels=tags,alarms*
+
+        Every event has the rows of one channel changed since the client's version, it sends its last version
+        in the *Last-Event-ID* header (the browser does it when it reconnects), without it the first event of
+        each channel is a snapshot with every row. Changes are sent at most once per UI refresh interval, so a
+        tag updated many times in between is sent once, and the client applies them in *assets/updates.js*.
+        """
+        channels = [channel for channel in flask.request.args.get("channels", "tags,alarms,machines").split(",") if channel in ("tags", "alarms", "machines")]
+        version = int(flask.request.headers.get("Last-Event-ID") or flask.request.args.get("version") or 0)
+
+        if version > self.updates.get_version():
+
+            # The client comes from a previous run of the server
+            version = 0
+
+        def events(version:int):
+
+            yield "retry: 2000\n\n"
+
+            while True:
+
+                current = self.updates.get_version()
+
+                for channel in channels:
+
+                    changes = self.updates.changes_since(channel, version)
+
+                    if version and not changes["rows"] and not changes["deleted"]:
+
+                        continue
+
+                    if channel=="alarms":
+
+                        changes["rows"] = [self.alarm_row(row) for row in changes["rows"]]
+
+                    changes.update(version=current, snapshot=not version)
+                    yield f"id: {current}\nevent: {channel}\ndata: {json.dumps(changes, default=str)}\n\n"
+
+                version = current
+
+                if self.updates.wait(version, timeout=KEEP_ALIVE)==version:
+
+                    yield ": keep-alive\n\n"
+
+                else:
+
+                    time.sleep(self.automation.alarm_manager.get_refresh_interval())
+
+        return flask.Response(
+            flask.stream_with_context(events(version)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
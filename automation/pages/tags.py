@@ -27,7 +27,8 @@ layout = dbc.Container(
             no_button_id="update-delete-tag-no"
         ),
         TagsComponents.create_tag_form(),
-        TagsComponents.tags_table()
+        TagsComponents.tags_table(),
+        dash.dcc.Store(id="tags_datatable_version", data=0)
     ],
     fluid=False,
     className="my-3"
@@ -14,6 +14,7 @@ layout = dbc.Container(
             ],
         ),
         dash.dcc.Location(id='trends_page', refresh=False),
+        dash.dcc.Store(id='trends_cursor'),
         dbc.Row(
             [
                 dbc.Col(TrendsComponents.tags(), width=6, className="col-sm-6 col-md-10"),
@@ -21,6 +22,13 @@ layout = dbc.Container(
             ],
             className="mb-3"
         ),
+        dbc.Row(
+            [
+                dbc.Col(TrendsComponents.mode(), width=12, className="col-sm-12 col-md-4"),
+                dbc.Col(TrendsComponents.history_range(), width=12, className="col-sm-12 col-md-8"),
+            ],
+            className="mb-3"
+        ),
         dbc.Row(
             [
                 dbc.Col(TrendsComponents.current_value_table(), width=12, className="col-sm-12 col-md-2 mb-2"),
@@ -10,8 +10,11 @@ from .models import StringType, IntegerType, FloatType, BooleanType, ProcessType
 from .tags.cvt import CVTEngine, Tag
 from .tags.tag import MachineObserver
 from .opcua.subscription import DAS
+from .opcua.polling import PollingScheduler, PollGroup
 from .modules.users.users import User
 from .utils.decorators import set_event, validate_types, logging_error_handler
+from .utils.transitions import TransitionTableMeta
+from .utils.updates import UpdatesBroker
 from .variables import (
     Temperature,
     Length,
@@ -23,6 +26,7 @@ from .variables import (
     Power,
     VolumetricFlow)
 from .logger.machines import MachinesLoggerEngine
+from .alarms.evaluation import AlarmEvaluationEngine
 
 
 
@@ -43,11 +47,12 @@ class Machine(Singleton):
 
         * **machine** (`PyHadesStateMachine`): a state machine object.
         * **interval** (int): Interval execution time in seconds.
+        * **mode** (str): Execution mode, allowed modes:
+            * *'sync'*: Runs in the state machine worker thread with the other sync machines.
+            * *'async'*: Runs in its own thread.
+            * *'shared'*: Runs in a pool of worker threads shared by every *'shared'* machine, see [SharedMachineScheduler](./workers/state_machine.py).
+            * *'process'*: Runs in its own worker process, for CPU heavy machines, see [ProcessMachineRunner](./workers/state_machine.py).
         """
-        if isinstance(machine, DAQ):
-            
-            machine.name = StringType(f"DAQ-{interval.value}")
-        
         machine.set_interval(interval)
         self.machine_manager.append_machine((machine, interval, mode))
         self.machines_engine.create(
@@ -156,7 +161,25 @@ class Machine(Singleton):
 
     def join(self, machine):
 
-        self.state_worker._async_scheduler.join(machine)
+        mode = "async"
+        for _machine, _, _mode in self.get_machines():
+
+            if _machine is machine:
+
+                mode = _mode
+                break
+
+        self.state_worker.join(machine, mode=mode)
+
+    def get_machines_metrics(self)->dict:
+        r"""
+        Returns the execution metrics (jitter, overruns, deadline misses) of every running state machine by name.
+        """
+        if self.state_worker:
+
+            return self.state_worker.get_metrics()
+
+        return dict()
 
     def stop(self):
         r"""
@@ -170,7 +193,7 @@ class Machine(Singleton):
             logging.error(message)
 
 
-class StateMachineCore(StateMachine):
+class StateMachineCore(StateMachine, metaclass=TransitionTableMeta):
 
     starting = State('start', initial=True)
     waiting = State('wait')
@@ -204,11 +227,11 @@ class StateMachineCore(StateMachine):
         self.buffer_roll_type = StringType(default='backward')
         self.__subscribed_to = dict()
         self.restart_buffer()
-        transitions = []
-        for state in self.states:
-            transitions.extend(state.transitions)
-        self.transitions = transitions
+        self.transitions = [transition for transitions in self._state_transitions.values() for transition in transitions]
         self.machine_engine = MachinesLoggerEngine()
+        self.updates = UpdatesBroker()
+        # Worker process runner of a machine appended with mode 'process'
+        self.process = None
         super(StateMachineCore, self).__init__()
 
     # State Methods
@@ -270,6 +293,11 @@ class StateMachineCore(StateMachine):
             f"{attr_name}": value
         }
         self.machine_engine.put(name=self.name, **kwargs)
+        self.updates.publish("machines", self.name.value, self)
+
+        if self.process:
+
+            self.process.send("put_attr", attr_name, value)
 
     def add_process_variable(self, name:str, tag:Tag, read_only:bool=False):
         r"""
@@ -278,7 +306,7 @@ class StateMachineCore(StateMachine):
         
         props = self.__dict__
         if name not in props.items():
-            process_variable = ProcessType(tag=Tag, default=tag.value, read_only=read_only)
+            process_variable = ProcessType(tag=tag, default=tag.value, read_only=read_only)
             setattr(self, name, process_variable)
 
     def get_process_variables(self):
@@ -395,6 +423,11 @@ class StateMachineCore(StateMachine):
         - *value:* [int|float|bool] tag value
         """
         if tag in self.get_subscribed_tags():
+
+            if self.process:
+
+                self.process.send("notify", tag, value, timestamp)
+
             _tag = self.__subscribed_to[tag]
             attr = getattr(self, tag)
             value = value.convert(to_unit=_tag.get_display_unit())
@@ -427,12 +460,14 @@ class StateMachineCore(StateMachine):
         """
         try:
             _from = self.current_state.name.lower()
-            transition_name = f'{_from}_to_{to}'
-            allowed_transitions = self._get_active_transitions()
-            for _transition in allowed_transitions:
-                if f"{_transition.source.name}_to_{_transition.target.name}"==transition_name:
-                    self.send(transition_name)
-                    return self, f"from: {_from} to: {to}"
+            event = self._transition_table.get((self.current_state.name, to))
+            if event:
+                if self.process:
+                    # The machine process applies it, the new state comes back with its next loop
+                    self.process.send("transition", to)
+                else:
+                    self.send(event)
+                return self, f"from: {_from} to: {to}"
                 
             return None, f"Transitio to {to} not allowed"
             
@@ -484,28 +519,14 @@ class StateMachineCore(StateMachine):
 
         * **(list)**
         """
-        result = list()
-
-        current_state = self.current_state
-        transitions = self.transitions
-
-        for transition in transitions:
-
-            if transition.source == current_state:
-
-                result.append(transition)
-
-        return result
+        return list(self._state_transitions[self.current_state.id])
 
     def _activate_triggers(self):
         r"""
         Allows to execute the on_ method in transitions when it's necesary
         """
-        transitions = self._get_active_transitions()
-
-        for transition in transitions:
-            method_name = transition.identifier
-            method = getattr(self, method_name)
+        for transition in self._state_transitions[self.current_state.id]:
+            method = getattr(self, transition.event)
 
             try:
                 source = transition.source
@@ -521,12 +542,11 @@ class StateMachineCore(StateMachine):
         r"""
         This method is executed by state machine worker every state machine interval to execute the correct method according its state
         """
-        method_name = f"while_{self.current_state.value}"
+        method = getattr(self, f"while_{self.current_state.value}", None)
 
-        if method_name in dir(self):
+        if method:
 
-            method = getattr(self, method_name)
-            method()            
+            method()
 
     @validate_types(output=list)
     def get_states(self)->list[str]:
@@ -589,6 +609,12 @@ class StateMachineCore(StateMachine):
         return result
     
     # TRANSITIONS
+    def after_transition(self):
+        r"""
+        It's executed after every transition, publishes the new state to the UI
+        """
+        self.updates.publish("machines", self.name.value, self)
+
     def on_start_to_wait(self):
         r"""
         It's executed one time before enter to Wait state from Sleep state 
@@ -648,7 +674,10 @@ class StateMachineCore(StateMachine):
 
 class DAQ(StateMachineCore):
     r"""
-    Documentation here
+    Data Acquisition machine, it polls the OPC UA tags subscribed with a scan time.
+
+    Every tag is polled at its own scan time (milliseconds), tags of the same server and scan time are read
+    together, see [PollingScheduler](./opcua/polling.py). The machine interval is the scheduler tick.
     """    
 
     def __init__(
@@ -660,6 +689,9 @@ class DAQ(StateMachineCore):
 
         self.das = DAS()
         self.cvt = CVTEngine()
+        self.opcua_client_manager = None
+        self.scheduler = PollingScheduler()
+        self.__registered_nodes = dict()
 
         if isinstance(name, StringType):
 
@@ -682,34 +714,143 @@ class DAQ(StateMachineCore):
 
     def while_running(self):
 
+        for group in self.scheduler.pop_due():
+
+            self.__poll(group=group)
+        
+        super().while_running()
+
+    # Auxiliaries Methods
+    def set_opcua_client_manager(self, manager:OPCUAClientManager):
+        r"""
+        Documentation here
+        """
+        self.opcua_client_manager = manager
+
+    def subscribe_to(self, tag:Tag):
+        r"""
+        Subscribes *tag*, adds it to the polling group of its OPC UA server and scan time and registers its node
+        on the server (RegisterNodes service)
+        """
+        result = super(DAQ, self).subscribe_to(tag=tag)
+
+        if result:
+
+            self.scheduler.add(tag=tag)
+            self.set_interval(FloatType(self.scheduler.get_tick()))
+            self.__get_registered_node(tag=tag)
+
+        return result
+
+    @validate_types(tag=Tag, output=None|bool)
+    def unsubscribe_to(self, tag:Tag):
+        r"""
+        Unsubscribes *tag* and releases its registered node
+        """
+        node = self.__registered_nodes.pop(tag.name, None)
+
+        if node and node["client"].get_id()==node["client_id"]:
+
+            try:
+
+                node["client"].unregister_nodes([node["node"]])
+
+            except Exception as err:
+
+                logging.warning(f"DAQ {self.name.value} could not unregister {tag.name}: {err}")
+
+        self.scheduler.remove(tag_name=tag.name)
+        self.set_interval(FloatType(self.scheduler.get_tick()))
+
+        return super(DAQ, self).unsubscribe_to(tag=tag)
+
+    def get_polling_groups(self)->list[dict]:
+        r"""
+        Polling groups with their run and deadline misses counters
+        """
+        return self.scheduler.serialize()
+
+    def __poll(self, group:PollGroup):
+        r"""
+        Reads all tags of *group* with a single Read service call and updates the CVT
+        """
         tags = list()
+        nodes = list()
+
+        for tag in list(group.tags.values()):
+
+            node = self.__get_registered_node(tag=tag)
+
+            if node:
+
+                tags.append(tag)
+                nodes.append(node)
+
+        if not nodes:
+
+            return
+
+        try:
+
+            data_values = nodes[0]["client"].get_data_values([node["node"] for node in nodes])
+
+        except Exception as err:
+
+            group.read_errors += 1
+            logging.warning(f"DAQ {self.name.value} could not read {group.opcua_address} every {group.scan_time} ms: {err}")
+            return
 
-        for tag_name, tag in self.get_subscribed_tags().items():
+        # The group alarms are evaluated once for the whole scan
+        with AlarmEvaluationEngine().batch():
 
-            namespace = tag.get_node_namespace()
-            opcua_address = tag.get_opcua_address()
-            values = self.opcua_client_manager.get_node_value_by_opcua_address(opcua_address=opcua_address, namespace=namespace)
-            if values:
-                data_value = values[0][0]["DataValue"]
+            for tag, data_value in zip(tags, data_values):
+
+                tag_name = tag.get_name()
                 value = data_value.Value.Value
                 timestamp = data_value.SourceTimestamp
-                tags.append({
-                    "tag": tag_name,
-                    "value": value,
-                    "timestamp": timestamp
-                })
                 self.cvt.set_value(id=tag.id, value=value, timestamp=timestamp)
                 self.das.buffer[tag_name]["timestamp"](timestamp)
                 self.das.buffer[tag_name]["values"](self.cvt.get_value(id=tag.id))
-        
-        super().while_running()
 
-    # Auxiliaries Methods
-    def set_opcua_client_manager(self, manager:OPCUAClientManager):
+    def __get_registered_node(self, tag:Tag)->dict|None:
         r"""
-        Documentation here
+        Returns the cached registered node of *tag*, it's registered when it's missing or when the client session changed
+        (reconnection), returns None while its OPC UA client is not connected.
         """
-        self.opcua_client_manager = manager
+        if not self.opcua_client_manager:
+
+            return None
+
+        client_name = self.opcua_client_manager.get_client_name_by_opcua_address(opcua_address=tag.get_opcua_address())
+
+        if not client_name or not self.opcua_client_manager.is_connected(client_name=client_name):
+
+            return None
+
+        client = self.opcua_client_manager.get(client_name=client_name)
+        node = self.__registered_nodes.get(tag.name)
+
+        if node and node["client_id"]==client.get_id():
+
+            return node
+
+        try:
+
+            registered_node = client.register_nodes_by_namespaces(namespaces=[tag.get_node_namespace()])[0]
+
+        except Exception as err:
+
+            logging.warning(f"DAQ {self.name.value} could not register {tag.name}: {err}")
+            return None
+
+        node = {
+            "client": client,
+            "client_id": client.get_id(),
+            "node": registered_node
+        }
+        self.__registered_nodes[tag.name] = node
+
+        return node
     
 
 class AutomationStateMachine(StateMachineCore):
@@ -5,6 +5,7 @@ from ..models import FloatType, StringType, IntegerType, BooleanType
 from ..modules.users.users import User
 from ..modules.users.users import User
 from ..utils.decorators import set_event, logging_error_handler
+from ..utils.updates import UpdatesBroker
 from .tag import Tag
 
 class CVT:
@@ -25,6 +26,7 @@ class CVT:
 
         self._tags = dict()
         self.data_types = ["float", "int", "bool", "str"]
+        self.updates = UpdatesBroker()
     
     @set_event(message=f"Created", classification="Tag", priority=1, criticity=1)
     def set_tag(
@@ -95,6 +97,7 @@ class CVT:
             id=id
         )
         self._tags[tag.id] = tag
+        self.updates.publish("tags", tag.id, tag)
 
         return tag, f"Tag: {name} - {unit}"
 
@@ -155,6 +158,7 @@ class CVT:
             tag.set_dead_band(dead_band=dead_band)
         
         self._tags[id] = tag
+        self.updates.publish("tags", id, tag)
 
         return tag, f"Tag: {tag.name}"
 
@@ -171,6 +175,7 @@ class CVT:
         - 
         """
         tag = self._tags.pop(id)
+        self.updates.delete("tags", id)
         return tag, f"Tag: {tag.name}"
 
     def get_tag(self, id:str)->Tag|None:
@@ -235,6 +240,22 @@ class CVT:
         Returns a list of the defined tags names.
         """        
         return [tag.serialize() for _, tag in self._tags.items()]
+
+    def changes_since(self, version:int=0)->dict:
+        r"""
+        Serialized tags changed (value included) and ids of the tags deleted after *version*.
+
+        # Parameters
+        version (int):
+            Last version seen, 0 for every tag.
+        """
+        return self.updates.changes_since("tags", version)
+
+    def get_version(self, id:str=None)->int:
+        r"""
+        Version of the last change of the tag *id*, or of the last change of any tag.
+        """
+        return self.updates.get_version("tags", id)
     
     def get_tag_by_name(self, name:str)->Tag|None:
         r"""Documentation here
@@ -371,6 +392,20 @@ class CVT:
             Tag value ("int", "float", "bool")
         """
         self._tags[id].set_value(value=value, timestamp=timestamp)
+        self.updates.publish("tags", id, self._tags[id])
+
+    def set_quality(self, id:str, quality:str):
+        r"""
+        Sets the quality flag of a defined tag.
+
+        # Parameters
+        id (str):
+            Tag id.
+        quality (str):
+            "Good" or "Bad"
+        """
+        self._tags[id].set_quality(quality=quality)
+        self.updates.publish("tags", id, self._tags[id])
 
     def set_data_type(self, data_type):
         r"""Documentation here
@@ -665,6 +700,38 @@ class CVTEngine(Singleton):
         _query = dict()
         _query["action"] = "get_tags"
         return self.__query(_query)
+
+    def changes_since(self, version:int=0)->dict:
+        r"""
+        Tags changed since *version*, every change (value, quality or definition) takes the next version.
+
+        **Parameters**
+
+        * **version** (int): Last version seen, 0 for every tag.
+
+        **Returns**
+
+        * **dict**: {"version": last version, "rows": [serialized tags], "deleted": [tag ids]}
+        """
+        _query = dict()
+        _query["action"] = "changes_since"
+        _query["parameters"] = dict()
+        _query["parameters"]["version"] = version
+        return self.__query(_query)
+
+    def get_version(self, id:str=None)->int:
+        r"""
+        Version of the last change of the tag *id*, or of the last change of any tag.
+
+        **Parameters**
+
+        * **id** (str)[Optional]: Tag id.
+        """
+        _query = dict()
+        _query["action"] = "get_version"
+        _query["parameters"] = dict()
+        _query["parameters"]["id"] = id
+        return self.__query(_query)
     
     def get_tag_by_name(self, name:str)->Tag|None:
         r"""Documentation here
@@ -841,6 +908,22 @@ class CVTEngine(Singleton):
         _query["parameters"]["timestamp"] = timestamp
         return self.__query(_query)
     
+    def set_quality(self, id:str, quality:str):
+        r"""
+        Sets the quality flag of a defined tag.
+
+        **Parameters**
+
+        * **id** (str): Tag id.
+        * **quality** (str): "Good" or "Bad"
+        """
+        _query = dict()
+        _query["action"] = "set_quality"
+        _query["parameters"] = dict()
+        _query["parameters"]["id"] = id
+        _query["parameters"]["quality"] = quality
+        return self.__query(_query)
+
     def set_data_type(self, data_type):
         r"""Documentation here
 
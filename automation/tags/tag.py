@@ -70,6 +70,7 @@ class Tag:
         self.scan_time = scan_time
         self.dead_band = dead_band
         self.timestamp = timestamp
+        self.quality = "Good"
         self._observers = set()
 
     def set_name(self, name:str):
@@ -87,8 +88,15 @@ class Tag:
             timestamp = datetime.now()
         self.value.set_value(value=value, unit=self.unit)
         self.timestamp = timestamp
+        self.quality = "Good"
         self.notify()
 
+    def set_quality(self, quality:str):
+        r"""
+        Sets the tag quality, "Good" or "Bad" (i.e. its OPC UA source is not reachable), a new value sets it back to "Good"
+        """
+        self.quality = quality
+
     def set_display_name(self, name:str):
         r"""
         Documentation here
@@ -157,6 +165,12 @@ class Tag:
         """
         return self.timestamp
 
+    def get_quality(self)->str:
+        r"""
+        Documentation here
+        """
+        return self.quality
+
     def get_scan_time(self):
         r"""
         Documentation here
@@ -287,7 +301,8 @@ class Tag:
             "opcua_address": self.get_opcua_address(),
             "node_namespace": self.get_node_namespace(),
             "scan_time": self.get_scan_time(),
-            "dead_band": self.get_dead_band()
+            "dead_band": self.get_dead_band(),
+            "quality": self.get_quality()
         }
 
 
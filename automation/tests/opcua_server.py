@@ -0,0 +1,76 @@
+import socket, logging
+from opcua import Server
+
+
+def get_free_port()->int:
+    r"""
+    Asks the OS for an unused TCP port on localhost.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as _socket:
+
+        _socket.bind(("127.0.0.1", 0))
+
+        return _socket.getsockname()[1]
+
+
+class LocalOPCUAServer:
+    r"""
+    In-process OPC UA server used as a test fixture and for benchmarks, no hardware needed.
+
+    It exposes an object *Plant* with *variables* float nodes (*Variable0*, *Variable1*, ...).
+
+    Usage:
+
+    ```python
+    >>> server = LocalOPCUAServer(variables=10)
+    >>> server.start()
+    >>> server.namespaces
+    ['ns=2;i=2', 'ns=2;i=3', ...]
+    >>> server.stop()
+    ```
+    """
+
+    def __init__(self, variables:int=10, host:str="127.0.0.1", port:int=None):
+        r"""
+        Documentation here
+        """
+        self.host = host
+        self.port = port or get_free_port()
+        self.endpoint_url = f"opc.tcp://{self.host}:{self.port}"
+        self._variables = variables
+        self.nodes = list()
+        self._server = None
+
+    @property
+    def namespaces(self)->list:
+        r"""
+        Documentation here
+        """
+        return [node.nodeid.to_string() for node in self.nodes]
+
+    def start(self):
+        r"""
+        Documentation here
+        """
+        logging.getLogger("opcua").setLevel(logging.ERROR)
+        self._server = Server()
+        self._server.set_endpoint(f"{self.endpoint_url}/freeopcua/server/")
+        idx = self._server.register_namespace("http://pyautomation.test")
+        plant = self._server.get_objects_node().add_object(idx, "Plant")
+        self.nodes = [plant.add_variable(idx, f"Variable{counter}", float(counter)) for counter in range(self._variables)]
+        self._server.start()
+
+    def set_value(self, index:int, value:float):
+        r"""
+        Documentation here
+        """
+        self.nodes[index].set_value(value)
+
+    def stop(self):
+        r"""
+        Documentation here
+        """
+        if self._server:
+
+            self._server.stop()
+            self._server = None
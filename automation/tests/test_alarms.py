@@ -1,5 +1,8 @@
-import unittest
+import unittest, time
 from automation.alarms import Alarm
+from automation.alarms.evaluation import AlarmEvaluationEngine
+from automation.utils.timer_wheel import TimerWheel
+from automation.managers import AlarmManager
 from automation.tags.tag import Tag
 from automation.tags.cvt import CVTEngine
 from automation.models import StringType, FloatType
@@ -91,4 +94,298 @@ class TestAlarms(unittest.TestCase):
         tag.set_value(value=55)
         with self.subTest("Test alarm Unack status"):
             
-            self.assertEqual(alarm.current_state.value.lower(), "unack_alarm")
\ No newline at end of file
+            self.assertEqual(alarm.current_state.value.lower(), "unack_alarm")
+    def test_alarm_deadband(self):
+        r"""
+        Documentation here
+        """
+        cvt.set_tag(
+            name="tag4",
+            variable="Temperature",
+            unit="C",
+            data_type="FLOAT",
+            description="tag4"
+        )
+        tag = cvt.get_tag_by_name(name="tag4")
+        alarm = Alarm(
+            name="alarm4",
+            tag=tag,
+            alarm_type=StringType("LOW"),
+            alarm_setpoint=FloatType(20.0),
+            alarm_deadband=FloatType(5.0)
+        )
+
+        tag.set_value(value=15)
+        tag.set_value(value=22)
+        with self.subTest("Test alarm inside deadband"):
+
+            self.assertEqual(alarm.current_state.id, "unack_alarm")
+
+        tag.set_value(value=26)
+        with self.subTest("Test alarm out of deadband"):
+
+            self.assertEqual(alarm.current_state.id, "rtn_unack")
+
+    def test_alarm_evaluation_batch(self):
+        r"""
+        Documentation here
+        """
+        evaluation = AlarmEvaluationEngine()
+        cvt.set_tag(
+            name="tag5",
+            variable="Temperature",
+            unit="C",
+            data_type="FLOAT",
+            description="tag5"
+        )
+        tag = cvt.get_tag_by_name(name="tag5")
+        high = Alarm(
+            name="alarm5_high",
+            tag=tag,
+            alarm_type=StringType("HIGH"),
+            alarm_setpoint=FloatType(50.0)
+        )
+        high_high = Alarm(
+            name="alarm5_high_high",
+            tag=tag,
+            alarm_type=StringType("HIGH-HIGH"),
+            alarm_setpoint=FloatType(80.0)
+        )
+
+        with evaluation.batch():
+
+            tag.set_value(value=55)
+            tag.set_value(value=45)
+
+            with self.subTest("Test values deferred inside batch"):
+
+                self.assertEqual(high.current_state.id, "normal")
+
+        with self.subTest("Test every crossing evaluated in order"):
+
+            self.assertEqual(high.current_state.id, "rtn_unack")
+            self.assertEqual(high_high.current_state.id, "normal")
+
+        evaluation.remove(high)
+        tag.set_value(value=90)
+        with self.subTest("Test removed alarm not evaluated"):
+
+            self.assertEqual(high.current_state.id, "rtn_unack")
+            self.assertEqual(high_high.current_state.id, "unack_alarm")
+
+    def test_alarm_on_off_delay(self):
+        r"""
+        Documentation here
+        """
+        cvt.set_tag(
+            name="tag6",
+            variable="Temperature",
+            unit="C",
+            data_type="FLOAT",
+            description="tag6"
+        )
+        tag = cvt.get_tag_by_name(name="tag6")
+        alarm = Alarm(
+            name="alarm6",
+            tag=tag,
+            alarm_type=StringType("HIGH"),
+            alarm_setpoint=FloatType(50.0),
+            alarm_on_delay=FloatType(0.3),
+            alarm_off_delay=FloatType(0.3)
+        )
+
+        # Chattering shorter than the on delay
+        for value in (55, 45, 55, 45):
+
+            tag.set_value(value=value)
+
+        time.sleep(0.6)
+        with self.subTest("Test chattering filtered by on delay"):
+
+            self.assertEqual(alarm.current_state.id, "normal")
+
+        tag.set_value(value=55)
+        with self.subTest("Test alarm delayed"):
+
+            self.assertEqual(alarm.current_state.id, "normal")
+
+        time.sleep(0.6)
+        with self.subTest("Test alarm triggered after on delay"):
+
+            self.assertEqual(alarm.current_state.id, "unack_alarm")
+
+        tag.set_value(value=45)
+        time.sleep(0.6)
+        with self.subTest("Test alarm returned after off delay"):
+
+            self.assertEqual(alarm.current_state.id, "rtn_unack")
+
+    def test_timer_wheel(self):
+        r"""
+        Documentation here
+        """
+        wheel = TimerWheel(name="TestTimerWheel", tick=0.05, slots=8)
+        fired = list()
+        wheel.schedule("a", 0.1, fired.append, "a")
+        wheel.schedule("b", 0.6, fired.append, "b")
+        wheel.schedule("c", 0.1, fired.append, "c")
+        wheel.cancel("c")
+        time.sleep(0.3)
+
+        with self.subTest("Test due timers fired, cancelled one skipped"):
+
+            self.assertEqual(fired, ["a"])
+            self.assertTrue(wheel.is_scheduled("b"))
+
+        time.sleep(0.5)
+        with self.subTest("Test timer beyond one wheel turn fired"):
+
+            self.assertEqual(fired, ["a", "b"])
+            self.assertEqual(len(wheel), 0)
+
+        wheel.schedule("d", 0.1, fired.append, "d")
+        wheel.stop()
+        time.sleep(0.2)
+        with self.subTest("Test stopped wheel keeps its timers"):
+
+            self.assertFalse(wheel.is_alive())
+            self.assertEqual(fired, ["a", "b"])
+            self.assertTrue(wheel.is_scheduled("d"))
+
+        wheel.schedule("e", 0.1, fired.append, "e")
+        time.sleep(0.3)
+        with self.subTest("Test wheel restarted"):
+
+            self.assertTrue(wheel.is_alive())
+            self.assertEqual(fired, ["a", "b", "d", "e"])
+
+        wheel.stop()
+
+    def test_alarm_flood(self):
+        r"""
+        Documentation here
+        """
+        manager = AlarmManager()
+        manager.set_flood(threshold=2, window=0.5, check_period=0.1)
+        self.addCleanup(manager.set_flood)
+        alarms = list()
+        for counter in range(4):
+            tag, _ = cvt.set_tag(
+                name=f"flood_tag{counter}",
+                variable="Temperature",
+                unit="C",
+                data_type="FLOAT",
+                description=f"flood_tag{counter}"
+            )
+            self.addCleanup(cvt.delete_tag, id=tag.id)
+            alarm, _ = manager.append_alarm(name=f"flood_alarm{counter}", tag=f"flood_tag{counter}", type="HIGH", trigger_value=50.0)
+            self.addCleanup(manager.delete_alarm, id=alarm.identifier)
+            alarms.append(alarm)
+
+        manager.set_parent(name="flood_alarm3", parent="flood_alarm0")
+        self.addCleanup(manager.set_parent, name="flood_alarm3")
+
+        for counter in range(4):
+
+            cvt.get_tag_by_name(name=f"flood_tag{counter}").set_value(value=60)
+
+        metrics = manager.get_flood_metrics()
+        with self.subTest("Test flood detected"):
+
+            self.assertTrue(metrics["flooding"])
+            self.assertEqual(metrics["floods"], 1)
+            self.assertEqual(manager.get_refresh_interval(), 5.0)
+
+        with self.subTest("Test consequential alarm suppressed"):
+
+            self.assertEqual(alarms[3].current_state.id, "normal")
+            self.assertEqual(metrics["suppressed_alarms"], ["flood_alarm3"])
+            self.assertEqual(metrics["suppressed"], {"flood_alarm3": 1})
+
+        # Stop/run cycle during the flood, the end check is kept
+        manager.timer_wheel.stop()
+        manager.timer_wheel.start()
+        time.sleep(1.0)
+        metrics = manager.get_flood_metrics()
+        with self.subTest("Test flood ended, suppressed alarm released"):
+
+            self.assertFalse(metrics["flooding"])
+            self.assertEqual(alarms[3].current_state.id, "unack_alarm")
+            self.assertEqual(manager.get_refresh_interval(), 1.0)
+
+    def test_alarm_summary(self):
+        r"""
+        Documentation here
+        """
+        manager = AlarmManager()
+        summary = manager.summary()
+        alarms = list()
+        for counter in range(3):
+            tag, _ = cvt.set_tag(
+                name=f"summary_tag{counter}",
+                variable="Temperature",
+                unit="C",
+                data_type="FLOAT",
+                description=f"summary_tag{counter}"
+            )
+            self.addCleanup(cvt.delete_tag, id=tag.id)
+            alarm, _ = manager.append_alarm(name=f"summary_alarm{counter}", tag=f"summary_tag{counter}", type="HIGH", trigger_value=50.0)
+            self.addCleanup(manager.delete_alarm, id=alarm.identifier)
+            alarms.append(alarm)
+
+        cvt.get_tag_by_name(name="summary_tag1").set_value(value=60)
+        cvt.get_tag_by_name(name="summary_tag0").set_value(value=60)
+        alarms[1].acknowledge()
+
+        with self.subTest("Test state counters"):
+
+            result = manager.summary()
+            self.assertEqual(result["length"], summary["length"] + 3)
+            self.assertEqual(result["active"], summary["active"] + 2)
+            self.assertEqual(result["states"]["Normal"], summary["states"]["Normal"] + 1)
+            self.assertEqual(result["states"]["Unacknowledged"], summary["states"]["Unacknowledged"] + 1)
+            self.assertEqual(result["states"]["Acknowledged"], summary["states"]["Acknowledged"] + 1)
+
+        with self.subTest("Test last active alarms, last triggered first"):
+
+            self.assertEqual([alarm["name"] for alarm in manager.get_lasts_active_alarms(lasts=2)], ["summary_alarm0", "summary_alarm1"])
+
+        cvt.get_tag_by_name(name="summary_tag1").set_value(value=40)
+        with self.subTest("Test alarm back to normal removed from active alarms"):
+
+            self.assertEqual(manager.summary()["active"], summary["active"] + 1)
+            self.assertNotIn("summary_alarm1", [alarm["name"] for alarm in manager.get_lasts_active_alarms()])
+
+    def test_alarm_changes_since(self):
+        r"""
+        Documentation here
+        """
+        manager = AlarmManager()
+        tag, _ = cvt.set_tag(
+            name="changes_tag",
+            variable="Temperature",
+            unit="C",
+            data_type="FLOAT",
+            description="changes_tag"
+        )
+        self.addCleanup(cvt.delete_tag, id=tag.id)
+        alarm, _ = manager.append_alarm(name="changes_alarm", tag="changes_tag", type="HIGH", trigger_value=50.0)
+        version = manager.get_version()
+
+        with self.subTest("Test no changes"):
+
+            self.assertEqual(manager.changes_since(version)["rows"], [])
+
+        cvt.get_tag_by_name(name="changes_tag").set_value(value=60)
+        with self.subTest("Test transition takes a new row version"):
+
+            changes = manager.changes_since(version)
+            self.assertGreater(manager.get_version(id=alarm.identifier), version)
+            self.assertEqual([row["name"] for row in changes["rows"]], ["changes_alarm"])
+            self.assertEqual(changes["version"], manager.get_version())
+
+        version = manager.get_version()
+        manager.delete_alarm(id=alarm.identifier)
+        with self.subTest("Test deleted alarm"):
+
+            self.assertEqual(manager.changes_since(version), {"version": manager.get_version(), "rows": [], "deleted": [alarm.identifier]})
@@ -1,4 +1,4 @@
-import unittest, os
+import unittest, os, tempfile, importlib.util
 from datetime import datetime
 from . import assert_dict_contains_subset
 from .. import PyAutomation
@@ -245,4 +245,21 @@ class TestCore(unittest.TestCase):
         self.app.delete_alarm(id=alarm_L.identifier)
         self.app.delete_alarm(id=alarm_H.identifier)
         self.app.delete_alarm(id=alarm_HH.identifier)
-        self.app.delete_tag(id=tag.id)
\ No newline at end of file
+        self.app.delete_tag(id=tag.id)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_archiver_restart(self):
+        r"""
+        Documentation here
+        """
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.addCleanup(setattr, self.app.logger_engine.logger, "archive", None)
+        self.app.set_archive(folder=folder.name, days=30)
+        worker = self.app.archiver_worker
+        self.app.safe_stop()
+        worker.join(timeout=1.0)
+        self.app.set_archive(folder=folder.name, days=30)
+
+        self.assertIsNot(self.app.archiver_worker, worker)
+        self.assertTrue(self.app.archiver_worker.is_alive())
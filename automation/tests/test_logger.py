@@ -0,0 +1,750 @@
+import unittest, time, threading, os, tempfile, sqlite3, importlib.util, csv, io
+from unittest import mock
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase, Model, CharField
+from automation.dbmodels import proxy, Variables, Units, DataTypes, Tags, TagValue, TagValueBlock, AlarmTypes, AlarmStates, Alarms, AlarmSummary, Roles, Users, Events, Logs
+from automation.tags.cvt import CVTEngine
+from automation.dbmodels.core import RoutingProxy
+from automation.logger.core import BaseLogger, BaseEngine
+from automation.logger.datalogger import DataLogger, DataLoggerEngine
+from automation.logger.spool import Spool
+from automation.logger.writer import BatchWriter, PendingRecord
+from automation.logger.trends import TrendsCache
+from automation.logger.alarms import AlarmsLoggerEngine
+from automation.logger.logs import LogsLoggerEngine
+from automation.modules.users.users import User
+from automation.modules.users.roles import Role
+from automation.alarms.states import States
+from automation.managers import AlarmManager
+
+
+class SlowLogger(BaseLogger):
+
+    def __init__(self):
+
+        super(SlowLogger, self).__init__()
+        self.rows = list()
+
+    def read_trends(self, seconds:float):
+
+        time.sleep(seconds)
+
+        return list(self.rows)
+
+    def get_routing(self)->bool:
+
+        return proxy.is_reading()
+
+    def write_tag(self, value:float, seconds:float=0.0):
+
+        time.sleep(seconds)
+        self.rows.append(value)
+
+
+class SlowLoggerEngine(BaseEngine):
+
+    def __init__(self):
+
+        super(SlowLoggerEngine, self).__init__()
+        self.logger = SlowLogger()
+
+
+class TestBaseEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.engine = SlowLoggerEngine()
+        self.engine.logger.rows.clear()
+
+        return super().setUp()
+
+    def test_writes_not_blocked_by_reads(self):
+        r"""
+        Documentation here
+        """
+        reader = threading.Thread(target=self.engine.query, args=({"action": "read_trends", "parameters": {"seconds": 0.5}},))
+        reader.start()
+        time.sleep(0.05)
+        start = time.time()
+        self.engine.query({"action": "write_tag", "parameters": {"value": 1.0}})
+        elapsed = time.time() - start
+        reader.join()
+
+        self.assertLess(elapsed, 0.25)
+
+    def test_writes_serialized(self):
+        r"""
+        Documentation here
+        """
+        writers = [threading.Thread(target=self.engine.query, args=({"action": "write_tag", "parameters": {"value": counter, "seconds": 0.1}},)) for counter in range(3)]
+        start = time.time()
+        for writer in writers:
+            writer.start()
+
+        for writer in writers:
+            writer.join()
+
+        self.assertGreaterEqual(time.time() - start, 0.3)
+        self.assertEqual(sorted(self.engine.logger.rows), [0, 1, 2])
+
+    def test_read_actions_routed(self):
+        r"""
+        Documentation here
+        """
+        self.assertTrue(self.engine.query({"action": "get_routing"}))
+        self.assertFalse(proxy.is_reading())
+
+    def test_unknown_action(self):
+        r"""
+        Documentation here
+        """
+        self.assertIsNone(self.engine.query({"action": "unknown"}))
+
+
+class TestRoutingProxy(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.proxy = RoutingProxy()
+
+        class Item(Model):
+            name = CharField()
+
+            class Meta:
+                database = self.proxy
+
+        self.model = Item
+        self.primary = SqliteDatabase(os.path.join(self.folder.name, "primary.db"))
+        self.replica = SqliteDatabase(os.path.join(self.folder.name, "replica.db"))
+        for db, name in ((self.primary, "primary"), (self.replica, "replica")):
+            self.proxy.initialize(db)
+            db.create_tables([Item])
+            Item.create(name=name)
+            db.close()
+
+        self.proxy.initialize(self.primary)
+
+        return super().setUp()
+
+    def test_routing(self):
+        r"""
+        Documentation here
+        """
+        with self.subTest("Test primary without read database"):
+            with self.proxy.reading():
+                self.assertEqual(self.model.get().name, "primary")
+
+        self.proxy.set_read_db(self.replica)
+
+        with self.subTest("Test reads routed to read database"):
+            with self.proxy.reading():
+                self.assertEqual(self.model.get().name, "replica")
+
+        with self.subTest("Test writes go to primary"):
+            self.model.create(name="written")
+            self.assertEqual(self.model.select().count(), 2)
+            with self.proxy.reading():
+                self.assertEqual(self.model.select().count(), 1)
+
+        with self.subTest("Test routing is per thread"):
+            result = list()
+            with self.proxy.reading():
+                thread = threading.Thread(target=lambda: result.append(self.model.select().count()))
+                thread.start()
+                thread.join()
+            self.assertEqual(result, [2])
+
+
+class TestSpool(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.timestamp = datetime(2024, 1, 1)
+
+        return super().setUp()
+
+    def batch(self, value:float)->list:
+
+        return [{"tag": "T1", "value": value, "timestamp": self.timestamp + timedelta(seconds=value)}]
+
+    def test_replay_in_order(self):
+        r"""
+        Documentation here
+        """
+        spool = Spool(folder=self.folder.name, segment_size=128)
+        for value in range(10):
+            spool.append(self.batch(value))
+
+        replayed = list()
+        self.assertGreater(spool.serialize()["segments"], 1)
+        self.assertTrue(spool.replay(replayed.extend))
+        self.assertEqual([tag["value"] for tag in replayed], list(range(10)))
+        self.assertEqual(replayed[3]["timestamp"], self.timestamp + timedelta(seconds=3))
+        self.assertTrue(spool.is_empty())
+
+    def test_replay_resumes_after_failure(self):
+        r"""
+        Documentation here
+        """
+        spool = Spool(folder=self.folder.name)
+        for value in range(4):
+            spool.append(self.batch(value))
+
+        replayed = list()
+
+        def write(tags):
+            if tags[0]["value"]==2 and not replayed.count("failed"):
+                replayed.append("failed")
+                raise ConnectionError("database unreachable")
+            replayed.extend(tag["value"] for tag in tags)
+
+        self.assertFalse(spool.replay(write))
+        self.assertTrue(spool.replay(write))
+        self.assertEqual(replayed, [0, 1, "failed", 2, 3])
+
+    def test_torn_record_recovery(self):
+        r"""
+        Documentation here
+        """
+        spool = Spool(folder=self.folder.name)
+        spool.append(self.batch(1))
+        spool.append(self.batch(2))
+        spool.close()
+        path = os.path.join(self.folder.name, os.listdir(self.folder.name)[0])
+        with open(path, "ab") as file:
+            file.write(b"\x10\x00\x00\x00torn")
+
+        spool = Spool(folder=self.folder.name)
+        spool.append(self.batch(3))
+        replayed = list()
+        spool.replay(replayed.extend)
+
+        self.assertEqual([tag["value"] for tag in replayed], [1, 2, 3])
+
+    def test_bounded_size(self):
+        r"""
+        Documentation here
+        """
+        spool = Spool(folder=self.folder.name, segment_size=128, max_bytes=512)
+        for value in range(50):
+            spool.append(self.batch(value))
+
+        self.assertLessEqual(spool.get_size(), 512 + 128)
+        self.assertGreater(spool.dropped_records, 0)
+        replayed = list()
+        spool.replay(replayed.extend)
+        self.assertEqual(replayed[-1]["value"], 49)
+        self.assertEqual([tag["value"] for tag in replayed], sorted(tag["value"] for tag in replayed))
+
+
+class TestDataLoggerWrites(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.dbfile = os.path.join(self.folder.name, "historian.db")
+        self.db = SqliteDatabase(self.dbfile, timeout=0.1)
+        self.logger = DataLogger()
+        previous_db, previous_logger_db, previous_spool, previous_block_spool = proxy.obj, self.logger.get_db(), self.logger.spool, self.logger.block_spool
+        proxy.initialize(self.db)
+        self.logger.set_db(self.db)
+        self.logger.set_spool(folder=os.path.join(self.folder.name, "spool"))
+
+        def restore():
+            self.logger.spool.close()
+            self.logger.block_spool.close()
+            self.db.close()
+            proxy.initialize(previous_db)
+            self.logger.set_db(previous_logger_db)
+            self.logger.spool = previous_spool
+            self.logger.block_spool = previous_block_spool
+
+        self.addCleanup(restore)
+        self.logger.create_tables([Variables, Units, DataTypes, Tags, TagValue, TagValueBlock])
+        Tags.create(id="spool001", name="spool_tag", unit="Pa", data_type="float", description="", display_name="spool_tag", display_unit="Pa")
+
+        return super().setUp()
+
+    def batch(self, value:float)->list:
+
+        return [{"tag": "spool_tag", "value": value, "timestamp": datetime(2024, 1, 1) + timedelta(seconds=value)}]
+
+    def test_outage_spool_and_replay(self):
+        r"""
+        Documentation here
+        """
+        self.logger.write_tags(self.batch(0))
+
+        with self.subTest("Test batches spooled while database is locked"):
+            lock = sqlite3.connect(self.dbfile)
+            lock.execute("BEGIN EXCLUSIVE")
+            self.logger.write_tags(self.batch(1))
+            self.logger.write_tags(self.batch(2))
+            self.assertFalse(self.logger.spool.is_empty())
+            lock.rollback()
+            lock.close()
+
+        with self.subTest("Test spool replayed in order once database is back"):
+            self.logger.write_tags(self.batch(3))
+            values = [value.value for value in TagValue.select().order_by(TagValue.id)]
+            self.assertEqual(values, [0, 1, 2, 3])
+            self.assertTrue(self.logger.spool.is_empty())
+
+    def test_chunked_insert(self):
+        r"""
+        Documentation here
+        """
+        chunk_size = self.logger.insert_chunk_size
+        self.addCleanup(setattr, self.logger, "insert_chunk_size", chunk_size)
+        self.logger.insert_chunk_size = 2
+        self.logger.write_tags([tag for value in range(5) for tag in self.batch(value)])
+        values = [value.value for value in TagValue.select().order_by(TagValue.id)]
+
+        self.assertEqual(values, [0, 1, 2, 3, 4])
+
+    def test_copy_rows(self):
+        r"""
+        Documentation here
+        """
+        copied = dict()
+        db = mock.MagicMock()
+        cursor = db.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.side_effect = lambda sql, buffer: copied.update(sql=sql, csv=buffer.read())
+        rows = [(1, 2, 0.1, datetime(2024, 1, 1, 0, 0, 1)), (1, 2, 3, datetime(2024, 1, 1, 0, 0, 2)), (1, 2, 1 / 3, datetime(2024, 1, 1, 0, 0, 3))]
+
+        with mock.patch.object(self.logger, "_db", db):
+            self.logger._DataLogger__copy_rows(rows)
+
+        with self.subTest("Test COPY statement"):
+            self.assertEqual(copied["sql"], 'COPY "tagvalue" ("tag_id", "unit_id", "value", "timestamp") FROM STDIN WITH (FORMAT csv)')
+
+        with self.subTest("Test CSV rows, timestamps as stored by TagValue and floats round-trip"):
+            self.assertEqual(list(csv.reader(io.StringIO(copied["csv"]))), [
+                ["1", "2", "0.1", str(TagValue.timestamp.db_value(rows[0][3]))],
+                ["1", "2", "3.0", str(TagValue.timestamp.db_value(rows[1][3]))],
+                ["1", "2", "0.3333333333333333", "1704067203"]
+            ])
+
+        with self.subTest("Test cursor closed"):
+            db.cursor.return_value.__exit__.assert_called_once()
+
+    def test_block_storage(self):
+        r"""
+        Documentation here
+        """
+        cvt = CVTEngine()
+        tag, _ = cvt.set_tag(name="spool_tag", unit="Pa", data_type="float", variable="Pressure", description="")
+        self.addCleanup(cvt.delete_tag, id=tag.id)
+        self.addCleanup(self.logger.set_storage, storage="rows")
+        self.logger.set_storage(storage="blocks", block_span=60)
+        start = datetime(2024, 1, 1, 0, 0, 50)
+        with mock.patch.object(TagValueBlock, "upsert", wraps=TagValueBlock.upsert) as upsert:
+            for batch in range(4):
+                self.logger.write_tags([{"tag": "spool_tag", "value": batch * 10 + counter + 0.5, "timestamp": start + timedelta(seconds=batch * 10 + counter)} for counter in range(10)])
+
+        with self.subTest("Test open block kept in memory, closed block written once"):
+            self.assertEqual(upsert.call_count, 1)
+            self.assertEqual([block.count for block in TagValueBlock.select().order_by(TagValueBlock.start)], [10])
+
+        with self.subTest("Test read trends decodes blocks and the open block"):
+            trends = self.logger.read_trends(start="2024-01-01 00:00:55.000000", stop="2024-01-01 00:01:05.000000", timezone="UTC", tags=["spool_tag"])
+            values = [value["y"] for value in trends["spool_tag"]["values"]]
+            self.assertEqual(len(values), 9)
+            for value, expected in zip(values, [counter + 0.5 for counter in range(6, 15)]):
+                self.assertAlmostEqual(value, expected)
+
+        self.assertEqual(self.logger.write_blocks(), 1)
+        with self.subTest("Test one block per tag and span"):
+            self.assertEqual(TagValue.select().count(), 0)
+            self.assertEqual([block.count for block in TagValueBlock.select().order_by(TagValueBlock.start)], [10, 30])
+
+        self.logger.set_storage(storage="blocks", block_span=60, write_period=0)
+        self.logger.write_tags([{"tag": "spool_tag", "value": 40.5, "timestamp": start + timedelta(seconds=40)}])
+        with self.subTest("Test open block reloaded and written every period"):
+            self.assertEqual([block.count for block in TagValueBlock.select().order_by(TagValueBlock.start)], [10, 31])
+            self.assertTrue(self.logger.block_spool.is_empty())
+
+        self.logger.set_storage(storage="blocks", block_span=60)
+        self.logger.write_tags([{"tag": "spool_tag", "value": counter + 0.5, "timestamp": start + timedelta(seconds=counter)} for counter in range(41, 46)])
+        with self.subTest("Test open block samples kept in the blocks log"):
+            self.assertEqual([block.count for block in TagValueBlock.select().order_by(TagValueBlock.start)], [10, 31])
+            self.assertFalse(self.logger.block_spool.is_empty())
+
+        # The open blocks in memory are lost, like on a crash
+        self.logger.set_storage(storage="blocks", block_span=60)
+        self.logger.write_tags([{"tag": "spool_tag", "value": 41.5, "timestamp": start + timedelta(seconds=41)}])
+        with self.subTest("Test blocks log written on the next batch, samples not duplicated"):
+            self.assertEqual([block.count for block in TagValueBlock.select().order_by(TagValueBlock.start)], [10, 36])
+
+    def test_iter_trends(self):
+        r"""
+        Documentation here
+        """
+        cvt = CVTEngine()
+        tag, _ = cvt.set_tag(name="spool_tag", unit="Pa", data_type="float", variable="Pressure", description="")
+        self.addCleanup(cvt.delete_tag, id=tag.id)
+        self.addCleanup(self.logger.set_storage, storage="rows")
+        start = datetime(2024, 1, 1)
+        self.logger.write_tags([{"tag": "spool_tag", "value": counter + 0.5, "timestamp": start + timedelta(seconds=counter)} for counter in range(0, 20, 2)])
+        self.logger.set_storage(storage="blocks", block_span=60)
+        self.logger.write_tags([{"tag": "spool_tag", "value": counter + 0.5, "timestamp": start + timedelta(seconds=counter)} for counter in range(1, 20, 2)])
+
+        samples = list(DataLoggerEngine().iter_trends("2024-01-01 00:00:00.500000", "2024-01-01 00:00:15.500000", "UTC", "spool_tag", "unknown_tag", chunk_size=3))
+
+        self.assertEqual([timestamp.second for _, timestamp, _ in samples], list(range(1, 16)))
+        for (name, _, value), expected in zip(samples, range(1, 16)):
+            self.assertEqual(name, "spool_tag")
+            self.assertAlmostEqual(value, expected + 0.5)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_archive(self):
+        r"""
+        Documentation here
+        """
+        cvt = CVTEngine()
+        tag, _ = cvt.set_tag(name="spool_tag", unit="Pa", data_type="float", variable="Pressure", description="")
+        self.addCleanup(cvt.delete_tag, id=tag.id)
+        self.addCleanup(setattr, self.logger, "archive", None)
+        self.logger.set_archive(folder=os.path.join(self.folder.name, "archive"), days=1, groups=4)
+        now = datetime.utcnow().replace(microsecond=0)
+        start = (now - timedelta(days=3)).replace(hour=12, minute=0, second=0)
+        self.logger.write_tags([{"tag": "spool_tag", "value": counter + 0.5, "timestamp": start + timedelta(seconds=counter)} for counter in range(10)])
+        self.logger.write_tags([{"tag": "spool_tag", "value": 100.5, "timestamp": now - timedelta(minutes=1)}])
+
+        with self.subTest("Test old rows moved into the archive"):
+            self.assertEqual(DataLoggerEngine().archive(), 10)
+            self.assertEqual(TagValue.select().count(), 1)
+            self.assertEqual(self.logger.get_archive()["days"], 1)
+            self.assertEqual(DataLoggerEngine().archive(), 0)
+
+        with self.subTest("Test read trends unions archive and database"):
+            trends = self.logger.read_trends(
+                start=(start - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                stop=now.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                timezone="UTC",
+                tags=["spool_tag"]
+            )
+            values = [value["y"] for value in trends["spool_tag"]["values"]]
+            self.assertEqual(len(values), 11)
+            for value, expected in zip(values, [counter + 0.5 for counter in range(10)] + [100.5]):
+                self.assertAlmostEqual(value, expected)
+
+
+    def test_trends_cache(self):
+        r"""
+        Documentation here
+        """
+        cvt = CVTEngine()
+        tag, _ = cvt.set_tag(name="spool_tag", unit="Pa", data_type="float", variable="Pressure", description="")
+        self.addCleanup(cvt.delete_tag, id=tag.id)
+        start = datetime(2024, 1, 1)
+        self.logger.write_tags([{"tag": "spool_tag", "value": float(counter % 7), "timestamp": start + timedelta(seconds=counter)} for counter in range(1200)])
+        cache = TrendsCache(budget=10)
+        # 10 min in 10 px, 64 s buckets
+        window = timedelta(minutes=10)
+        timestamps, values = cache.read("spool_tag", start, start + window)
+
+        with self.subTest("Test trend decimated to the zoom level"):
+            self.assertEqual(cache.get_level(0, window.total_seconds()), 6)
+            self.assertLessEqual(len(values), 2 * (10 + 1))
+            self.assertEqual(min(values), 0.0)
+            self.assertEqual(max(values), 6.0)
+
+        with self.subTest("Test pan reads only the missing range"):
+            queries = cache.queries
+            _timestamps, _values = cache.read("spool_tag", start + window / 2, start + window / 2 + window)
+            self.assertEqual(cache.queries, queries + 1)
+            self.assertEqual(
+                [(timestamp, value) for timestamp, value in zip(timestamps, values) if timestamp >= _timestamps[0]],
+                [(timestamp, value) for timestamp, value in zip(_timestamps, _values) if timestamp <= timestamps[-1]]
+            )
+
+        with self.subTest("Test cached range read without queries"):
+            queries = cache.queries
+            cache.read("spool_tag", start + timedelta(minutes=2), start + timedelta(minutes=12))
+            self.assertEqual(cache.queries, queries)
+
+        cache.clear()
+        iter_trends = cache.logger_engine.iter_trends
+
+        def slow_iter_trends(*args, **kwargs):
+            time.sleep(0.3)
+            return iter_trends(*args, **kwargs)
+
+        queries = cache.queries
+        with mock.patch.object(cache.logger_engine, "iter_trends", side_effect=slow_iter_trends):
+            readers = [threading.Thread(target=cache.read, args=("spool_tag", start, start + window)) for _ in range(2)]
+            for reader in readers:
+                reader.start()
+            time.sleep(0.1)
+            begin = time.time()
+            cache.serialize()
+            elapsed = time.time() - begin
+            for reader in readers:
+                reader.join()
+
+        with self.subTest("Test query outside the lock, range in flight queried once"):
+            self.assertLess(elapsed, 0.1)
+            self.assertEqual(cache.queries, queries + 1)
+            self.assertEqual(cache.read("spool_tag", start, start + window), (timestamps, values))
+
+
+class TestAlarmsLogger(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.db = SqliteDatabase(os.path.join(self.folder.name, "alarms.db"), pragmas={'foreign_keys': 1})
+        self.engine = AlarmsLoggerEngine()
+        self.logger = DataLogger()
+        previous_db, previous_logger_db, previous_engine_db = proxy.obj, self.logger.get_db(), self.engine.get_db()
+        proxy.initialize(self.db)
+        self.logger.set_db(self.db)
+        self.engine.set_db(self.db)
+
+        def restore():
+            self.engine.flush()
+            self.db.close()
+            proxy.initialize(previous_db)
+            self.logger.set_db(previous_logger_db)
+            self.engine.set_db(previous_engine_db)
+
+        self.addCleanup(restore)
+        self.logger.create_tables([Variables, Units, DataTypes, Tags])
+        self.engine.create_tables([AlarmTypes, AlarmStates, Alarms, AlarmSummary])
+        Tags.create(id="alarm001", name="alarm_tag", unit="Pa", data_type="float", description="", display_name="alarm_tag", display_unit="Pa")
+        self.engine.create(id="alarm001", name="alarm_H", tag="alarm_tag", trigger_type="HIGH", trigger_value=50.0, description="")
+
+        return super().setUp()
+
+    def test_summary_records_use_cached_ids(self):
+        r"""
+        Documentation here
+        """
+        self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 1))
+        self.engine.flush()
+
+        with mock.patch.object(Alarms, "read_by_name", side_effect=AssertionError), mock.patch.object(AlarmStates, "read_by_name", side_effect=AssertionError):
+            for counter in range(1, 100):
+                self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 1) + timedelta(seconds=counter))
+            self.assertTrue(self.engine.flush())
+
+        self.assertEqual(AlarmSummary.select().count(), 100)
+        self.assertEqual(self.engine.get_lasts(lasts=1)[0]["alarm_time"], "01/01/2024, 00:01:39.000000")
+
+    def test_cache_follows_alarm_updates(self):
+        r"""
+        Documentation here
+        """
+        self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 1))
+        self.engine.put(id="alarm001", name="alarm_high")
+        self.engine.create_record_on_alarm_summary(name="alarm_high", state=States.UNACK.value, timestamp=datetime(2024, 1, 2))
+        self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 3))
+
+        self.assertEqual([record["name"] for record in self.engine.get_lasts(lasts=5)], ["alarm_high", "alarm_high"])
+
+        self.engine.delete(id="alarm001")
+        self.assertNotIn("alarm_high", self.engine.logger._alarm_ids)
+
+    def test_keyset_pagination(self):
+        r"""
+        Documentation here
+        """
+        for counter in range(25):
+            # Pairs of records with the same timestamp
+            self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 1) + timedelta(seconds=counter // 2))
+
+        expected = self.engine.filter_alarm_summary_by()
+        pages, cursor = list(), None
+        while True:
+            page = self.engine.filter_alarm_summary_by(limit=10, cursor=cursor)
+            pages.append(page)
+            if len(page) < 10:
+                break
+            cursor = page[-1]["id"]
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([record["id"] for page in pages for record in page], [record["id"] for record in expected])
+        self.assertEqual([record["id"] for record in expected], sorted((record["id"] for record in expected), reverse=True))
+        self.assertEqual(len(self.engine.filter_alarm_summary_by(names=["alarm_H"], greater_than_timestamp=datetime(2024, 1, 1, 0, 0, 10))), 3)
+
+    def test_manager_reads_pending_records(self):
+        r"""
+        Documentation here
+        """
+        manager = AlarmManager()
+        self.engine.writer.stop()
+        self.engine.create_record_on_alarm_summary(name="alarm_H", state=States.UNACK.value, timestamp=datetime(2024, 1, 1))
+
+        with self.subTest("Test writer restarted after stop"):
+            self.assertTrue(self.engine.writer.is_alive())
+
+        with self.subTest("Test manager reads flush the writer"):
+            records, _ = manager.get_lasts(lasts=1)
+            self.assertEqual(records[0]["alarm_time"], "01/01/2024, 00:00:00.000000")
+            records, _ = manager.filter_by(names=["alarm_H"])
+            self.assertEqual(len(records), 1)
+
+
+class TestLogsLogger(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.db = SqliteDatabase(os.path.join(self.folder.name, "logs.db"), pragmas={'foreign_keys': 1})
+        self.engine = LogsLoggerEngine()
+        self.logger = DataLogger()
+        previous_db, previous_logger_db, previous_engine_db = proxy.obj, self.logger.get_db(), self.engine.get_db()
+        proxy.initialize(self.db)
+        self.logger.set_db(self.db)
+        self.engine.set_db(self.db)
+
+        def restore():
+            self.engine.flush()
+            self.db.close()
+            proxy.initialize(previous_db)
+            self.logger.set_db(previous_logger_db)
+            self.engine.set_db(previous_engine_db)
+
+        self.addCleanup(restore)
+        self.logger.create_tables([Variables, Units, DataTypes, Tags, AlarmTypes, AlarmStates, Alarms, AlarmSummary, Roles, Users, Events, Logs])
+        role = Role(name="operator", level=1)
+        Roles.create(name=role.name, level=role.level, identifier=role.identifier)
+        self.user = User(username="operator", role=role, email="operator@example.com", password="operator")
+        Users.create(user=self.user)
+
+        return super().setUp()
+
+    def test_pending_log_serialized_like_written_log(self):
+        r"""
+        Documentation here
+        """
+        event, _ = Events.create(message="event", user=self.user, classification="State Machine", priority=1, criticity=1)
+        # Kept queued while the database rejects the batches
+        with mock.patch.object(self.engine.writer, "_write", return_value=None):
+            log, _ = self.engine.create(message="log", user=self.user, description="description", classification="Event", event_id=event.id, timestamp=datetime(2024, 1, 1))
+            pending = log.serialize()
+            lasts = self.engine.get_lasts(lasts=1)
+
+        self.engine.flush()
+        written = self.engine.get_lasts(lasts=1)[0]
+
+        with self.subTest("Test pending log id"):
+            self.assertIsNone(pending["id"])
+            self.assertIsNotNone(written["id"])
+
+        with self.subTest("Test same structure before and after it's written"):
+            self.assertEqual(lasts, [pending])
+            self.assertEqual(dict(pending, id=written["id"]), written)
+            self.assertEqual(pending["event"]["id"], event.id)
+            self.assertIsNone(pending["alarm"])
+
+
+class TestBatchWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db = list()
+        self.available = True
+        self.writer = BatchWriter(name="TestWriter", write=self.write, period=0.05, max_batch=10, max_pending=50)
+        self.addCleanup(self.writer.stop)
+
+        return super().setUp()
+
+    def write(self, records:list):
+
+        if not self.available:
+
+            return None
+
+        time.sleep(0.01)
+        self.db.extend(record.fields["message"] for record in records)
+
+        return len(records)
+
+    def get_lasts(self, lasts:int)->list:
+
+        with self.writer.pending() as pending:
+            result = [record.serialize()["message"] for record in pending[:lasts]]
+            result.extend(list(reversed(self.db))[:lasts - len(result)])
+
+        return result
+
+    def test_put_doesnt_wait_for_database(self):
+        r"""
+        Documentation here
+        """
+        start = time.time()
+        for counter in range(25):
+            self.writer.put(PendingRecord(message=counter))
+
+        self.assertLess(time.time() - start, 0.05)
+        self.assertEqual(self.get_lasts(3), [24, 23, 22])
+        self.assertTrue(wait(lambda: len(self.db)==25))
+        self.assertEqual(self.db, list(range(25)))
+
+    def test_read_your_writes(self):
+        r"""
+        Documentation here
+        """
+        for counter in range(200):
+            self.writer.put(PendingRecord(message=counter))
+            self.assertEqual(self.get_lasts(5), [value for value in range(counter, counter - 5, -1) if value >= 0])
+
+    def test_retry_and_bounded_queue(self):
+        r"""
+        Documentation here
+        """
+        self.available = False
+        for counter in range(60):
+            self.writer.put(PendingRecord(message=counter))
+
+        self.assertFalse(self.writer.flush())
+        self.available = True
+        self.assertTrue(self.writer.flush())
+        self.assertEqual(self.db, list(range(10, 60)))
+
+    def test_put_after_stop(self):
+        r"""
+        Documentation here
+        """
+        self.writer.put(PendingRecord(message=0))
+        self.writer.stop()
+        with self.subTest("Test stop writes the pending records"):
+            self.assertFalse(self.writer.is_alive())
+            self.assertEqual(self.db, [0])
+
+        self.writer.put(PendingRecord(message=1))
+        with self.subTest("Test put restarts the writer"):
+            self.assertTrue(self.writer.is_alive())
+            self.assertTrue(wait(lambda: self.db==[0, 1]))
+
+    def test_pending_record_serialize(self):
+        r"""
+        Documentation here
+        """
+        record = PendingRecord(message="Alarm acknowledged", timestamp=datetime(2024, 1, 1))
+
+        self.assertEqual(record.serialize(), {"id": None, "message": "Alarm acknowledged", "timestamp": "01/01/2024, 00:00:00.000000"})
+
+
+def wait(condition, timeout:float=2.0)->bool:
+
+    start = time.time()
+    while time.time() - start < timeout:
+        if condition():
+            return True
+        time.sleep(0.01)
+
+    return False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+import unittest, time
+from automation.managers.opcua_client import OPCUAClientManager
+from automation.managers.async_opcua_client import AsyncOPCUAClientManager
+from automation.tags.cvt import CVTEngine
+from automation.opcua.subscription import DAS
+from automation.state_machine import DAQ
+from automation.opcua.polling import PollingScheduler
+from automation.tags.tag import Tag
+from automation.buffer import Buffer
+from automation.tests.opcua_server import LocalOPCUAServer
+
+cvt = CVTEngine()
+
+
+def wait_for(condition, timeout:float=5.0)->bool:
+
+    start = time.time()
+    while time.time() - start < timeout:
+        if condition():
+            return True
+        time.sleep(0.05)
+
+    return False
+
+
+class TestPollingScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.scheduler = PollingScheduler()
+        self.tags = [
+            Tag(name="poll1", unit="C", variable="Temperature", data_type="float", opcua_address="opc.tcp://plc1:4840", node_namespace="ns=2;i=1", scan_time=250),
+            Tag(name="poll2", unit="C", variable="Temperature", data_type="float", opcua_address="opc.tcp://plc1:4840", node_namespace="ns=2;i=2", scan_time=250),
+            Tag(name="poll3", unit="C", variable="Temperature", data_type="float", opcua_address="opc.tcp://plc2:4840", node_namespace="ns=2;i=1", scan_time=250),
+            Tag(name="poll4", unit="C", variable="Temperature", data_type="float", opcua_address="opc.tcp://plc1:4840", node_namespace="ns=2;i=3", scan_time=1000)
+        ]
+        for tag in self.tags:
+            self.scheduler.add(tag=tag)
+
+        return super().setUp()
+
+    def test_groups(self):
+        r"""
+        Documentation here
+        """
+        groups = {group.get_key(): list(group.tags) for group in self.scheduler.get_groups()}
+
+        with self.subTest("Test tags merged by client and scan time"):
+            self.assertEqual(len(groups), 3)
+            self.assertEqual(groups[("opc.tcp://plc1:4840", 250)], ["poll1", "poll2"])
+
+        with self.subTest("Test tick"):
+            self.assertEqual(self.scheduler.get_tick(), 0.25)
+
+        with self.subTest("Test phases spread"):
+            deadlines = [group.next_deadline for group in self.scheduler.get_groups()]
+            self.assertEqual(len(set(deadlines)), len(deadlines))
+
+        with self.subTest("Test remove"):
+            self.scheduler.remove(tag_name="poll4")
+            self.assertEqual(len(self.scheduler.get_groups()), 2)
+
+    def test_deadline_misses(self):
+        r"""
+        Documentation here
+        """
+        group = [group for group in self.scheduler.get_groups() if group.scan_time==1000][0]
+        deadline = group.next_deadline
+        due = self.scheduler.pop_due(now=deadline + 2.5)
+
+        self.assertIn(group, due)
+        self.assertEqual(group.deadline_misses, 2)
+        self.assertAlmostEqual(group.next_deadline, deadline + 3.0)
+
+
+class TestAsyncOPCUAClientManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        cls.servers = [LocalOPCUAServer(variables=5), LocalOPCUAServer(variables=5)]
+        for server in cls.servers:
+            server.start()
+        cls.manager = AsyncOPCUAClientManager()
+        for counter, server in enumerate(cls.servers):
+            cls.manager.add(client_name=f"plc{counter}", host=server.host, port=server.port)
+
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+
+        cls.manager.stop()
+        for server in cls.servers:
+            server.stop()
+
+        return super().tearDownClass()
+
+    def test_add_client(self):
+        r"""
+        Documentation here
+        """
+        clients = self.manager.serialize()
+
+        for counter, server in enumerate(self.servers):
+            with self.subTest(f"Test client plc{counter}"):
+                self.assertTrue(clients[f"plc{counter}"]["is_opened"])
+                self.assertEqual(clients[f"plc{counter}"]["server_url"], server.endpoint_url)
+
+    def test_get_node_values(self):
+        r"""
+        Documentation here
+        """
+        server = self.servers[0]
+        server.set_value(1, 42.0)
+        values, status = self.manager.get_node_values(client_name="plc0", namespaces=server.namespaces)
+
+        self.assertEqual(status, 200)
+        self.assertEqual([value["Namespace"] for value in values], server.namespaces)
+        self.assertEqual(values[1]["Value"], 42.0)
+
+    def test_get_node_attributes(self):
+        r"""
+        Documentation here
+        """
+        server = self.servers[1]
+        server.set_value(0, 7.5)
+        attrs = self.manager.get_node_value_by_opcua_address(opcua_address=server.endpoint_url, namespace=server.namespaces[0])
+        attrs, status = attrs[0]
+
+        self.assertEqual(status, 200)
+        self.assertEqual(attrs["BrowseName"], "Variable0")
+        self.assertEqual(attrs["DataValue"].Value.Value, 7.5)
+        self.assertEqual(attrs["DataType"], "Double")
+
+    def test_get_values_from_several_clients(self):
+        r"""
+        Documentation here
+        """
+        requests = {f"plc{counter}": server.namespaces for counter, server in enumerate(self.servers)}
+        requests["unknown"] = ["ns=2;i=2"]
+        result = self.manager.get_values(requests=requests)
+
+        self.assertNotIn("unknown", result)
+        for client_name, namespaces in result.items():
+            with self.subTest(f"Test values {client_name}"):
+                self.assertEqual(len(namespaces), 5)
+
+
+class TestOPCUAClientSupervision(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.server = LocalOPCUAServer(variables=2)
+        self.server.start()
+        self.addCleanup(lambda: self.server.stop())
+        self.tag, _ = cvt.set_tag(
+            name="opcua_supervised_tag",
+            unit="C",
+            data_type="float",
+            variable="Temperature",
+            description="",
+            opcua_address=self.server.endpoint_url,
+            node_namespace=self.server.namespaces[0]
+        )
+        DAS().buffer[self.tag.name] = {"timestamp": Buffer(), "values": Buffer(), "unit": "C"}
+        self.manager = OPCUAClientManager()
+        self.manager.add(client_name="supervised", host=self.server.host, port=self.server.port)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.manager.remove(client_name="supervised")
+        cvt.delete_tag(id=self.tag.id)
+
+        return super().tearDown()
+
+    def test_reconnect_and_replay_subscriptions(self):
+        r"""
+        Documentation here
+        """
+        self.server.set_value(0, 5.0)
+        self.assertTrue(wait_for(lambda: cvt.get_value(id=self.tag.id)==5.0))
+
+        with self.subTest("Test bad quality during outage"):
+            self.server.stop()
+            self.manager.supervise()
+            self.assertFalse(self.manager.is_connected(client_name="supervised"))
+            self.assertEqual(self.tag.get_quality(), "Bad")
+            self.assertEqual(self.manager.get_connection_metrics(client_name="supervised")["outages"], 1)
+
+        with self.subTest("Test reconnect and subscription replay"):
+            self.server = LocalOPCUAServer(variables=2, port=self.server.port)
+            self.server.start()
+            self.manager._supervisors["supervised"].next_attempt = 0.0
+            self.manager.supervise()
+            metrics = self.manager.get_connection_metrics(client_name="supervised")
+            self.assertTrue(self.manager.is_connected(client_name="supervised"))
+            self.assertEqual(metrics["reconnects"], 1)
+            self.assertIsNotNone(metrics["last_reconnect_latency"])
+            self.server.set_value(0, 9.0)
+            self.assertTrue(wait_for(lambda: cvt.get_value(id=self.tag.id)==9.0))
+            self.assertEqual(self.tag.get_quality(), "Good")
+
+
+class TestDAQ(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.server = LocalOPCUAServer(variables=2)
+        self.server.start()
+        self.addCleanup(lambda: self.server.stop())
+        self.tag, _ = cvt.set_tag(
+            name="opcua_daq_tag",
+            unit="C",
+            data_type="float",
+            variable="Temperature",
+            description="",
+            opcua_address=self.server.endpoint_url,
+            node_namespace=self.server.namespaces[1],
+            scan_time=100
+        )
+        DAS().buffer[self.tag.name] = {"timestamp": Buffer(), "values": Buffer(), "unit": "C"}
+        self.manager = OPCUAClientManager()
+        self.manager.add(client_name="daq_client", host=self.server.host, port=self.server.port)
+        self.daq = DAQ(name="DAQ-test")
+        self.daq.set_opcua_client_manager(manager=self.manager)
+        self.daq.subscribe_to(tag=self.tag)
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+
+        self.daq.unsubscribe_to(tag=self.tag)
+        self.manager.remove(client_name="daq_client")
+        cvt.delete_tag(id=self.tag.id)
+
+        return super().tearDown()
+
+    def test_registered_nodes(self):
+        r"""
+        Documentation here
+        """
+        client = self.manager.get(client_name="daq_client")
+        node = self.daq._DAQ__registered_nodes[self.tag.name]
+
+        with self.subTest("Test node registered on subscription"):
+            self.assertEqual(node["client_id"], client.get_id())
+            self.server.set_value(1, 12.5)
+            self.assertTrue(wait_for(lambda: self.daq.while_running() or cvt.get_value(id=self.tag.id)==12.5))
+
+        with self.subTest("Test node registered again after reconnect"):
+            client.reconnect()
+            self.server.set_value(1, 13.5)
+            self.assertTrue(wait_for(lambda: self.daq.while_running() or cvt.get_value(id=self.tag.id)==13.5))
+            self.assertEqual(self.daq._DAQ__registered_nodes[self.tag.name]["client_id"], client.get_id())
+
+        with self.subTest("Test node released on unsubscription"):
+            self.daq.unsubscribe_to(tag=self.tag)
+            self.assertNotIn(self.tag.name, self.daq._DAQ__registered_nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
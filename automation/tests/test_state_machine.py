@@ -0,0 +1,217 @@
+import unittest, time, os
+from automation.state_machine import StateMachineCore
+from automation.models import FloatType, IntegerType
+from automation.tags.cvt import CVTEngine
+from automation.workers.state_machine import SharedMachineScheduler, ProcessMachineRunner
+
+cvt = CVTEngine()
+
+
+class CounterMachine(StateMachineCore):
+
+    def __init__(self, name:str, duration:float=0.0):
+
+        super(CounterMachine, self).__init__(name=name)
+        self.counter = 0
+        self.duration = duration
+
+    def while_running(self):
+
+        self.counter += 1
+        time.sleep(self.duration)
+
+
+class TestSharedMachineScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.scheduler = SharedMachineScheduler(max_workers=2)
+        self.addCleanup(self.scheduler.stop)
+
+        return super().setUp()
+
+    def test_many_machines_few_threads(self):
+        r"""
+        Documentation here
+        """
+        machines = [CounterMachine(name=f"shared_{counter}") for counter in range(50)]
+        for machine in machines:
+            machine.set_interval(FloatType(0.05))
+            self.scheduler.add_machine(machine)
+
+        self.scheduler.start()
+        time.sleep(0.6)
+        metrics = self.scheduler.serialize_metrics()
+
+        with self.subTest("Test every machine runs at its interval"):
+            for machine in machines:
+                self.assertGreaterEqual(machine.counter, 5)
+                self.assertEqual(metrics[machine.name.value]["overruns"], 0)
+
+        with self.subTest("Test pool size"):
+            self.assertLessEqual(len(self.scheduler._pool._threads), 2)
+
+    def test_overruns_and_deadline_misses(self):
+        r"""
+        Documentation here
+        """
+        machine = CounterMachine(name="slow_machine", duration=0.25)
+        machine.set_interval(FloatType(0.1))
+        self.scheduler.add_machine(machine)
+        self.scheduler.start()
+        time.sleep(1.2)
+        metrics = self.scheduler.get_metrics(machine).serialize()
+
+        self.assertGreaterEqual(metrics["overruns"], 1)
+        self.assertGreaterEqual(metrics["deadline_misses"], 2)
+        self.assertLess(metrics["max_jitter"], 0.1)
+
+
+class ProcessMachine(StateMachineCore):
+
+    def __init__(self, name:str):
+
+        super(ProcessMachine, self).__init__(name=name)
+        self.counter = IntegerType(default=0)
+        self.pid = IntegerType(default=0)
+
+    def while_running(self):
+
+        self.counter.value += 1
+        self.pid.value = os.getpid()
+
+
+class GainMachine(StateMachineCore):
+
+    def __init__(self, name:str, inlet, outlet):
+
+        super(GainMachine, self).__init__(name=name)
+        self.gain = FloatType(default=2.0)
+        self.restart_pid = IntegerType(default=0)
+        self.restarts = IntegerType(default=0)
+        self.subscribe_to(tag=inlet)
+        self.add_process_variable(name="outlet", tag=outlet, read_only=False)
+        self.inlet = inlet.get_name()
+
+    def while_waiting(self):
+
+        if all(self.data.values()):
+
+            self.send("wait_to_run")
+
+    def while_running(self):
+
+        value = getattr(self, self.inlet).value
+        self.outlet.value = value * self.gain.value
+
+        if value > 100.0:
+
+            self.transition(to="restart")
+
+    def on_run_to_restart(self):
+
+        self.restart_pid.value = os.getpid()
+        self.restarts.value += 1
+
+
+class TestProcessMachineRunner(unittest.TestCase):
+
+    def test_machine_in_worker_process(self):
+        r"""
+        Documentation here
+        """
+        machine = ProcessMachine(name="process_machine")
+        machine.set_interval(FloatType(0.05))
+        runner = ProcessMachineRunner(machine)
+        runner.start()
+        time.sleep(0.6)
+
+        with self.subTest("Test state and attributes back from the process"):
+            self.assertTrue(runner.is_process_alive())
+            self.assertEqual(machine.current_state.name, "run")
+            self.assertGreaterEqual(machine.counter.value, 5)
+            self.assertNotIn(machine.pid.value, (0, os.getpid()))
+
+        with self.subTest("Test metrics"):
+            self.assertGreaterEqual(runner.serialize_metrics()["process_machine"]["runs"], 5)
+
+        runner.stop()
+        runner.join(timeout=1.0)
+        with self.subTest("Test stop"):
+            self.assertFalse(runner.is_process_alive())
+            self.assertIsNone(machine.process)
+
+    def test_forwarded_calls(self):
+        r"""
+        Documentation here
+        """
+        inlet, _ = cvt.set_tag(name="gain_in", variable="Pressure", unit="Pa", data_type="float", description="gain_in")
+        outlet, _ = cvt.set_tag(name="gain_out", variable="Pressure", unit="Pa", data_type="float", description="gain_out")
+        self.addCleanup(cvt.delete_tag, id=inlet.id)
+        self.addCleanup(cvt.delete_tag, id=outlet.id)
+        machine = GainMachine(name="gain_machine", inlet=inlet, outlet=outlet)
+        machine.set_interval(FloatType(0.05))
+        machine.buffer_size.value = 1
+        runner = ProcessMachineRunner(machine)
+        runner.start()
+        self.addCleanup(runner.join, 1.0)
+        self.addCleanup(runner.stop)
+        time.sleep(0.2)
+        cvt.set_value(id=inlet.id, value=10.0, timestamp=None)
+        time.sleep(0.4)
+
+        with self.subTest("Test forwarded notify and output written to the CVT"):
+            self.assertEqual(machine.current_state.name, "run")
+            self.assertEqual(outlet.value.value, 20.0)
+
+        machine.put_attr("gain", FloatType(3.0))
+        time.sleep(0.3)
+        with self.subTest("Test forwarded put_attr"):
+            self.assertEqual(outlet.value.value, 30.0)
+
+        machine.transition(to="restart")
+        with self.subTest("Test transition hooks run in the process only"):
+            self.assertNotEqual(machine.restart_pid.value, os.getpid())
+            time.sleep(0.3)
+            self.assertNotIn(machine.restart_pid.value, (0, os.getpid()))
+            self.assertEqual(machine.current_state.name, "wait")
+
+        cvt.set_value(id=inlet.id, value=200.0, timestamp=None)
+        time.sleep(0.4)
+        with self.subTest("Test transition called in the process runs on the proxy"):
+            self.assertEqual(machine.restarts.value, 2)
+            self.assertEqual(machine.current_state.name, "wait")
+
+
+class TestTransitionTable(unittest.TestCase):
+
+    def test_transition_table(self):
+        r"""
+        Documentation here
+        """
+        machine = CounterMachine(name="table_machine")
+
+        with self.subTest("Test table built for the subclass"):
+
+            self.assertEqual(CounterMachine._transition_table[("wait", "run")], "wait_to_run")
+            self.assertEqual(len(CounterMachine._transition_table), len(machine.transitions))
+
+        with self.subTest("Test active transitions"):
+
+            self.assertEqual([transition.event for transition in machine._get_active_transitions()], ["start_to_wait"])
+
+        machine.transition(to="wait")
+        machine.transition(to="start")
+        with self.subTest("Test allowed and not allowed transitions"):
+
+            self.assertEqual(machine.current_state.name, "wait")
+            self.assertIsNone(machine._transition_table.get(("wait", "start")))
+
+        machine.transition(to="run")
+        with self.subTest("Test transition"):
+
+            self.assertEqual(machine.current_state.name, "run")
+
+
+if __name__ == '__main__':
+    unittest.main()
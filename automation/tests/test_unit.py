@@ -1,5 +1,10 @@
-import unittest
+import unittest, math, json, csv, io, importlib.util
+from unittest import mock
+from datetime import datetime, timedelta, timezone
 from ..variables import (Pressure)
+from ..utils import gorilla, export, patch_table_data
+from ..utils.updates import ChangeLog
+from ..utils.decimation import get_bucket_width, get_closed, min_max
 
 class TestConversions(unittest.TestCase):
 
@@ -19,3 +24,203 @@ class TestConversions(unittest.TestCase):
         expected = 146.959
 
         self.assertAlmostEqual(Pressure.convert_value(value, from_unit=from_unit, to_unit=to_unit), expected, delta=0.001)
+
+
+class TestGorilla(unittest.TestCase):
+
+    def test_round_trip(self):
+        r"""
+        Documentation here
+        """
+        timestamps = [1700000000000, 1700000001000, 1700000002000, 1700000002999, 1700000010000, 1700000010000, 1800000000000]
+        values = [20.5, 20.5, 20.75, -3.0, float("inf"), 0.0, 1e-300]
+        decoded = gorilla.decode(gorilla.encode(timestamps, values))
+
+        self.assertEqual(decoded, (timestamps, values))
+
+    def test_compression(self):
+        r"""
+        Documentation here
+        """
+        timestamps = [1700000000000 + counter * 1000 for counter in range(60)]
+        values = [round(20 + math.sin(counter / 30), 2) for counter in range(60)]
+        data = gorilla.encode(timestamps, values)
+
+        self.assertEqual(gorilla.decode(data), (timestamps, values))
+        self.assertLess(len(data), 60 * 16 / 2)
+
+    def test_empty_block(self):
+        r"""
+        Documentation here
+        """
+        self.assertEqual(gorilla.decode(gorilla.encode([], [])), ([], []))
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.samples = [("PT-01", start + timedelta(seconds=counter), counter + 0.5) for counter in range(7)]
+
+        return super().setUp()
+
+    def test_ndjson(self):
+        r"""
+        Documentation here
+        """
+        chunks = list(export.to_ndjson(self.samples, chunk_size=3))
+        lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(lines[1], {"tag": "PT-01", "timestamp": "2024-01-01T00:00:01+00:00", "value": 1.5})
+        self.assertEqual(len(lines), 7)
+
+    def test_csv(self):
+        r"""
+        Documentation here
+        """
+        chunks = list(export.to_csv(self.samples, chunk_size=3))
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(rows[0], ["tag", "timestamp", "value"])
+        self.assertEqual(rows[-1], ["PT-01", "2024-01-01T00:00:06+00:00", "6.5"])
+        self.assertEqual(list(csv.reader(io.StringIO("".join(export.to_csv([]))))), [["tag", "timestamp", "value"]])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_arrow(self):
+        r"""
+        Documentation here
+        """
+        import pyarrow
+        table = pyarrow.ipc.open_stream(b"".join(export.to_arrow(self.samples, chunk_size=3))).read_all()
+
+        self.assertEqual(table.num_rows, 7)
+        self.assertEqual(table.column("value").to_pylist(), [sample[2] for sample in self.samples])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_arrow_endpoint(self):
+        r"""
+        Documentation here
+        """
+        import pyarrow, flask
+        from ..modules.tags.resources import tags
+        payload = {
+            "tags": ["PT-01"],
+            "greater_than_timestamp": "2024-01-01T00:00:00.000Z",
+            "less_than_timestamp": "2024-01-01T01:00:00.000Z",
+            "timezone": "America/Caracas",
+            "format": "arrow"
+        }
+
+        with flask.Flask(__name__).test_request_context(json=payload), mock.patch.object(tags.app, "iter_trends", return_value=iter(self.samples)) as iter_trends:
+            response = tags.ExportTrendsResource.post.__wrapped__(tags.ExportTrendsResource())
+            table = pyarrow.ipc.open_stream(b"".join(response.response)).read_all()
+
+        self.assertEqual(response.mimetype, export.FORMATS["arrow"])
+        self.assertEqual(iter_trends.call_args.args, ("2024-01-01 00:00:00.00", "2024-01-01 01:00:00.00", "America/Caracas", "PT-01"))
+        self.assertEqual(table.schema.field("timestamp").type.tz, "America/Caracas")
+        self.assertEqual(table.column("tag").to_pylist(), ["PT-01"] * 7)
+        self.assertEqual(table.column("value").to_pylist(), [sample[2] for sample in self.samples])
+
+
+class TestChangeLog(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.changes = ChangeLog(serializer=lambda item: dict(item))
+
+        return super().setUp()
+
+    def test_changes_since(self):
+        r"""
+        Documentation here
+        """
+        self.changes.touch("PT-01", {"id": "PT-01", "value": 1.0}, version=1)
+        self.changes.touch("PT-02", {"id": "PT-02", "value": 2.0}, version=2)
+        self.changes.touch("PT-01", {"id": "PT-01", "value": 3.0}, version=3)
+        self.changes.touch("PT-01", {"id": "PT-01", "value": 4.0}, version=4)
+
+        self.assertEqual(self.changes.changes_since(2), {"version": 4, "rows": [{"id": "PT-01", "value": 4.0}], "deleted": []})
+        self.assertEqual(self.changes.changes_since(4)["rows"], [])
+        self.assertEqual([row["id"] for row in self.changes.changes_since(1)["rows"]], ["PT-02", "PT-01"])
+
+    def test_snapshot_and_deletions(self):
+        r"""
+        Documentation here
+        """
+        self.changes.touch("PT-01", {"id": "PT-01"}, version=1)
+        self.changes.touch("PT-02", {"id": "PT-02"}, version=2)
+        self.changes.touch("PT-03", {"id": "PT-03"}, version=3)
+        self.changes.touch("PT-01", {"id": "PT-01"}, version=4)
+        self.changes.discard("PT-02", version=5)
+
+        # Snapshot in the order the rows were added, without the deleted ones
+        self.assertEqual(self.changes.changes_since(0), {"version": 5, "rows": [{"id": "PT-01"}, {"id": "PT-03"}], "deleted": []})
+        self.assertEqual(self.changes.changes_since(3), {"version": 5, "rows": [{"id": "PT-01"}], "deleted": ["PT-02"]})
+
+    def test_patch_table_data(self):
+        r"""
+        Documentation here
+        """
+        data = [{"id": "PT-01", "value": 1.0}, {"id": "PT-02", "value": 2.0}, {"id": "PT-03", "value": 3.0}]
+        changes = {"rows": [{"id": "PT-02", "value": 5.0}, {"id": "PT-04", "value": 4.0}], "deleted": ["PT-01", "PT-03"]}
+        operations = patch_table_data(data, changes).to_plotly_json()["operations"]
+
+        self.assertEqual(
+            [(operation["operation"], operation["location"]) for operation in operations],
+            [("Assign", [1]), ("Append", []), ("Delete", [2]), ("Delete", [0])]
+        )
+
+
+class TestDecimation(unittest.TestCase):
+
+    def test_min_max(self):
+        r"""
+        Documentation here
+        """
+        start = datetime(2024, 1, 1)
+        timestamps = [start + timedelta(seconds=counter) for counter in range(6)]
+        values = [1.0, 5.0, 3.0, 2.0, 0.0, 4.0]
+
+        self.assertEqual(min_max(timestamps, values, width=3), ([timestamps[0], timestamps[1], timestamps[4], timestamps[5]], [1.0, 5.0, 0.0, 4.0]))
+        self.assertEqual(min_max(timestamps, values, width=None), (timestamps, values))
+
+    def test_incremental(self):
+        r"""
+        Documentation here
+        """
+        timestamps = [counter * 0.5 for counter in range(40)]
+        values = [math.sin(counter) for counter in range(40)]
+        width = 2.0
+        # Appending the decimated new points gives the decimated series when the split is at a bucket boundary
+        head = min_max(timestamps[:16], values[:16], width=width)
+        tail = min_max(timestamps[16:], values[16:], width=width)
+
+        self.assertEqual((head[0] + tail[0], head[1] + tail[1]), min_max(timestamps, values, width=width))
+
+    def test_closed_buckets(self):
+        r"""
+        Documentation here
+        """
+        timestamps = list(range(100))
+        values = list(range(100))
+        width = 10
+        # Split inside the bucket 50-59, it's left out of the head and decimated once with the tail
+        closed = get_closed(timestamps[:56], width=width)
+        head = min_max(timestamps[:closed], values[:closed], width=width)
+        tail = min_max(timestamps[closed:], values[closed:], width=width)
+
+        self.assertEqual(closed, 50)
+        self.assertEqual(get_closed(timestamps, width=None), 100)
+        self.assertEqual(len(head[0] + tail[0]), 20)
+        self.assertEqual((head[0] + tail[0], head[1] + tail[1]), min_max(timestamps, values, width=width))
+
+    def test_bucket_width(self):
+        r"""
+        Documentation here
+        """
+        self.assertIsNone(get_bucket_width(window=60, points=600, budget=1000))
+        self.assertEqual(get_bucket_width(window=600, points=6000, budget=1000), 0.6)
+
@@ -29,6 +29,43 @@ def find_differences_between_lists(prev_list, curr_list):
     
     return differences
 
+def patch_table_data(data:list, changes:dict, key:str="id", row=None):
+    r"""
+    Dash *Patch* of a DataTable *data* with the changes since its version, only the changed rows are sent.
+
+    **Parameters**
+
+    * **data** (list): Rows the client has.
+    * **changes** (dict): {"rows": [rows], "deleted": [keys]}, see [UpdatesBroker.changes_since](./updates.py)
+    * **key** (str): Row identifier column.
+    * **row** (callable): Table row of a changed row.
+
+    **Returns**
+
+    * **Patch**: Changed rows set in place, new rows appended and deleted rows removed
+    """
+    from dash import Patch
+    patch = Patch()
+    indexes = {_row[key]: index for index, _row in enumerate(data or list())}
+
+    for changed in changes["rows"]:
+
+        changed = row(changed) if row else changed
+
+        if changed[key] in indexes:
+
+            patch[indexes[changed[key]]] = changed
+
+        else:
+
+            patch.append(changed)
+
+    for index in sorted((indexes[deleted] for deleted in changes["deleted"] if deleted in indexes), reverse=True):
+
+        del patch[index]
+
+    return patch
+
 def find_keys_values_by_unit(d, unit):
     r"""
     Documentation here
@@ -0,0 +1,130 @@
+r"""
+Decimation of time series for plotting.
+
+A trend can't show more points than the pixels it's drawn on, the series are decimated with min-max by time
+buckets: every bucket of *width* seconds keeps its lowest and highest values, in time order, so spikes are not
+lost. Buckets are aligned to the epoch, not to the first point, so decimating the new points of a series as they
+arrive gives the same points as decimating the whole series only when they are split at a bucket boundary: the
+newest bucket can still get points, a series extended as it arrives decimates only its closed buckets
+([get_closed](#get_closed)).
+"""
+from datetime import datetime
+
+
+def get_bucket_width(window:float, points:int, budget:int)->float|None:
+    r"""
+    Bucket width in seconds to draw *points* over *window* seconds in *budget* pixels, None if they fit.
+
+    **Parameters**
+
+    * **window** (float): Seconds of the series on the plot.
+    * **points** (int): Points of the series in the window.
+    * **budget** (int): Pixels (buckets) of the plot, every bucket keeps two points.
+    """
+    if points <= 2 * budget or not window:
+
+        return None
+
+    return window / budget
+
+def get_closed(timestamps:list, width:float|None)->int:
+    r"""
+    Number of points of a series in chronological order before its newest bucket, which is still open.
+
+    **Parameters**
+
+    * **timestamps** (list[datetime|float]): Point times, datetimes or seconds.
+    * **width** (float): Bucket width in seconds, None keeps every point.
+
+    Usage:
+
+    ```python
+    >>> get_closed([0, 1, 2, 3, 4], width=3)
+    3
+    ```
+    """
+    if not width:
+
+        return len(timestamps)
+
+    index = len(timestamps)
+    bucket = _get_seconds(timestamps[-1]) // width if timestamps else None
+
+    while index and _get_seconds(timestamps[index - 1]) // width == bucket:
+
+        index -= 1
+
+    return index
+
+def min_max(timestamps:list, values:list, width:float|None)->tuple[list, list]:
+    r"""
+    Min-max decimation of a series in chronological order.
+
+    **Parameters**
+
+    * **timestamps** (list[datetime|float]): Point times, datetimes or seconds.
+    * **values** (list): Point values.
+    * **width** (float): Bucket width in seconds, None keeps every point.
+
+    **Returns**
+
+    * **tuple**: (timestamps, values) decimated
+
+    Usage:
+
+    ```python
+    >>> min_max([0, 1, 2, 3, 4, 5], [1, 5, 3, 2, 0, 4], width=3)
+    ([0, 1, 4, 5], [1, 5, 0, 4])
+    ```
+    """
+    if not width or not values or isinstance(values[0], str):
+
+        return list(timestamps), list(values)
+
+    _timestamps = list()
+    _values = list()
+    bucket = None
+    low = high = None
+
+    for timestamp, value in zip(timestamps, values):
+
+        if value is None:
+
+            continue
+
+        _bucket = _get_seconds(timestamp) // width
+
+        if _bucket != bucket:
+
+            if bucket is not None:
+
+                _flush(_timestamps, _values, low, high)
+
+            bucket = _bucket
+            low = high = (timestamp, value)
+            continue
+
+        if value < low[1]:
+
+            low = (timestamp, value)
+
+        elif value > high[1]:
+
+            high = (timestamp, value)
+
+    if bucket is not None:
+
+        _flush(_timestamps, _values, low, high)
+
+    return _timestamps, _values
+
+def _get_seconds(timestamp:datetime|float)->float:
+
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else timestamp
+
+def _flush(timestamps:list, values:list, low:tuple, high:tuple):
+
+    for timestamp, value in sorted({low, high}, key=lambda point: point[0]):
+
+        timestamps.append(timestamp)
+        values.append(value)
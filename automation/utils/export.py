@@ -0,0 +1,87 @@
+r"""
+Streaming serializers for historian exports.
+
+Every serializer takes an iterable of (tag, timestamp, value) samples, as yielded by *DataLoggerEngine.iter_trends*,
+and yields the output in chunks of *chunk_size* samples, so it can be handed to a Flask response generator
+without building the whole export in memory.
+"""
+import io, csv, json
+from itertools import islice
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+
+def _chunks(samples, chunk_size:int):
+
+    samples = iter(samples)
+
+    while True:
+
+        chunk = list(islice(samples, chunk_size))
+
+        if not chunk:
+
+            return
+
+        yield chunk
+
+
+def to_ndjson(samples, chunk_size:int=5000):
+    r"""
+    Yields one JSON object per line: `{"tag": str, "timestamp": ISO 8601, "value": float}`
+    """
+    for chunk in _chunks(samples, chunk_size):
+
+        yield "".join(json.dumps({"tag": tag, "timestamp": timestamp.isoformat(), "value": value}) + "\n" for tag, timestamp, value in chunk)
+
+
+def to_csv(samples, chunk_size:int=5000):
+    r"""
+    Yields CSV with a `tag,timestamp,value` header, timestamps in ISO 8601
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(("tag", "timestamp", "value"))
+
+    for chunk in _chunks(samples, chunk_size):
+
+        writer.writerows((tag, timestamp.isoformat(), value) for tag, timestamp, value in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+
+        yield buffer.getvalue()
+
+
+def to_arrow(samples, chunk_size:int=5000, timezone:str="UTC"):
+    r"""
+    Yields an Arrow IPC stream, one record batch per chunk, schema `tag: string, timestamp: timestamp[ms, timezone], value: double`.
+
+    It requires *pyarrow*, ImportError is raised if it's not installed.
+    """
+    import pyarrow
+
+    schema = pyarrow.schema([
+        ("tag", pyarrow.string()),
+        ("timestamp", pyarrow.timestamp("ms", tz=timezone)),
+        ("value", pyarrow.float64())
+    ])
+    buffer = io.BytesIO()
+
+    with pyarrow.ipc.new_stream(buffer, schema) as writer:
+
+        for chunk in _chunks(samples, chunk_size):
+
+            tags, timestamps, values = zip(*chunk)
+            writer.write_batch(pyarrow.record_batch([list(tags), list(timestamps), list(values)], schema=schema))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
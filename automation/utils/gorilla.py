@@ -0,0 +1,203 @@
+r"""
+Gorilla compression for time series blocks (Pelkonen et al., "Gorilla: A Fast, Scalable, In-Memory Time Series Database").
+
+Timestamps (milliseconds) are stored as delta-of-delta with variable length prefixes and float values are
+XOR'ed with the previous value, keeping only the meaningful bits.
+"""
+import struct
+
+_DOUBLE = struct.Struct(">d")
+_UINT64 = struct.Struct(">Q")
+_HEADER = struct.Struct(">IqQ")
+
+# (prefix, prefix bits, value bits) for the delta of delta buckets
+_DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+class BitWriter:
+    r"""
+    Documentation here
+    """
+
+    def __init__(self):
+
+        self.value = 0
+        self.length = 0
+
+    def write(self, value:int, bits:int):
+
+        self.value = (self.value << bits) | (value & ((1 << bits) - 1))
+        self.length += bits
+
+    def to_bytes(self)->bytes:
+
+        padding = -self.length % 8
+
+        return (self.value << padding).to_bytes((self.length + padding) // 8, "big")
+
+
+class BitReader:
+    r"""
+    Documentation here
+    """
+
+    def __init__(self, data:bytes):
+
+        self.value = int.from_bytes(data, "big")
+        self.remaining = len(data) * 8
+
+    def read(self, bits:int)->int:
+
+        self.remaining -= bits
+
+        return (self.value >> self.remaining) & ((1 << bits) - 1)
+
+
+def _float_to_bits(value:float)->int:
+
+    return _UINT64.unpack(_DOUBLE.pack(value))[0]
+
+
+def _bits_to_float(value:int)->float:
+
+    return _DOUBLE.unpack(_UINT64.pack(value))[0]
+
+
+def _signed(value:int, bits:int)->int:
+
+    return value - (1 << bits) if value >= 1 << (bits - 1) else value
+
+
+def encode(timestamps:list[int], values:list[float])->bytes:
+    r"""
+    Encodes a block of samples.
+
+    **Parameters**
+
+    * **timestamps** (list[int]): Increasing timestamps in milliseconds.
+    * **values** (list[float]): Sample values.
+
+    **Returns**
+
+    * **bytes**: header (count, first timestamp, first value) + bit stream.
+    """
+    count = len(timestamps)
+
+    if not count:
+
+        return _HEADER.pack(0, 0, 0)
+
+    header = _HEADER.pack(count, timestamps[0], _float_to_bits(values[0]))
+    writer = BitWriter()
+    previous_timestamp = timestamps[0]
+    previous_delta = 0
+    previous_value = _float_to_bits(values[0])
+    previous_leading, previous_trailing = 65, 0
+
+    for timestamp, value in zip(timestamps[1:], values[1:]):
+
+        # Timestamp, delta of delta
+        delta = timestamp - previous_timestamp
+        dod = delta - previous_delta
+        previous_timestamp, previous_delta = timestamp, delta
+
+        if dod == 0:
+
+            writer.write(0, 1)
+
+        else:
+
+            for prefix, prefix_bits, bits in _DOD_BUCKETS:
+
+                if -(1 << (bits - 1)) <= dod < 1 << (bits - 1):
+
+                    writer.write(prefix, prefix_bits)
+                    writer.write(dod, bits)
+                    break
+
+            else:
+
+                writer.write(0b1111, 4)
+                writer.write(dod, 64)
+
+        # Value, XOR with the previous one
+        value = _float_to_bits(value)
+        xor = value ^ previous_value
+        previous_value = value
+
+        if xor == 0:
+
+            writer.write(0, 1)
+            continue
+
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+
+        if leading >= previous_leading and trailing >= previous_trailing:
+
+            writer.write(0b10, 2)
+            writer.write(xor >> previous_trailing, 64 - previous_leading - previous_trailing)
+
+        else:
+
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful - 1, 6)
+            writer.write(xor >> trailing, meaningful)
+            previous_leading, previous_trailing = leading, trailing
+
+    return header + writer.to_bytes()
+
+
+def decode(data:bytes)->tuple[list[int], list[float]]:
+    r"""
+    Decodes a block encoded by *encode*.
+
+    **Returns**
+
+    * **tuple**: (timestamps, values)
+    """
+    count, timestamp, value = _HEADER.unpack_from(data)
+
+    if not count:
+
+        return [], []
+
+    timestamps = [timestamp]
+    values = [_bits_to_float(value)]
+    reader = BitReader(data[_HEADER.size:])
+    delta = 0
+    leading, trailing = 0, 0
+
+    for _ in range(count - 1):
+
+        if reader.read(1):
+
+            for _, _, bits in _DOD_BUCKETS:
+
+                if not reader.read(1):
+
+                    delta += _signed(reader.read(bits), bits)
+                    break
+
+            else:
+
+                delta += _signed(reader.read(64), 64)
+
+        timestamp += delta
+        timestamps.append(timestamp)
+
+        if reader.read(1):
+
+            if reader.read(1):
+
+                leading = reader.read(5)
+                meaningful = reader.read(6) + 1
+                trailing = 64 - leading - meaningful
+
+            value ^= reader.read(64 - leading - trailing) << trailing
+
+        values.append(_bits_to_float(value))
+
+    return timestamps, values
@@ -0,0 +1,185 @@
+r"""
+Hashed timer wheel (Varghese & Lauck, "Hashed and Hierarchical Timing Wheels").
+
+Timers are kept in a ring of *slots* buckets, a timer due in tick *t* is in the bucket *t % slots*, so scheduling
+and cancelling are O(1) and every tick only looks at one bucket. One thread drives all the timers.
+"""
+import logging, math, threading, time
+
+
+class TimerWheel:
+    r"""
+    Runs callbacks after a delay from a single thread, started on the first scheduled timer.
+
+    Timers are identified by a hashable *key*, scheduling a key again replaces its timer. Callbacks run in
+    the wheel thread, they must be short.
+
+    A stopped wheel keeps its timers and starts a new thread with [start](#start) or the next scheduled timer,
+    the timers due while it was stopped fire then.
+
+    **Parameters**
+
+    * **name** (str): Thread name.
+    * **tick** (float): Resolution in seconds, a timer fires at most one tick late.
+    * **slots** (int): Buckets in the wheel.
+    """
+
+    def __init__(self, name:str="TimerWheel", tick:float=0.1, slots:int=512):
+        r"""
+        Documentation here
+        """
+        self.name = name
+        self._tick = tick
+        self._wheel = [dict() for _ in range(slots)]
+        self._timers = dict()
+        self._ticks = 0
+        self._origin = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def schedule(self, key, delay:float, callback, *args):
+        r"""
+        Runs *callback(\*args)* in *delay* seconds.
+
+        **Parameters**
+
+        * **key** (hashable): Timer identifier.
+        * **delay** (float): Seconds.
+        * **callback** (callable)
+        """
+        with self._lock:
+
+            self.__cancel(key)
+            due = max(self.__now(), self._ticks) + max(1, math.ceil(delay / self._tick))
+            self._wheel[due % len(self._wheel)][key] = due, callback, args
+            self._timers[key] = due
+            self.__start()
+
+    def cancel(self, key)->bool:
+        r"""
+        Cancels the timer *key*, returns False if it was not scheduled.
+        """
+        with self._lock:
+
+            return self.__cancel(key)
+
+    def is_scheduled(self, key)->bool:
+        r"""
+        Documentation here
+        """
+        return key in self._timers
+
+    def is_alive(self)->bool:
+        r"""
+        Whether the wheel thread is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def __len__(self):
+
+        return len(self._timers)
+
+    def advance(self)->int:
+        r"""
+        Fires the timers due until now, returns the number of callbacks run.
+        """
+        due = list()
+
+        with self._lock:
+
+            now = self.__now()
+
+            if now - self._ticks >= len(self._wheel):
+
+                # Stopped for more than a turn, every bucket may have due timers
+                self._ticks = now
+                buckets = self._wheel
+
+            else:
+
+                buckets = list()
+
+                while self._ticks < now:
+
+                    self._ticks += 1
+                    buckets.append(self._wheel[self._ticks % len(self._wheel)])
+
+            for bucket in buckets:
+
+                for key in [key for key, (tick, _, _) in bucket.items() if tick <= self._ticks]:
+
+                    tick, callback, args = bucket.pop(key)
+                    self._timers.pop(key, None)
+                    due.append((tick, callback, args))
+
+        due.sort(key=lambda timer: timer[0])
+
+        for _, callback, args in due:
+
+            try:
+
+                callback(*args)
+
+            except Exception as err:
+
+                logging.error(f"{self.name}: timer callback {callback} failed: {err}")
+
+        return len(due)
+
+    def start(self):
+        r"""
+        Starts the wheel thread if it's not running
+        """
+        with self._lock:
+
+            self.__start()
+
+    def run(self, stop_event:threading.Event):
+        r"""
+        Documentation here
+        """
+        while not stop_event.is_set():
+
+            stop_event.wait(self._tick)
+            self.advance()
+
+    def stop(self):
+        r"""
+        Stops the wheel thread, pending timers are kept until it starts again.
+        """
+        with self._lock:
+
+            thread = self._thread
+            self._stop_event.set()
+            self._thread = None
+
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+
+            thread.join(timeout=self._tick * 4)
+
+    def __start(self):
+
+        if self.is_alive():
+
+            return
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self.run, args=(self._stop_event, ), name=self.name, daemon=True)
+        self._thread.start()
+
+    def __now(self)->int:
+
+        return int((time.monotonic() - self._origin) / self._tick)
+
+    def __cancel(self, key)->bool:
+
+        due = self._timers.pop(key, None)
+
+        if due is None:
+
+            return False
+
+        self._wheel[due % len(self._wheel)].pop(key, None)
+
+        return True
@@ -0,0 +1,28 @@
+r"""
+Transition lookup tables for state machines.
+
+The tables are built once per state machine class, when the class is defined, so finding the transition
+between two states, or the transitions allowed from a state, is a dict lookup instead of a scan of every
+transition of the machine.
+"""
+from statemachine.factory import StateMachineMetaclass
+
+
+class TransitionTableMeta(StateMachineMetaclass):
+    r"""
+    State machine metaclass, on top of the *python-statemachine* class setup it adds:
+
+    * **_transition_table** (dict): {(source state name, target state name): event name}
+    * **_state_transitions** (dict): {state id: tuple of the transitions from that state}
+
+    Subclasses get their own tables, their states and transitions included.
+    """
+
+    def __init__(cls, name:str, bases:tuple, attrs:dict, **kwargs):
+
+        super().__init__(name, bases, attrs, **kwargs)
+        transitions = tuple(transition for state in cls.states for transition in state.transitions)
+        cls._transition_table = {(transition.source.name, transition.target.name): transition.event for transition in transitions}
+        cls._state_transitions = {
+            state.id: tuple(transition for transition in transitions if transition.source.id == state.id) for state in cls.states
+        }
@@ -0,0 +1,214 @@
+r"""
+Versioned change logs for pushing updates to the UI.
+
+Every change of a tag, alarm or machine takes the next version of a global counter, a client that saw
+version *n* asks for the changes since *n* and gets only the rows changed after it (the last state of each
+row, not every intermediate change) and the keys deleted after it.
+"""
+import threading
+from collections import OrderedDict
+from ..singleton import Singleton
+
+
+class ChangeLog:
+    r"""
+    Last change of every row of a channel, ordered by version.
+
+    Rows are kept by reference and serialized on the first read after a change, so a tag updated many times
+    between two reads is serialized once. Deleted rows leave a tombstone, so clients behind the deletion drop them.
+
+    **Parameters**
+
+    * **serializer** (callable): Row of an item, *item.serialize()* by default.
+    """
+
+    def __init__(self, serializer=None):
+        r"""
+        Documentation here
+        """
+        self._serializer = serializer or (lambda item: item.serialize())
+        self._items = dict()
+        self._changes = OrderedDict()
+        self.version = 0
+
+    def touch(self, key, item, version:int):
+        r"""
+        Records a change of *item* (added or updated) in *version*
+        """
+        self._items[key] = item
+        self._changes.pop(key, None)
+        self._changes[key] = [version, item, None]
+        self.version = version
+
+    def discard(self, key, version:int):
+        r"""
+        Records the deletion of *key* in *version*
+        """
+        self._items.pop(key, None)
+        self._changes.pop(key, None)
+        self._changes[key] = [version, None, None]
+        self.version = version
+
+    def get_version(self, key=None)->int:
+        r"""
+        Version of the last change of *key* (0 if it never changed), or of the last change of the channel
+        """
+        if key is None:
+
+            return self.version
+
+        change = self._changes.get(key)
+
+        return change[0] if change else 0
+
+    def changes_since(self, version:int=0)->dict:
+        r"""
+        Rows changed after *version*.
+
+        A client without version (*version=0*) gets every row, in the order they were added.
+
+        **Returns**
+
+        * **dict**: {"version": last version, "rows": [rows], "deleted": [keys]}
+        """
+        rows = list()
+        deleted = list()
+
+        if not version:
+
+            rows = [self.__row(self._changes[key]) for key in self._items]
+
+            return {"version": self.version, "rows": rows, "deleted": deleted}
+
+        for key in reversed(self._changes):
+
+            change = self._changes[key]
+
+            if change[0] <= version:
+
+                break
+
+            if change[1] is None:
+
+                deleted.append(key)
+
+            else:
+
+                rows.append(self.__row(change))
+
+        rows.reverse()
+        deleted.reverse()
+
+        return {"version": self.version, "rows": rows, "deleted": deleted}
+
+    def __row(self, change:list)->dict:
+
+        if change[2] is None:
+
+            change[2] = self._serializer(change[1])
+
+        return change[2]
+
+
+class UpdatesBroker(Singleton):
+    r"""
+    Publishes the changes of the CVT, the alarms and the machines to the UI clients.
+
+    Publishers record a change with [publish](#publish) (or [delete](#delete)), the UI server stream waits for
+    a version newer than the last one its client got with [wait](#wait) and sends
+    [changes_since](#changes_since) that version, so every client gets the rows changed since its own
+    version whatever the number of clients or how long they were away.
+
+    Usage:
+
+    ```python
+    >>> broker = UpdatesBroker()
+    >>> broker.publish("tags", tag.id, tag)
+    >>> broker.changes_since("tags", version=0)
+    {'version': 1, 'rows': [{'id': ..., 'value': 0.0, ...}], 'deleted': []}
+    ```
+    """
+
+    def __init__(self):
+        r"""
+        Documentation here
+        """
+        self._channels = dict()
+        self._version = 0
+        self._condition = threading.Condition()
+
+    def publish(self, channel:str, key, item)->int:
+        r"""
+        Records a change of *item* in *channel*
+
+        **Parameters**
+
+        * **channel** (str): "tags", "alarms", "machines"
+        * **key** (hashable): Row identifier.
+        * **item**: Object whose row changed.
+
+        **Returns**
+
+        * **int**: Change version
+        """
+        with self._condition:
+
+            self._version += 1
+            self.__channel(channel).touch(key, item, self._version)
+            self._condition.notify_all()
+
+            return self._version
+
+    def delete(self, channel:str, key)->int:
+        r"""
+        Records the deletion of *key* in *channel*
+        """
+        with self._condition:
+
+            self._version += 1
+            self.__channel(channel).discard(key, self._version)
+            self._condition.notify_all()
+
+            return self._version
+
+    def get_version(self, channel:str=None, key=None)->int:
+        r"""
+        Last version, or the version of the last change of *key* in *channel*
+        """
+        if channel is None:
+
+            return self._version
+
+        with self._condition:
+
+            return self.__channel(channel).get_version(key)
+
+    def changes_since(self, channel:str, version:int=0)->dict:
+        r"""
+        Rows of *channel* changed after *version*, see [ChangeLog.changes_since](#ChangeLog.changes_since)
+        """
+        with self._condition:
+
+            return self.__channel(channel).changes_since(version)
+
+    def wait(self, version:int, timeout:float=None)->int:
+        r"""
+        Blocks until there is a change after *version* or *timeout* seconds passed.
+
+        **Returns**
+
+        * **int**: Last version
+        """
+        with self._condition:
+
+            self._condition.wait_for(lambda: self._version > version, timeout=timeout)
+
+            return self._version
+
+    def __channel(self, channel:str)->ChangeLog:
+
+        if channel not in self._channels:
+
+            self._channels[channel] = ChangeLog()
+
+        return self._channels[channel]
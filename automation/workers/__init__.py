@@ -1,3 +1,5 @@
 from .state_machine import StateMachineWorker, AsyncStateMachineWorker
 from .logger import LoggerWorker
-from .alarms import AlarmWorker
\ No newline at end of file
+from .archiver import ArchiverWorker
+from .alarms import AlarmWorker
+from .opcua import OPCUAClientWorker
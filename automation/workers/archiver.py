@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""automation/workers/archiver.py
+
+This module implements the Archiver Worker.
+"""
+import logging
+from .worker import BaseWorker
+from ..logger.datalogger import DataLoggerEngine
+
+
+class ArchiverWorker(BaseWorker):
+    r"""
+    Moves the historian rows older than the archive days into the Parquet archive every *period* seconds.
+    """
+
+    def __init__(self, period:float=3600.0):
+
+        super(ArchiverWorker, self).__init__()
+        
+        self._period = period
+        self.logger = DataLoggerEngine()
+
+    def run(self):
+        r"""
+        Documentation here
+        """
+        while True:
+
+            archived = self.logger.archive()
+
+            if archived:
+
+                logging.info(f"Archiver worker: {archived} tag values archived")
+
+            if self.stop_event.wait(self._period):
+                
+                logging.info("Archiver worker shutdown successfully!")
+                break
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""automation/workers/opcua.py
+
+This module implements OPC UA Client Worker.
+"""
+import logging, time
+from .worker import BaseWorker
+from ..managers import OPCUAClientManager
+
+
+class OPCUAClientWorker(BaseWorker):
+    r"""
+    Supervises the OPC UA clients connections, see OPCUAClientManager.supervise
+    """
+
+    def __init__(self, manager:OPCUAClientManager, period:float=1.0):
+
+        super(OPCUAClientWorker, self).__init__()
+        
+        self._manager = manager
+        self._period = period
+
+    def run(self):
+        r"""
+        Documentation here
+        """
+        while True:
+
+            time.sleep(self._period)
+
+            try:
+
+                self._manager.supervise()
+
+            except Exception as err:
+
+                logging.error(f"OPC UA client supervision error: {err}")
+
+            if self.stop_event.is_set():
+                
+                logging.info("OPC UA client worker shutdown successfully!")
+                break
@@ -5,10 +5,65 @@ This module implements State Machine Worker.
 """
 import heapq
 import logging
+import multiprocessing
 import time
 from collections import deque
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Thread, Condition, Lock, Event
 from .worker import BaseWorker
+from ..models import StringType, IntegerType, FloatType, BooleanType, ProcessType
+from ..tags.cvt import CVTEngine
+
+
+class MachineMetrics():
+    r"""
+    Execution metrics of a state machine loop.
+
+    * **runs**: Number of executed loops.
+    * **last_jitter** / **max_jitter** / **mean_jitter**: Seconds between the loop deadline and its actual start.
+    * **last_duration** / **max_duration**: Seconds spent inside the loop.
+    * **overruns**: Loops that took longer than the machine interval.
+    * **deadline_misses**: Deadlines that passed before the machine could run again.
+    """
+
+    def __init__(self):
+
+        self.runs = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.overruns = 0
+        self.deadline_misses = 0
+
+    def update(self, jitter:float, duration:float, interval:float, missed:int=0):
+
+        self.runs += 1
+        self.last_jitter = jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.total_jitter += jitter
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.deadline_misses += missed
+
+        if duration > interval:
+
+            self.overruns += 1
+
+    def serialize(self)->dict:
+
+        return {
+            "runs": self.runs,
+            "last_jitter": self.last_jitter,
+            "max_jitter": self.max_jitter,
+            "mean_jitter": self.total_jitter / self.runs if self.runs else 0.0,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "overruns": self.overruns,
+            "deadline_misses": self.deadline_misses
+        }
 
 
 class MachineScheduler():
@@ -20,10 +75,11 @@ class MachineScheduler():
         self._sequence = 0
         self.last = None
         self._stop = False
+        self._metrics = dict()
 
     def call_soon(self, func):
         
-        self._ready.append(func)
+        self._ready.append((func, None, 0.0, 0))
 
     def call_later(self, delay, func, machine):
         self._sequence += 1
@@ -45,20 +101,38 @@ class MachineScheduler():
 
             if not self._ready and self._sleeping:
                 deadline, _, func, machine = heapq.heappop(self._sleeping)
-                self.sleep_elapsed(machine)
+                jitter, missed = self.sleep_elapsed(machine)
                 
-                self._ready.append(func)
+                self._ready.append((func, machine, jitter, missed))
 
             while self._ready:
-                func = self._ready.popleft()
+                func, machine, jitter, missed = self._ready.popleft()
+                start = time.time()
                 func()
 
+                if machine:
+
+                    self.get_metrics(machine).update(jitter=jitter, duration=time.time() - start, interval=machine.get_interval(), missed=missed)
+
     def set_last(self):
 
         self.last = time.time()
 
         return self.last
 
+    def get_metrics(self, machine)->MachineMetrics:
+
+        name = machine.name.value
+        if name not in self._metrics:
+
+            self._metrics[name] = MachineMetrics()
+
+        return self._metrics[name]
+
+    def serialize_metrics(self)->dict:
+
+        return {name: metrics.serialize() for name, metrics in self._metrics.items()}
+
     def sleep_elapsed(self, machine):
         elapsed = time.time() - self.last
         interval = machine.get_interval()
@@ -66,10 +140,14 @@ class MachineScheduler():
         try:
             time.sleep(interval - elapsed)
             self.set_last()
+            
+            return 0.0, 0
         except ValueError:
             self.set_last()
             logging.warning(f"State Machine: {machine.name.value} NOT executed on time - Execution Interval: {interval} - Elapsed: {elapsed}")
 
+            return elapsed - interval, int(elapsed // interval) if interval else 0
+
 
 class SchedThread(Thread):
 
@@ -136,6 +214,17 @@ class AsyncStateMachineWorker(BaseWorker):
         sched.daemon = True
         sched.start()
 
+    def serialize_metrics(self)->dict:
+
+        metrics = dict()
+        for sched in self._schedulers:
+
+            if hasattr(sched, "scheduler"):
+
+                metrics.update(sched.scheduler.serialize_metrics())
+
+        return metrics
+
     def stop(self):
 
         for sched in self._schedulers:
@@ -146,15 +235,432 @@ class AsyncStateMachineWorker(BaseWorker):
                 logging.error(f"{message} - {e}")
     
 
+class SharedMachineScheduler(Thread):
+    r"""
+    Runs the loops of many state machines from a single timer thread and a small pool of worker threads,
+    instead of one [SchedThread](#SchedThread) per machine.
+
+    Pending loops are kept in a heap ordered by deadline, when a deadline is reached the loop is submitted to
+    the pool and the next deadline is scheduled once it finishes, so a machine never runs concurrently with itself.
+    Deadlines are fixed rate (deadline + interval), if a loop finishes after one or more deadlines they're counted
+    as deadline misses and skipped.
+
+    **Parameters**
+
+    * **max_workers** (int): Size of the worker pool.
+    """
+
+    def __init__(self, max_workers:int=4):
+
+        super(SharedMachineScheduler, self).__init__(name="SharedMachineScheduler", daemon=True)
+        self._heap = list()
+        self._sequence = 0
+        self._metrics = dict()
+        self._condition = Condition()
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SharedMachine")
+
+    def add_machine(self, machine, deadline:float=None):
+
+        if deadline is None:
+
+            deadline = time.monotonic()
+
+        with self._condition:
+
+            if machine.name.value not in self._metrics:
+
+                self._metrics[machine.name.value] = MachineMetrics()
+
+            self._sequence += 1
+            heapq.heappush(self._heap, (deadline, self._sequence, machine))
+            self._condition.notify()
+
+    def get_metrics(self, machine)->MachineMetrics:
+
+        return self._metrics.get(machine.name.value)
+
+    def serialize_metrics(self)->dict:
+
+        return {name: metrics.serialize() for name, metrics in self._metrics.items()}
+
+    def stop(self):
+
+        with self._condition:
+
+            self._stopped = True
+            self._condition.notify()
+
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self):
+
+        while True:
+
+            with self._condition:
+
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.monotonic()):
+
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout=timeout)
+
+                if self._stopped:
+
+                    return
+
+                deadline, _, machine = heapq.heappop(self._heap)
+
+            try:
+
+                self._pool.submit(self.execute, machine, deadline)
+
+            except RuntimeError:
+
+                return
+
+    def execute(self, machine, deadline:float):
+
+        start = time.monotonic()
+
+        try:
+
+            machine.loop()
+
+        except Exception as e:
+
+            logging.error(f"State Machine: {machine.name.value} - {e}")
+
+        end = time.monotonic()
+        interval = machine.get_interval()
+        missed = int((end - deadline) // interval) if interval > 0 else 0
+        self._metrics[machine.name.value].update(jitter=start - deadline, duration=end - start, interval=interval, missed=missed)
+
+        if missed:
+
+            logging.warning(f"State Machine: {machine.name.value} NOT executed on time - Execution Interval: {interval} - Missed: {missed}")
+
+        if not self._stopped:
+
+            self.add_machine(machine, deadline=deadline + (missed + 1) * interval)
+
+
+class ProcessUpdates():
+    r"""
+    Publisher of a machine running in a worker process, its changes go back to the parent process with the loop
+    results and are published there.
+    """
+
+    def publish(self, channel:str, key, item):
+
+        return None
+
+
+class ProcessMachineRunner(Thread):
+    r"""
+    Runs the loops of a state machine in a worker process, so a CPU heavy machine doesn't hold the GIL of the
+    DAQ, alarms and logger workers.
+
+    The process is forked with a copy of the machine and talks to the parent through a pipe. The machine in the
+    parent keeps working as a proxy: the values of its subscribed tags ([notify](../state_machine.py#notify)),
+    [put_attr](../state_machine.py#put_attr) and [transition](../state_machine.py#transition) are applied to it
+    and sent to the process, which applies them from a receiver thread as the machine thread would. After every
+    loop the process sends back the state and the model attributes that changed, they're set on the proxy (so the
+    UI and the API see them) and the writable process variables, the machine outputs, are written to the CVT.
+
+    The process inherits the database connections and writer threads of the parent, so it doesn't use them:
+    [put_attr](../state_machine.py#put_attr) and [transition](../state_machine.py#transition) called in the
+    process are sent back and run by the proxy, which logs them and sends the result to the process.
+
+    Tags subscribed after the process started are not sent to it.
+
+    **Parameters**
+
+    * **machine** (StateMachineCore): Machine to run.
+    """
+
+    def __init__(self, machine):
+
+        super(ProcessMachineRunner, self).__init__(name=f"ProcessMachine-{machine.name.value}", daemon=True)
+        self.machine = machine
+        self._context = multiprocessing.get_context("fork")
+        self._connection, self._child_connection = self._context.Pipe()
+        self._lock = Lock()
+        self._process = None
+        self._stopped = Event()
+        self._metrics = MachineMetrics()
+        self.cvt = CVTEngine()
+
+    def send(self, action:str, *args):
+        r"""
+        Sends *action* with *args* to the machine process
+        """
+        with self._lock:
+
+            try:
+
+                self._connection.send((action, args))
+
+            except (OSError, ValueError) as e:
+
+                logging.warning(f"State Machine: {self.machine.name.value} - process not reachable: {e}")
+
+    def get_metrics(self)->MachineMetrics:
+
+        return self._metrics
+
+    def serialize_metrics(self)->dict:
+
+        return {self.machine.name.value: self._metrics.serialize()}
+
+    def is_process_alive(self)->bool:
+
+        return self._process is not None and self._process.is_alive()
+
+    def stop(self):
+
+        self._stopped.set()
+        self.send("stop")
+
+        if self._process is not None:
+
+            self._process.join(timeout=1.0)
+
+            if self._process.is_alive():
+
+                self._process.terminate()
+
+    def run(self):
+
+        self.machine.process = self
+        self._process = self._context.Process(target=self.serve, name=self.name, daemon=True)
+        self._process.start()
+        self._child_connection.close()
+
+        while True:
+
+            try:
+
+                action, args = self._connection.recv()
+
+            except (EOFError, OSError):
+
+                break
+
+            if action=="loop":
+
+                self.apply(*args)
+
+            elif action=="call":
+
+                self.call(*args)
+
+        self.machine.process = None
+
+        if not self._stopped.is_set():
+
+            logging.error(f"State Machine: {self.machine.name.value} - process exited with code {self._process.exitcode}")
+
+    def apply(self, changes:dict, jitter:float, duration:float, missed:int):
+        r"""
+        Sets the changes of a loop of the process on the machine, the outputs are written to the CVT
+        """
+        machine = self.machine
+
+        for name, value in changes.items():
+
+            if name=="state":
+
+                machine.current_state_value = value
+                continue
+
+            attr = getattr(machine, name, None)
+
+            if attr is None:
+
+                continue
+
+            attr.value = value
+
+            if isinstance(attr, ProcessType) and attr.tag:
+
+                self.write(attr.tag, value)
+
+        if changes:
+
+            machine.updates.publish("machines", machine.name.value, machine)
+
+        interval = machine.get_interval()
+        self._metrics.update(jitter=jitter, duration=duration, interval=interval, missed=missed)
+
+        if missed:
+
+            logging.warning(f"State Machine: {machine.name.value} NOT executed on time - Execution Interval: {interval} - Missed: {missed}")
+
+    def call(self, method:str, args:tuple, kwargs:dict):
+        r"""
+        Runs on the proxy a *method* called in the machine process
+        """
+        try:
+
+            getattr(self.machine, method)(*args, **kwargs)
+
+        except Exception as e:
+
+            logging.error(f"State Machine: {self.machine.name.value} - {method}: {e}")
+
+    def write(self, tag, value):
+        r"""
+        Writes an output of the machine, in the tag display unit, to the CVT
+        """
+        if tag.get_unit()!=tag.get_display_unit():
+
+            value = type(tag.value)(value=value, unit=tag.get_display_unit()).convert(to_unit=tag.get_unit())
+
+        self.cvt.set_value(id=tag.id, value=value, timestamp=datetime.now())
+
+    # Worker process
+    def serve(self):
+        r"""
+        Machine loop in the worker process, at fixed rate like [SharedMachineScheduler](#SharedMachineScheduler)
+        """
+        self._connection.close()
+        self._lock = Lock()
+        machine = self.machine
+        machine.process = None
+        machine.updates = ProcessUpdates()
+        machine.put_attr = self.remote("put_attr")
+        machine.transition = self.remote("transition")
+        receiver = Thread(target=self.receive, args=(machine, ), name="ProcessMachineReceiver", daemon=True)
+        receiver.start()
+        sent = dict()
+        deadline = time.monotonic()
+
+        while not self._stopped.wait(timeout=max(deadline - time.monotonic(), 0.0)):
+
+            start = time.monotonic()
+
+            try:
+
+                machine.loop()
+
+            except Exception as e:
+
+                logging.error(f"State Machine: {machine.name.value} - {e}")
+
+            end = time.monotonic()
+            interval = machine.get_interval()
+            missed = int((end - deadline) // interval) if interval > 0 else 0
+
+            try:
+
+                with self._lock:
+
+                    self._child_connection.send(("loop", (self.get_changes(machine, sent), start - deadline, end - start, missed)))
+
+            except (OSError, ValueError):
+
+                break
+
+            deadline += (missed + 1) * interval
+
+    def remote(self, method:str):
+        r"""
+        Replaces *method* of the machine in the worker process by a call sent to the proxy
+        """
+        def call(*args, **kwargs):
+
+            with self._lock:
+
+                self._child_connection.send(("call", (method, args, kwargs)))
+
+        return call
+
+    def receive(self, machine):
+        r"""
+        Applies the messages of the parent process to the machine in the worker process
+        """
+        while True:
+
+            try:
+
+                action, args = self._child_connection.recv()
+
+            except (EOFError, OSError):
+
+                break
+
+            if action=="stop":
+
+                break
+
+            try:
+
+                if action=="notify":
+
+                    tag, value, timestamp = args
+                    machine.notify(tag=tag, value=value, timestamp=timestamp)
+
+                elif action=="put_attr":
+
+                    attr_name, value = args
+                    getattr(machine, attr_name).set_value(value=value, name=attr_name)
+
+                elif action=="transition":
+
+                    to, = args
+                    event = machine._transition_table.get((machine.current_state.name, to))
+
+                    if event:
+
+                        machine.send(event)
+
+            except Exception as e:
+
+                logging.error(f"State Machine: {machine.name.value} - {action}: {e}")
+
+        self._stopped.set()
+
+    def get_changes(self, machine, sent:dict)->dict:
+        r"""
+        State and model attributes of the machine that changed since they were last sent, the read only process
+        variables come from the parent
+        """
+        changes = dict()
+        current = {"state": machine.current_state.value}
+
+        for key, value in machine.__dict__.items():
+
+            if isinstance(value, ProcessType):
+
+                if not value.read_only:
+
+                    current[key] = value.value
+
+            elif isinstance(value, (StringType, FloatType, IntegerType, BooleanType)):
+
+                current[key] = value.value
+
+        for key, value in current.items():
+
+            if key not in sent or sent[key]!=value:
+
+                changes[key] = value
+                sent[key] = value
+
+        return changes
+
+
 class StateMachineWorker(BaseWorker):
 
-    def __init__(self, manager):
+    def __init__(self, manager, max_workers:int=4):
 
         super(StateMachineWorker, self).__init__()
         
         self._manager = manager
         self._sync_scheduler = MachineScheduler()
         self._async_scheduler = AsyncStateMachineWorker()
+        self._shared_scheduler = SharedMachineScheduler(max_workers=max_workers)
+        self._process_runners = list()
         self.jobs = list()
 
     def loop_closure(self, machine):
@@ -177,16 +683,62 @@ class StateMachineWorker(BaseWorker):
                 self._async_scheduler.add_machine(machine)
                 # self._async_scheduler.run()
                 
+            elif mode == "shared":
+
+                self._shared_scheduler.add_machine(machine)
+
+            elif mode == "process":
+
+                self._process_runners.append(ProcessMachineRunner(machine))
                 
             else:
                 func = self.loop_closure(machine)
                 self._sync_scheduler.call_soon(func)
 
         self._async_scheduler.run()
+        self._shared_scheduler.start()
+
+        for runner in self._process_runners:
+
+            runner.start()
+
         self._sync_scheduler.run()
-        
+
+    def join(self, machine, mode:str="async"):
+
+        if mode == "shared":
+
+            self._shared_scheduler.add_machine(machine)
+
+        elif mode == "process":
+
+            runner = ProcessMachineRunner(machine)
+            self._process_runners.append(runner)
+            runner.start()
+
+        else:
+
+            self._async_scheduler.join(machine)
+
+    def get_metrics(self)->dict:
+
+        metrics = self._sync_scheduler.serialize_metrics()
+        metrics.update(self._async_scheduler.serialize_metrics())
+        metrics.update(self._shared_scheduler.serialize_metrics())
+
+        for runner in self._process_runners:
+
+            metrics.update(runner.serialize_metrics())
+
+        return metrics
 
     def stop(self):
         self._async_scheduler.stop()
+        self._shared_scheduler.stop()
+
+        for runner in self._process_runners:
+
+            runner.stop()
+
         self._sync_scheduler.stop()
     
\ No newline at end of file
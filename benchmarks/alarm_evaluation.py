@@ -0,0 +1,96 @@
+r"""
+Compares the alarm evaluation of a CVT scan: every alarm notified by its own tag observer ('per alarm',
+Alarm.notify) against one batched pass of the AlarmEvaluationEngine ('batch').
+
+Each tag has four alarms (HIGH-HIGH, HIGH, LOW, LOW-LOW), every scan sets a new value on every tag and a
+fraction of the values cross a threshold. It reports the alarm evaluations per second.
+
+Run it from the repository root:
+
+```
+python -m benchmarks.alarm_evaluation --alarms 50000 --scans 20
+python -m benchmarks.alarm_evaluation --crossings 0.01
+```
+"""
+import argparse, time, random
+from datetime import datetime
+from automation.alarms import Alarm
+from automation.alarms.evaluation import AlarmEvaluationEngine
+from automation.tags.cvt import CVTEngine
+from automation.models import StringType, FloatType
+
+SETPOINTS = (("HIGH-HIGH", 90.0), ("HIGH", 80.0), ("LOW", 20.0), ("LOW-LOW", 10.0))
+
+
+def scans(names:list, scans:int, crossings:float):
+
+    random.seed(0)
+    result = list()
+
+    for _ in range(scans):
+
+        result.append([(name, random.uniform(0, 100) if random.random() < crossings else random.uniform(30, 70)) for name in names])
+
+    return result
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alarms", type=int, default=50000)
+    parser.add_argument("--scans", type=int, default=20)
+    parser.add_argument("--crossings", type=float, default=0.001, help="Fraction of the values out of the normal band")
+    args = parser.parse_args()
+
+    cvt = CVTEngine()
+    evaluation = AlarmEvaluationEngine()
+    names = [f"bench_tag_{counter}" for counter in range(args.alarms // len(SETPOINTS))]
+    tags = [cvt.set_tag(name=name, unit="C", data_type="float", variable="Temperature", description="")[0] for name in names]
+    start = time.perf_counter()
+    alarms = [
+        Alarm(name=f"{tag.name}_{_type}", tag=tag, alarm_type=StringType(_type), alarm_setpoint=FloatType(setpoint))
+        for tag in tags for _type, setpoint in SETPOINTS
+    ]
+    print(f"{len(alarms)} alarms on {len(tags)} tags created in {time.perf_counter() - start:.2f} s")
+    values = scans(names, args.scans, args.crossings)
+    timestamp = datetime.now()
+
+    # Per alarm, the previous path: each alarm's observer calls Alarm.notify with the tag value
+    by_name = {tag.name: tag for tag in tags}
+    by_tag = dict()
+    for alarm in alarms:
+        by_tag.setdefault(alarm.tag.name, list()).append(alarm)
+
+    start = time.perf_counter()
+    for scan in values:
+        for name, value in scan:
+            tag = by_name[name]
+            tag.value.set_value(value=value, unit=tag.unit)
+            for alarm in by_tag[name]:
+                alarm.notify(tag=name, value=tag.value, timestamp=timestamp)
+
+    per_alarm = time.perf_counter() - start
+
+    # Batch, one evaluation of the whole scan
+    transitions = evaluation.transitions
+    start = time.perf_counter()
+    for scan in values:
+        evaluation.evaluate([(name, value, timestamp) for name, value in scan])
+
+    batch = time.perf_counter() - start
+    evaluations = len(alarms) * args.scans
+
+    print(f"per alarm {evaluations / per_alarm:14,.0f} evaluations/s {per_alarm:8.2f} s")
+    print(f"batch     {evaluations / batch:14,.0f} evaluations/s {batch:8.2f} s  {evaluation.transitions - transitions} transitions")
+    print(f"speed up {per_alarm / batch:.1f}x")
+
+    for alarm in alarms:
+        evaluation.remove(alarm)
+
+    for tag in tags:
+        cvt.delete_tag(id=tag.id)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,97 @@
+r"""
+Compares the historian storage modes of DataLogger: one TagValue row per sample ('rows') against one
+Gorilla compressed TagValueBlock per tag and minute ('blocks').
+
+It reports the SQLite file size after VACUUM, the bytes per sample and the read_trends time.
+
+Run it from the repository root:
+
+```
+python -m benchmarks.historian_blocks --tags 10 --hours 6 --query-minutes 60
+python -m benchmarks.historian_blocks --noise 0
+```
+"""
+import argparse, os, tempfile, time, math, random
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase
+from automation.dbmodels import proxy, Variables, Units, DataTypes, Tags, TagValue, TagValueBlock
+from automation.logger.datalogger import DataLogger
+from automation.tags.cvt import CVTEngine
+
+
+def run(storage:str, folder:str, logger:DataLogger, names:list, hours:int, query_minutes:int, noise:float):
+
+    dbfile = os.path.join(folder, f"{storage}.db")
+    db = SqliteDatabase(dbfile, pragmas={'journal_mode': 'wal', 'synchronous': 0})
+    proxy.initialize(db)
+    logger.set_db(db)
+    logger.create_tables([Variables, Units, DataTypes, Tags, TagValue, TagValueBlock])
+    for counter, name in enumerate(names):
+        Tags.create(id=f"bench{counter:03d}", name=name, unit="Pa", data_type="float", description="", display_name=name, display_unit="Pa")
+
+    logger.set_storage(storage=storage)
+    random.seed(0)
+    start = datetime(2024, 1, 1)
+    samples = 0
+    write_start = time.perf_counter()
+
+    # Batches of 60 seconds, values as an analog signal with 0.01 resolution
+    for minute in range(hours * 60):
+        tags = list()
+        for second in range(60):
+            timestamp = start + timedelta(minutes=minute, seconds=second)
+            for counter, name in enumerate(names):
+                value = round(100 + 10 * math.sin((minute * 60 + second) / 600 + counter) + random.gauss(0, noise), 2)
+                tags.append({"tag": name, "value": value, "timestamp": timestamp})
+
+        logger.write_tags(tags)
+        samples += len(tags)
+
+    write_time = time.perf_counter() - write_start
+    db.execute_sql("VACUUM")
+    db.execute_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(dbfile)
+
+    query_start = start + timedelta(hours=hours / 2)
+    query_stop = query_start + timedelta(minutes=query_minutes)
+    read_start = time.perf_counter()
+    trends = logger.read_trends(query_start.strftime("%Y-%m-%d %H:%M:%S.%f"), query_stop.strftime("%Y-%m-%d %H:%M:%S.%f"), "UTC", names[:1])
+    read_time = time.perf_counter() - read_start
+    points = len(trends[names[0]]["values"])
+    db.close()
+
+    print(f"{storage:<8} {samples:>10} samples {size / 1024 / 1024:10.2f} MB {size / samples:8.2f} B/sample write {write_time:8.2f} s  read {points} points {read_time * 1000:10.1f} ms")
+
+    return size, read_time
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--hours", type=int, default=6)
+    parser.add_argument("--query-minutes", type=int, default=60)
+    parser.add_argument("--noise", type=float, default=0.05, help="Standard deviation of the noise added to the signal")
+    args = parser.parse_args()
+
+    cvt = CVTEngine()
+    logger = DataLogger()
+    names = [f"bench_tag_{counter}" for counter in range(args.tags)]
+    tags = [cvt.set_tag(name=name, unit="Pa", data_type="float", variable="Pressure", description="")[0] for name in names]
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        logger.set_spool(folder=os.path.join(folder, "spool"))
+        rows_size, rows_read = run("rows", folder, logger, names, args.hours, args.query_minutes, args.noise)
+        blocks_size, blocks_read = run("blocks", folder, logger, names, args.hours, args.query_minutes, args.noise)
+        logger.spool.close()
+
+    for tag in tags:
+        cvt.delete_tag(id=tag.id)
+
+    print(f"size ratio {rows_size / blocks_size:.1f}x, read_trends speed up {rows_read / blocks_read:.1f}x")
+
+
+if __name__ == "__main__":
+
+    main()
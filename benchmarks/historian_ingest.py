@@ -0,0 +1,86 @@
+r"""
+Compares the TagValue ingest rate (rows/s) of DataLogger.write_tags through its three paths:
+
+* SQLite, chunked multi-row INSERT
+* PostgreSQL, chunked multi-row INSERT (bulk_ingest disabled)
+* PostgreSQL, COPY ... FROM STDIN (bulk_ingest enabled)
+
+PostgreSQL paths run only when a server is given, any reachable instance works (a local one or a container).
+Tables are created in the target database and TagValue rows are deleted after every run.
+
+Run it from the repository root:
+
+```
+python -m benchmarks.historian_ingest --sizes 100 1000 10000 100000
+python -m benchmarks.historian_ingest --pg-name bench --pg-user postgres --pg-password postgres --pg-host 127.0.0.1
+```
+"""
+import argparse, os, tempfile, time
+from datetime import datetime, timedelta
+from peewee import SqliteDatabase, PostgresqlDatabase
+from automation.dbmodels import proxy, Variables, Units, DataTypes, Tags, TagValue
+from automation.logger.datalogger import DataLogger
+
+
+def setup(db, logger:DataLogger):
+
+    proxy.initialize(db)
+    logger.set_db(db)
+    logger.create_tables([Variables, Units, DataTypes, Tags, TagValue])
+    if not Tags.name_exist("bench_tag"):
+        Tags.create(id="bench001", name="bench_tag", unit="Pa", data_type="float", description="", display_name="bench_tag", display_unit="Pa")
+
+
+def bench(label, db, logger:DataLogger, sizes, bulk_ingest:bool):
+
+    setup(db, logger)
+    logger.bulk_ingest = bulk_ingest
+    start_timestamp = datetime(2024, 1, 1)
+
+    for size in sizes:
+        tags = [{"tag": "bench_tag", "value": float(counter), "timestamp": start_timestamp + timedelta(milliseconds=counter)} for counter in range(size)]
+        start = time.perf_counter()
+        logger.write_tags(tags)
+        elapsed = time.perf_counter() - start
+        rows = TagValue.select().count()
+        TagValue.delete().execute()
+        print(f"{label:<32} {size:>8} rows {size / elapsed:14.0f} rows/s{'' if rows==size else f'  ({rows} rows written)'}")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--pg-name", default=None)
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--pg-password", default="postgres")
+    parser.add_argument("--pg-host", default="127.0.0.1")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    args = parser.parse_args()
+
+    logger = DataLogger()
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        logger.set_spool(folder=os.path.join(folder, "spool"))
+        sqlite = SqliteDatabase(os.path.join(folder, "bench.db"), pragmas={'journal_mode': 'wal', 'synchronous': 0})
+        bench("SQLite INSERT", sqlite, logger, args.sizes, bulk_ingest=True)
+        sqlite.close()
+
+        if args.pg_name:
+
+            postgres = PostgresqlDatabase(args.pg_name, user=args.pg_user, password=args.pg_password, host=args.pg_host, port=args.pg_port)
+            bench("PostgreSQL INSERT", postgres, logger, args.sizes, bulk_ingest=False)
+            bench("PostgreSQL COPY", postgres, logger, args.sizes, bulk_ingest=True)
+            postgres.close()
+
+        else:
+
+            print("PostgreSQL paths skipped, pass --pg-name to run them")
+
+        logger.spool.close()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,79 @@
+r"""
+Compares the read throughput of OPCUAClientManager (python-opcua, blocking) against
+AsyncOPCUAClientManager (asyncua) using in-process OPC UA servers, no hardware needed.
+
+Run it from the repository root:
+
+```
+python -m benchmarks.opcua_client_managers --servers 4 --variables 50 --rounds 10
+```
+"""
+import argparse, time
+from automation.managers.opcua_client import OPCUAClientManager
+from automation.managers.async_opcua_client import AsyncOPCUAClientManager
+from automation.tests.opcua_server import LocalOPCUAServer
+
+
+def bench(label, read, rounds):
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        read()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / rounds * 1000:10.2f} ms/round")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=4)
+    parser.add_argument("--variables", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    servers = [LocalOPCUAServer(variables=args.variables) for _ in range(args.servers)]
+    for server in servers:
+        server.start()
+
+    sync_manager = OPCUAClientManager()
+    async_manager = AsyncOPCUAClientManager()
+
+    try:
+
+        for counter, server in enumerate(servers):
+            sync_manager.add(client_name=f"plc{counter}", host=server.host, port=server.port)
+            async_manager.add(client_name=f"plc{counter}", host=server.host, port=server.port)
+
+        def sync_values():
+            for counter, server in enumerate(servers):
+                sync_manager.get_node_values(client_name=f"plc{counter}", namespaces=server.namespaces)
+
+        def async_values():
+            async_manager.get_values(requests={f"plc{counter}": server.namespaces for counter, server in enumerate(servers)})
+
+        def sync_attributes():
+            for counter, server in enumerate(servers):
+                sync_manager.get_node_attributes(client_name=f"plc{counter}", namespaces=server.namespaces)
+
+        def async_attributes():
+            for counter, server in enumerate(servers):
+                async_manager.get_node_attributes(client_name=f"plc{counter}", namespaces=server.namespaces)
+
+        print(f"{args.servers} servers x {args.variables} variables")
+        bench("OPCUAClientManager.get_node_values", sync_values, args.rounds)
+        bench("AsyncOPCUAClientManager.get_values", async_values, args.rounds)
+        bench("OPCUAClientManager.get_node_attributes", sync_attributes, args.rounds)
+        bench("AsyncOPCUAClientManager.get_node_attributes", async_attributes, args.rounds)
+
+    finally:
+
+        for counter in range(len(servers)):
+            sync_manager.disconnect(client_name=f"plc{counter}")
+        async_manager.stop()
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+
+    main()
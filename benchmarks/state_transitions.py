@@ -0,0 +1,79 @@
+r"""
+Compares how Alarm and StateMachineCore find the transition to send: the previous scan of every transition
+of the machine, matched by its f-string name ('scan'), against the per class lookup tables built by
+TransitionTableMeta ('table').
+
+It reports lookups per second and transitions per second (lookup + send) for both.
+
+Run it from the repository root:
+
+```
+python -m benchmarks.state_transitions --cycles 20000
+```
+"""
+import argparse, time
+from automation.alarms import Alarm
+from automation.state_machine import StateMachineCore
+from automation.tags.cvt import CVTEngine
+from automation.models import StringType, FloatType
+
+
+def scan(machine, target:str):
+
+    current_state = machine.current_state
+    transition_name = f"{current_state.name.lower()}_to_{target}"
+    allowed_transitions = [transition for transition in machine.transitions if transition.source == current_state]
+
+    for transition in allowed_transitions:
+
+        if f"{transition.source.name}_to_{transition.target.name}"==transition_name:
+
+            return transition_name
+
+
+def table(machine, target:str):
+
+    return machine._transition_table.get((machine.current_state.name, target))
+
+
+def run(name:str, machine, cycle:tuple, cycles:int):
+
+    for lookup in (scan, table):
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for target in cycle:
+                lookup(machine, target)
+
+        lookups = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for target in cycle:
+                machine.send(lookup(machine, target))
+
+        transitions = time.perf_counter() - start
+        count = cycles * len(cycle)
+        print(f"{name:<18} {lookup.__name__:<6} {count / lookups:14,.0f} lookups/s {count / transitions:12,.0f} transitions/s")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=20000)
+    args = parser.parse_args()
+
+    cvt = CVTEngine()
+    tag, _ = cvt.set_tag(name="bench_transitions", unit="C", data_type="float", variable="Temperature", description="")
+    alarm = Alarm(name="bench_transitions", tag=tag, alarm_type=StringType("HIGH"), alarm_setpoint=FloatType(50.0))
+    alarm.evaluation.remove(alarm)
+    machine = StateMachineCore(name="bench_transitions")
+
+    run("Alarm", alarm, ("shelved", "normal", "out_of_service", "normal"), args.cycles)
+    run("StateMachineCore", machine, ("wait", "run", "reset", "start"), args.cycles)
+
+    cvt.delete_tag(id=tag.id)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -24,6 +24,10 @@ setuptools.setup(
     include_package_data=True,
     packages=setuptools.find_packages(),
     install_requires=_requirements,
+    extras_require={
+        # Parquet archive of the historian and Arrow export
+        "archive": ["pyarrow>=14.0.0"]
+    },
     classifiers=[
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
@@ -1,8 +1,11 @@
 from unittest import TestLoader, TestSuite, TextTestRunner
 from automation.tests.test_user import TestUsers
 from automation.tests.test_core import TestCore
-from automation.tests.test_unit import TestConversions
+from automation.tests.test_unit import TestConversions, TestGorilla, TestExport, TestChangeLog, TestDecimation
 from automation.tests.test_alarms import TestAlarms
+from automation.tests.test_opcua import TestPollingScheduler, TestAsyncOPCUAClientManager, TestOPCUAClientSupervision, TestDAQ
+from automation.tests.test_state_machine import TestSharedMachineScheduler, TestProcessMachineRunner, TestTransitionTable
+from automation.tests.test_logger import TestBaseEngine, TestRoutingProxy, TestSpool, TestDataLoggerWrites, TestAlarmsLogger, TestLogsLogger, TestBatchWriter
 
 
 def suite():
@@ -13,9 +16,27 @@ def suite():
     tests = list()
     suite = TestSuite()
     tests.append(TestLoader().loadTestsFromTestCase(TestConversions))
+    tests.append(TestLoader().loadTestsFromTestCase(TestGorilla))
+    tests.append(TestLoader().loadTestsFromTestCase(TestExport))
+    tests.append(TestLoader().loadTestsFromTestCase(TestChangeLog))
+    tests.append(TestLoader().loadTestsFromTestCase(TestDecimation))
     tests.append(TestLoader().loadTestsFromTestCase(TestUsers))
     tests.append(TestLoader().loadTestsFromTestCase(TestCore))
     tests.append(TestLoader().loadTestsFromTestCase(TestAlarms))
+    tests.append(TestLoader().loadTestsFromTestCase(TestPollingScheduler))
+    tests.append(TestLoader().loadTestsFromTestCase(TestAsyncOPCUAClientManager))
+    tests.append(TestLoader().loadTestsFromTestCase(TestOPCUAClientSupervision))
+    tests.append(TestLoader().loadTestsFromTestCase(TestDAQ))
+    tests.append(TestLoader().loadTestsFromTestCase(TestSharedMachineScheduler))
+    tests.append(TestLoader().loadTestsFromTestCase(TestProcessMachineRunner))
+    tests.append(TestLoader().loadTestsFromTestCase(TestTransitionTable))
+    tests.append(TestLoader().loadTestsFromTestCase(TestBaseEngine))
+    tests.append(TestLoader().loadTestsFromTestCase(TestRoutingProxy))
+    tests.append(TestLoader().loadTestsFromTestCase(TestSpool))
+    tests.append(TestLoader().loadTestsFromTestCase(TestDataLoggerWrites))
+    tests.append(TestLoader().loadTestsFromTestCase(TestAlarmsLogger))
+    tests.append(TestLoader().loadTestsFromTestCase(TestLogsLogger))
+    tests.append(TestLoader().loadTestsFromTestCase(TestBatchWriter))
     suite = TestSuite(tests)
     return suite
 